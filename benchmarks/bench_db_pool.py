@@ -0,0 +1,86 @@
+"""
+Compares connect-per-call SQLite access (the old DatabaseTool behaviour)
+against the pooled, WAL-mode connections now used by DatabaseTool.
+
+Usage: python benchmarks/bench_db_pool.py [--ops 5000]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from healthmate_ai.tools.database_tool import DatabaseTool
+
+
+class ConnectPerCallTool:
+    """
+    Mirrors the pre-pool access pattern: open, run one statement, commit, close.
+    """
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def add_patient(self, patient_data):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            'INSERT OR REPLACE INTO patients (patient_id, name, age, gender, phone, email) VALUES (?, ?, ?, ?, ?, ?)',
+            (patient_data['patient_id'], patient_data['name'], patient_data['age'],
+             patient_data['gender'], patient_data['phone'], patient_data['email'])
+        )
+        conn.commit()
+        conn.close()
+
+    def get_patient(self, patient_id):
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute('SELECT * FROM patients WHERE patient_id = ?', (patient_id,)).fetchone()
+        conn.close()
+        return row
+
+
+def _patient(i: int):
+    return {
+        "patient_id": f"p_{i}",
+        "name": f"Patient {i}",
+        "age": 30 + i % 50,
+        "gender": "Female" if i % 2 else "Male",
+        "phone": "555-0000",
+        "email": f"p{i}@example.com"
+    }
+
+
+def run(label: str, tool, ops: int):
+    start = time.perf_counter()
+    for i in range(ops):
+        tool.add_patient(_patient(i))
+    write_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(ops):
+        tool.get_patient(f"p_{i}")
+    read_s = time.perf_counter() - start
+
+    print(f"{label:<18} inserts/sec: {ops / write_s:>10.0f}   reads/sec: {ops / read_s:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DatabaseTool connection pool benchmark")
+    parser.add_argument("--ops", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Legacy mode runs in rollback-journal mode with default synchronous=FULL
+        legacy_path = os.path.join(tmp, "legacy.db")
+        conn = sqlite3.connect(legacy_path)
+        conn.execute('CREATE TABLE patients (patient_id TEXT PRIMARY KEY, name TEXT, age INTEGER, gender TEXT, phone TEXT, email TEXT)')
+        conn.close()
+        run("connect-per-call", ConnectPerCallTool(legacy_path), args.ops)
+
+        run("pooled (WAL)", DatabaseTool(os.path.join(tmp, "pooled.db")), args.ops)
+
+
+if __name__ == "__main__":
+    main()
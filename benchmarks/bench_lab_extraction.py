@@ -0,0 +1,120 @@
+"""
+Scores the analyte extractor against the labelled corpus in
+healthmate_ai/evaluation/lab_extraction_corpus.json and measures report
+throughput on one core: the sample report's text, and synthetic
+multi-page reports like create_sample_pdf.py --pages writes, each through
+the plain "Label: value" field extraction and through ReportFieldExtractor
+with typed lab values.
+
+Exits with code 1 if the extractor gets any corpus case wrong.
+
+Usage: python benchmarks/bench_lab_extraction.py [--reports 5000] [--pages 20]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from create_sample_pdf import _NOTE_WORDS
+from healthmate_ai.tools.analyte_extractor import AnalyteExtractor
+from healthmate_ai.tools.lab_values import normalize_lab_values
+from healthmate_ai.tools.report_fields import ReportFieldExtractor
+
+CORPUS_PATH = os.path.join("healthmate_ai", "evaluation", "lab_extraction_corpus.json")
+
+SAMPLE_TEXT = ("Medical Report\nPatient: John Doe\nDate: 2023-10-27\n\nFindings:\n"
+               "Blood Pressure: 120/80 mmHg\nHeart Rate: 72 bpm\nCholesterol: 180 mg/dL\n\n"
+               "Notes: Patient is in good health. No significant abnormalities detected.\n")
+
+
+def synthetic_report(pages: int, seed: int) -> str:
+    """
+    The text of a discharge summary as create_large_pdf lays it out.
+    """
+    rng = random.Random(seed)
+    parts = ["Discharge Summary\nPatient: John Doe\nDate: 2023-10-27\n"]
+    for day in range(1, pages + 1):
+        parts.append(
+            f"Progress Note - Hospital Day {day}\n"
+            f"Blood Pressure: {rng.randint(100, 170)}/{rng.randint(60, 100)} mmHg\n"
+            f"Heart Rate: {rng.randint(55, 120)} bpm\n"
+            f"Glucose: {rng.randint(70, 200)} mg/dL\n"
+            f"Cholesterol: {rng.randint(140, 280)} mg/dL\n"
+        )
+        for _ in range(6):
+            parts.append(" ".join(rng.choice(_NOTE_WORDS) for _ in range(40)) + ".\n")
+    return "".join(parts)
+
+
+def score(extractor: AnalyteExtractor, corpus):
+    true_pos = false_pos = false_neg = misses = 0
+    for case in corpus:
+        got = extractor.extract(case["text"])
+        expected = case["expected"]
+        true_pos += sum(1 for name, value in got.items() if expected.get(name) == value)
+        false_pos += sum(1 for name, value in got.items() if expected.get(name) != value)
+        false_neg += sum(1 for name, value in expected.items() if got.get(name) != value)
+        if got != expected:
+            misses += 1
+            print(f"    miss: {case['text']!r} -> {got}, expected {expected}")
+    precision = true_pos / (true_pos + false_pos) if true_pos + false_pos else 1.0
+    recall = true_pos / (true_pos + false_neg) if true_pos + false_neg else 1.0
+    return precision, recall, misses
+
+
+def plain_fields(text: str):
+    fields = ReportFieldExtractor()
+    for line in text.split("\n"):
+        fields._add_line(line)
+    return fields.fields
+
+
+def typed_fields(text: str):
+    fields = ReportFieldExtractor()
+    fields.feed(text)
+    return fields.result()
+
+
+def reports_per_minute(extract, texts) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        extract(text)
+    return len(texts) / (time.perf_counter() - start) * 60
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lab value extraction benchmark")
+    parser.add_argument("--reports", type=int, default=5000)
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(CORPUS_PATH, 'r') as f:
+        corpus = json.load(f)
+    extractor = AnalyteExtractor()
+    print(f"Corpus: {len(corpus)} labelled cases")
+    precision, recall, misses = score(extractor, corpus)
+    print(f"  precision {precision:.3f}, recall {recall:.3f}, {len(corpus) - misses} / {len(corpus)} exact")
+
+    rows = normalize_lab_values(typed_fields(SAMPLE_TEXT))
+    print(f"\nSample report -> {len(rows)} lab_results rows: {rows}")
+
+    # Distinct texts so nothing is served from a warm cache
+    samples = [SAMPLE_TEXT.replace("John Doe", f"Patient {i}") for i in range(args.reports)]
+    large = [synthetic_report(args.pages, seed) for seed in range(max(1, args.reports // args.pages))]
+    print("\nThroughput on one core (reports per minute):")
+    print(f"  {'':22} {'sample':>10} {f'{args.pages}-page':>10}")
+    for label, extract in [("plain fields", plain_fields), ("analytes only", extractor.extract),
+                           ("fields + analytes", typed_fields)]:
+        print(f"  {label:22} {reports_per_minute(extract, samples):10.0f} {reports_per_minute(extract, large):10.0f}")
+
+    if misses:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
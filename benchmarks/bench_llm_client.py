@@ -0,0 +1,92 @@
+"""
+Drives the fake model through LlmClient under two failure scenarios and
+compares it with calling the model directly:
+
+- flaky: some calls fail with a 503 and a few hang. The client retries the
+  failures within its budget and cuts the hangs off at the deadline.
+- outage: every call fails. The circuit opens and later requests fall back
+  immediately instead of each waiting on a failing model.
+
+A request "falls back" when it gets no model answer; TriageAgent would then
+use the rule-based triage.
+
+Usage: python benchmarks/bench_llm_client.py [--requests 400] [--concurrency 20] [--timeout 1.0]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from benchmarks.fake_llm import FakeGenerativeModel
+from healthmate_ai.core.llm_infrastructure import CircuitBreaker, LlmClient, RetryBudget
+
+PROMPT = "Symptoms: chest pain and sweating"
+
+SCENARIOS = {
+    "flaky": {"error_rate": 0.15, "hang_rate": 0.02},
+    "outage": {"error_rate": 1.0, "hang_rate": 0.0},
+}
+
+
+async def _run(call, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    answered = 0
+
+    async def one():
+        nonlocal answered
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call()
+                answered += 1
+            except Exception:
+                pass
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return time.perf_counter() - start, answered, latencies
+
+
+def _report(label: str, model: FakeGenerativeModel, requests: int, result):
+    elapsed, answered, latencies = result
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"  {label:8} wall {elapsed:6.2f} s  answered {answered:4d}/{requests}  "
+          f"model calls {model.calls:4d}  p50 {statistics.median(latencies):7.1f} ms  p99 {p99:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM client resilience benchmark")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--hang-s", type=float, default=5)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    for name, failures in SCENARIOS.items():
+        print(f"{name} ({failures['error_rate']:.0%} errors, {failures['hang_rate']:.0%} hangs of {args.hang_s:.0f} s):")
+
+        model = FakeGenerativeModel(latency_ms=args.latency_ms, hang_s=args.hang_s, seed=1, **failures)
+        result = asyncio.run(_run(lambda: asyncio.to_thread(model.generate_content, PROMPT),
+                                  args.requests, args.concurrency))
+        _report("direct", model, args.requests, result)
+
+        model = FakeGenerativeModel(latency_ms=args.latency_ms, hang_s=args.hang_s, seed=1, **failures)
+        client = LlmClient(timeout=args.timeout, retry_budget=RetryBudget(), breaker=CircuitBreaker(cooldown=5),
+                           base_backoff=0.05, threads=args.concurrency * 2)
+        result = asyncio.run(_run(lambda: client.call(model.generate_content, PROMPT),
+                                  args.requests, args.concurrency))
+        _report("client", model, args.requests, result)
+        print(f"           {client.stats()}")
+
+
+if __name__ == "__main__":
+    main()
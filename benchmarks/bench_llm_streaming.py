@@ -0,0 +1,78 @@
+"""
+Compares when a doctor sees the first words of an answer with and without
+streaming, using the fake model (benchmarks/fake_llm.py) so no API key is
+needed.
+
+Each query is scripted like a real doctor-portal turn: the model first
+asks for a tool (get_doctor_schedule), then writes a --words long answer.
+The fake model waits --latency-ms before the first chunk of each turn and
+--chunk-ms between chunks. For send_message the first output is the whole
+answer; for send_message_stream it is the first chunk.
+
+Usage: python benchmarks/bench_llm_streaming.py [--queries 20] [--words 120] [--latency-ms 300] [--chunk-ms 25]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+
+def _script(words: int):
+    answer = " ".join(f"word{i}" for i in range(words))
+    return [
+        {"calls": [{"name": "get_doctor_schedule", "args": {"doctor_id": "Dr. Smith", "date": "2025-01-01"}}]},
+        {"text": answer},
+    ]
+
+
+def run(agent, words: int, stream: bool):
+    agent.reset()
+    agent.chat.script = _script(words)
+    start = time.perf_counter()
+    first = None
+    text = ""
+    chunks = agent.send_message_stream("What is my schedule?") if stream else [agent.send_message("What is my schedule?")]
+    for chunk in chunks:
+        if first is None:
+            first = time.perf_counter() - start
+        text += chunk
+    total = time.perf_counter() - start
+    if len(text.split()) != words:
+        raise RuntimeError(f"expected {words} words, got: {text[:80]!r}")
+    return first * 1000, total * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM streaming time-to-first-token benchmark")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--words", type=int, default=120)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--chunk-ms", type=float, default=25)
+    args = parser.parse_args()
+
+    os.environ["HEALTHMATE_FAKE_LLM_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["HEALTHMATE_FAKE_LLM_CHUNK_MS"] = str(args.chunk_ms)
+    from benchmarks.fake_llm import fake_model_factory
+    from healthmate_ai.core.llm_infrastructure import FunctionTool, LlmAgent
+
+    def get_doctor_schedule(doctor_id: str, date: str):
+        return {"doctor_id": doctor_id, "date": date, "appointments": []}
+
+    agent = LlmAgent("BenchAgent", tools=[FunctionTool(get_doctor_schedule)], model_factory=fake_model_factory)
+
+    print(f"{args.queries} queries, one tool call + {args.words} words each "
+          f"(model latency {args.latency_ms:.0f} ms/turn, {args.chunk_ms:.0f} ms/chunk)")
+    print(f"{'mode':<22}{'first output p50':>18}{'total p50':>12}")
+    for label, stream in (("send_message", False), ("send_message_stream", True)):
+        results = [run(agent, args.words, stream) for _ in range(args.queries)]
+        first = statistics.median(r[0] for r in results)
+        total = statistics.median(r[1] for r in results)
+        print(f"{label:<22}{first:>15.0f} ms{total:>9.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
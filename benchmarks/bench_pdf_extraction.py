@@ -0,0 +1,81 @@
+"""
+Compares serial and page-parallel text extraction on large synthetic reports.
+
+Reports of each --pages size are written with create_sample_pdf.create_large_pdf
+into a temporary directory, then extracted:
+
+- serial (old): the previous loop, `text += page.extract_text() + "\\n"`;
+- serial: PDFParserTool without an executor;
+- parallel: PDFParserTool over a process pool of --workers processes, in
+  ranges of --pages-per-task pages (the pool is warmed up first).
+
+The parallel text must match the serial text exactly.
+
+Usage: python benchmarks/bench_pdf_extraction.py [--pages 50 200 400] [--workers 4] [--pages-per-task 20] [--rounds 3]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from create_sample_pdf import create_large_pdf
+from healthmate_ai.core.executors import Executors
+from healthmate_ai.tools.pdf_parser_tool import PDFParserTool
+
+
+def old_extract_text(path: str) -> str:
+    from pypdf import PdfReader
+    reader = PdfReader(path)
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text() + "\n"
+    return text
+
+
+def _time(func, path: str, rounds: int):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        text = func(path)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF extraction benchmark")
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200, 400])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--pages-per-task", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    executors = Executors(io_workers=2, cpu_workers=args.workers)
+    executors.warm_up()
+    serial = PDFParserTool(max_pages=max(args.pages))
+    parallel = PDFParserTool(executor=executors.cpu, max_pages=max(args.pages),
+                             pages_per_task=args.pages_per_task)
+
+    print(f"{'pages':>6}{'serial (old)':>15}{'serial':>12}{'parallel':>12}{'speedup':>10}")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for pages in args.pages:
+                path = os.path.join(tmp, f"report_{pages}.pdf")
+                create_large_pdf(path, pages)
+                old_ms, _ = _time(old_extract_text, path, args.rounds)
+                serial_ms, serial_text = _time(serial.extract_text, path, args.rounds)
+                parallel_ms, parallel_text = _time(parallel.extract_text, path, args.rounds)
+                if parallel_text != serial_text:
+                    raise RuntimeError(f"parallel text differs from serial text for {pages} pages")
+                print(f"{pages:>6}{old_ms:>12.0f} ms{serial_ms:>9.0f} ms{parallel_ms:>9.0f} ms"
+                      f"{serial_ms / parallel_ms:>9.1f}x")
+    finally:
+        executors.shutdown()
+
+
+if __name__ == "__main__":
+    main()
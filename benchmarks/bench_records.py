@@ -0,0 +1,81 @@
+"""
+Memory and throughput of reading visit history as slotted Visit records
+versus the old hand-built dict per row.
+
+Usage: python benchmarks/bench_records.py [--rows 1000000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from healthmate_ai.tools.database_tool import DatabaseTool
+
+
+def history_as_dicts(db: DatabaseTool, patient_id: str):
+    # The pre-record implementation of get_patient_history
+    cursor = db._get_connection().cursor()
+    cursor.execute('''
+        SELECT visit_id, patient_id, symptoms, triage_summary, severity, department, timestamp
+        FROM visits WHERE patient_id = ? ORDER BY visited_at DESC
+    ''', (patient_id,))
+    history = []
+    for row in cursor.fetchall():
+        history.append({
+            'visit_id': row[0],
+            'patient_id': row[1],
+            'symptoms': row[2],
+            'triage_summary': row[3],
+            'severity': row[4],
+            'department': row[5],
+            'timestamp': row[6]
+        })
+    return history
+
+
+def measure(label: str, fetch, rows: int):
+    # Best of three without tracemalloc, then measure retained memory in a separate pass
+    elapsed = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        result = fetch()
+        elapsed = min(elapsed, time.perf_counter() - start)
+        assert len(result) == rows
+        del result
+
+    tracemalloc.start()
+    result = fetch()
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<16} {rows / elapsed:>12,.0f} rows/sec   retained {current / 2**20:>8.1f} MiB")
+    del result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record vs dict row benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseTool(os.path.join(tmp, "records.db"))
+        db.add_patient({"patient_id": "p_1", "name": "Long Term", "age": 70,
+                        "gender": "Female", "phone": "555-0000", "email": "n/a"})
+        db.add_visit_bulk(
+            {"visit_id": f"v_{i}", "patient_id": "p_1", "symptoms": "Headache",
+             "triage_summary": "Summary", "severity": "Low", "department": "Neurology",
+             "timestamp": f"20{10 + i % 15:02d}-{1 + i % 12:02d}-{1 + i % 28:02d}T09:00:00"}
+            for i in range(args.rows)
+        )
+        print(f"Loaded {args.rows:,} visits")
+
+        measure("dict per row", lambda: history_as_dicts(db, "p_1"), args.rows)
+        measure("Visit records", lambda: db.get_patient_history("p_1"), args.rows)
+
+
+if __name__ == "__main__":
+    main()
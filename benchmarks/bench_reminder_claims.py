@@ -0,0 +1,64 @@
+"""
+Drains a queue of due reminders with several worker processes using
+DatabaseTool.claim_due_reminders, then checks no reminder was sent twice.
+
+Usage: python benchmarks/bench_reminder_claims.py [--reminders 20000] [--workers 4] [--batch 200]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from healthmate_ai.tools.database_tool import DatabaseTool
+
+
+def drain(args):
+    db_path, worker_id, batch_size = args
+    db = DatabaseTool(db_path)
+    sent = []
+    while True:
+        batch = db.claim_due_reminders(worker_id, batch_size)
+        if not batch:
+            return sent
+        # Stand-in for NotificationTool.send_sms
+        ids = [reminder.reminder_id for reminder in batch]
+        sent.extend(ids)
+        db.mark_reminders_sent(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reminder claiming benchmark")
+    parser.add_argument("--reminders", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "reminders.db")
+        DatabaseTool(db_path).add_reminder_bulk(
+            {"reminder_id": f"r_{i}", "appointment_id": f"a_{i}", "reminder_date": "2023-10-27"}
+            for i in range(args.reminders)
+        )
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(args.workers) as pool:
+            results = pool.map(drain, [(db_path, f"worker-{w}", args.batch) for w in range(args.workers)])
+        elapsed = time.perf_counter() - start
+
+        all_sent = [rid for sent in results for rid in sent]
+        duplicates = len(all_sent) - len(set(all_sent))
+        print(f"workers={args.workers} batch={args.batch}: drained {len(all_sent):,} reminders "
+              f"in {elapsed:.2f}s ({len(all_sent) / elapsed:,.0f}/sec)")
+        print(f"per worker: {[len(sent) for sent in results]}")
+        print(f"duplicates: {duplicates}, unsent: {args.reminders - len(set(all_sent))}")
+        if duplicates or len(set(all_sent)) != args.reminders:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Measures the report cache on re-uploaded reports.
+
+--distinct synthetic reports of --pages pages are written, then --uploads
+uploads are drawn from them at random, each copied to a new file name as a
+re-upload would be. Every upload goes through
+ReportParserAgent.process_report, with the cache disabled (max_bytes=0)
+and enabled, each against a fresh database. Also reports how fast files
+are hashed.
+
+Usage: python benchmarks/bench_report_cache.py [--distinct 5] [--uploads 50] [--pages 40]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from create_sample_pdf import create_large_pdf
+from healthmate_ai.agents.report_parser_agent import ReportParserAgent
+from healthmate_ai.tools.report_cache import ReportCache, file_digest
+
+
+def _run(uploads, db_path: str, max_bytes: int):
+    agent = ReportParserAgent(cache=ReportCache(db_path, max_bytes=max_bytes))
+    start = time.perf_counter()
+    for path in uploads:
+        if agent.process_report(path)["status"] != "success":
+            raise RuntimeError(f"failed to parse {path}")
+    return time.perf_counter() - start, agent.cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report cache benchmark")
+    parser.add_argument("--distinct", type=int, default=5)
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=40)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        originals = []
+        for i in range(args.distinct):
+            path = os.path.join(tmp, f"original_{i}.pdf")
+            create_large_pdf(path, args.pages, seed=i)
+            originals.append(path)
+        uploads = []
+        for i in range(args.uploads):
+            path = os.path.join(tmp, f"upload_{i}.pdf")
+            shutil.copyfile(rng.choice(originals), path)
+            uploads.append(path)
+
+        total_bytes = sum(os.path.getsize(path) for path in uploads)
+        start = time.perf_counter()
+        for path in uploads:
+            file_digest(path)
+        hash_s = time.perf_counter() - start
+
+        uncached_s, _ = _run(uploads, os.path.join(tmp, "uncached.db"), 0)
+        cached_s, stats = _run(uploads, os.path.join(tmp, "cached.db"), 256 * 1024 * 1024)
+
+    print(f"{args.uploads} uploads of {args.distinct} distinct {args.pages}-page reports")
+    print(f"  hashing:     {total_bytes / hash_s / 1024 / 1024:8.0f} MB/s")
+    print(f"  no cache:    {uncached_s * 1000:8.0f} ms ({args.uploads / uncached_s:6.1f} reports/s)")
+    print(f"  with cache:  {cached_s * 1000:8.0f} ms ({args.uploads / cached_s:6.1f} reports/s)")
+    print(f"  cache:       {stats['hits']} hits, {stats['misses']} misses, "
+          f"{stats['parse_ms_saved']:.0f} ms of parsing saved, {stats['size_bytes']} bytes stored")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measures bulk report ingestion against attaching the same reports one at a
+time the way an admission does (ReportParserAgent.process_report then
+add_medical_report), each into a fresh database with the report cache off.
+Then re-runs the ingestion to show the cost of a resumed run that finds
+everything already done.
+
+Usage: python benchmarks/bench_report_ingest.py [--reports 100] [--pages 10] [--patients 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from create_sample_pdf import create_large_pdf
+from healthmate_ai.agents.report_ingest_agent import ReportIngestAgent, discover_reports
+from healthmate_ai.agents.report_parser_agent import ReportParserAgent
+from healthmate_ai.core.executors import Executors
+from healthmate_ai.tools.database_tool import DatabaseTool
+from healthmate_ai.tools.report_cache import ReportCache
+
+
+def _database(path: str, patients: int) -> DatabaseTool:
+    db = DatabaseTool(path)
+    db.add_patient_bulk({"patient_id": f"p_{i}", "name": f"Patient {i}", "age": 40, "gender": "Female",
+                         "phone": "555-0000", "email": "n/a"} for i in range(patients))
+    return db
+
+
+def one_at_a_time(root: str, db: DatabaseTool) -> float:
+    agent = ReportParserAgent(cache=ReportCache(db.db_path, max_bytes=0))
+    start = time.perf_counter()
+    for path in discover_reports(root):
+        result = agent.process_report(path)
+        patient_id = os.path.basename(path).split("__")[0]
+        db.add_medical_report({"report_id": f"rep_{uuid.uuid4().hex[:12]}", "patient_id": patient_id,
+                               "extracted_data": result["data"]})
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk report ingestion benchmark")
+    parser.add_argument("--reports", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--patients", type=int, default=20)
+    args = parser.parse_args()
+
+    executors = Executors()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "drop")
+        os.makedirs(root)
+        for i in range(args.reports):
+            create_large_pdf(os.path.join(root, f"p_{i % args.patients}__report_{i}.pdf"), args.pages, seed=i)
+        megabytes = sum(os.path.getsize(path) for path in discover_reports(root)) / (1024 * 1024)
+
+        sequential_s = one_at_a_time(root, _database(os.path.join(tmp, "sequential.db"), args.patients))
+
+        db = _database(os.path.join(tmp, "ingest.db"), args.patients)
+        agent = ReportIngestAgent(db_tool=db, executors=executors, report_agent=ReportParserAgent(
+            executors, cache=ReportCache(db.db_path, max_bytes=0)))
+        executors.warm_up()
+        stats = agent.ingest(root)
+        resumed = agent.ingest(root)
+    executors.shutdown()
+
+    print(f"{args.reports} reports of {args.pages} pages ({megabytes:.1f} MB), "
+          f"{executors.cpu_workers} CPU worker processes")
+    print(f"  one at a time:   {sequential_s * 1000:8.0f} ms ({args.reports / sequential_s:6.1f} reports/s)")
+    print(f"  ingest:          {stats['elapsed_s'] * 1000:8.0f} ms ({stats['reports_per_s']:6.1f} reports/s, "
+          f"{stats['ingested']} ingested, {stats['failed']} failed)")
+    print(f"  resumed, done:   {resumed['elapsed_s'] * 1000:8.1f} ms ({resumed['skipped']} skipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares memory use of the full and the streaming report parse on large
+synthetic reports (create_sample_pdf.create_large_pdf):
+
+- parse_report: keeps the whole text in the result ("raw_text");
+- parse_report_stream: feeds pages to the field extractor as they are
+  extracted and keeps only the fields and a preview.
+
+For each, the peak Python memory allocated during the parse (tracemalloc),
+the size of the result as JSON (what the admission summary carries on) and
+the wall time are reported (tracing slows extraction, so times are only
+comparable with each other). With --workers the pages are extracted in
+worker processes, whose own peak per page range is shown as "workers".
+Both must extract the same fields.
+
+Usage: python benchmarks/bench_report_memory.py [--pages 50 200 400] [--workers 0]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from create_sample_pdf import create_large_pdf
+from healthmate_ai.core.executors import Executors
+from healthmate_ai.core.tracing import measure_peak_memory
+from healthmate_ai.tools.pdf_parser_tool import PDFParserTool
+
+
+def _measure(parse, path: str, **kwargs):
+    start = time.perf_counter()
+    with measure_peak_memory() as memory:
+        result = parse(path, **kwargs)
+    elapsed = (time.perf_counter() - start) * 1000
+    return result, memory["peak_kb"], len(json.dumps(result)) / 1024, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report parsing memory benchmark")
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200, 400])
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Extract in a process pool of this size (0: in this process)")
+    args = parser.parse_args()
+
+    executors = None
+    if args.workers:
+        executors = Executors(io_workers=2, cpu_workers=args.workers)
+        executors.warm_up()
+    tool = PDFParserTool(executor=executors.cpu if executors else None, max_pages=max(args.pages))
+
+    print(f"{'pages':>6}  {'mode':<8}{'peak memory':>14}{'workers':>12}{'result':>12}{'time':>10}")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for pages in args.pages:
+                path = os.path.join(tmp, f"report_{pages}.pdf")
+                create_large_pdf(path, pages)
+                full = _measure(tool.parse_report, path)
+                stream = _measure(tool.parse_report_stream, path, measure_memory=True)
+                if full[0]["extracted_fields"] != stream[0]["extracted_fields"]:
+                    raise RuntimeError(f"streaming parse found different fields for {pages} pages")
+                for label, (result, peak_kb, result_kb, elapsed) in (("full", full), ("stream", stream)):
+                    worker_kb = result.get("worker_peak_memory_kb")
+                    workers = f"{worker_kb:>8.0f} KiB" if worker_kb is not None else f"{'-':>12}"
+                    print(f"{pages:>6}  {label:<8}{peak_kb:>10.0f} KiB{workers}{result_kb:>8.0f} KiB{elapsed:>7.0f} ms")
+    finally:
+        if executors:
+            executors.shutdown()
+
+
+if __name__ == "__main__":
+    main()
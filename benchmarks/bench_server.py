@@ -0,0 +1,153 @@
+"""
+Load-tests the --serve HTTP service and checks its graceful shutdown.
+
+For each worker-process count, the script:
+- starts the server in a temporary directory, with the fake model
+  (benchmarks/fake_llm.py) standing in for Gemini;
+- sends --requests admissions, --concurrency at a time;
+- reports throughput, latency and status codes;
+- sends SIGTERM in the middle of a second burst. The server must exit
+  cleanly, and every admission it recorded must have been answered with a
+  200 (requests refused while shutting down are fine, lost answers are not).
+
+Exits with code 1 if a shutdown check fails.
+
+Usage: python benchmarks/bench_server.py [--workers 1 4] [--requests 2000] [--concurrency 64]
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import aiohttp
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from healthmate_ai.tools.database_tool import DatabaseTool
+
+REPO = os.getcwd()
+PATIENTS = 50
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _seed_patients(workdir: str):
+    # Admissions of unknown patients are refused with 404
+    DatabaseTool(os.path.join(workdir, "healthmate.db")).add_patient_bulk(
+        {"patient_id": f"p{i}", "name": f"Patient {i}", "age": 40, "gender": "Female",
+         "phone": "555-0000", "email": "n/a"} for i in range(PATIENTS))
+
+
+def _start_server(workdir: str, port: int, workers: int, llm_ms: float) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=REPO, PYTHONWARNINGS="ignore",
+               HEALTHMATE_MODEL_FACTORY="benchmarks.fake_llm:fake_model_factory",
+               HEALTHMATE_FAKE_LLM_LATENCY_MS=str(llm_ms))
+    return subprocess.Popen([sys.executable, "-m", "healthmate_ai.main", "--serve",
+                             "--port", str(port), "--workers", str(workers)],
+                            cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                            start_new_session=True)
+
+
+async def _wait_ready(session: aiohttp.ClientSession, url: str, workers: int):
+    # Every worker must be up, but each request may reach any of them
+    pids = set()
+    deadline = time.monotonic() + 60
+    while len(pids) < workers and time.monotonic() < deadline:
+        try:
+            async with session.get(f"{url}/healthz") as response:
+                pids.add((await response.json())["pid"])
+        except aiohttp.ClientError:
+            await asyncio.sleep(0.1)
+    if len(pids) < workers:
+        raise RuntimeError(f"only {len(pids)} of {workers} workers came up")
+
+
+async def _load(session: aiohttp.ClientSession, url: str, requests: int, concurrency: int, tag: str):
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses: Counter = Counter()
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async with session.post(f"{url}/admissions",
+                                        json={"patient_id": f"p{i % PATIENTS}", "symptoms": f"{tag} knee pain {i}"}) as r:
+                    await r.read()
+                    statuses[r.status] += 1
+            except aiohttp.ClientError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - start, statuses, sorted(latencies)
+
+
+async def _run(workers: int, args) -> bool:
+    with tempfile.TemporaryDirectory() as tmp:
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        _seed_patients(tmp)
+        server = _start_server(tmp, port, workers, args.llm_ms)
+        connector = aiohttp.TCPConnector(limit=args.concurrency, force_close=True)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            try:
+                await _wait_ready(session, url, workers)
+                elapsed, statuses, latencies = await _load(session, url, args.requests, args.concurrency, "load")
+                print(f"{workers} worker process(es):")
+                print(f"  throughput: {statuses[200] / elapsed:8.1f} admissions/s")
+                print(f"  latency:    p50 {statistics.median(latencies):7.1f} ms   "
+                      f"p95 {latencies[int(len(latencies) * 0.95)]:7.1f} ms")
+                print(f"  statuses:   {dict(statuses)}")
+
+                answered = statuses[200]
+
+                # SIGTERM while a burst is in flight
+                burst = asyncio.create_task(_load(session, url, args.concurrency * 4, args.concurrency, "drain"))
+                await asyncio.sleep(0.2)
+            finally:
+                # The whole process group, as a service manager would
+                os.killpg(server.pid, signal.SIGTERM)
+            _, statuses, _ = await burst
+            answered += statuses[200]
+        exit_code = server.wait(timeout=60)
+
+        with sqlite3.connect(os.path.join(tmp, "healthmate.db")) as conn:
+            recorded = conn.execute("SELECT COUNT(*) FROM visits").fetchone()[0]
+
+    print(f"  shutdown:   exit code {exit_code}, burst statuses {dict(statuses)}")
+    print(f"              {recorded} admissions recorded, {answered} answered")
+    return exit_code == 0 and recorded == answered and statuses[200] > 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP service load and shutdown benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--llm-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    ok = True
+    for workers in args.workers:
+        ok = asyncio.run(_run(workers, args)) and ok
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Measures how long the CLI takes to become usable:
+
+- import: `python -X importtime` for healthmate_ai.main, with the slowest
+  imports listed;
+- --cli: time until the role menu prompt is printed;
+- --test-scenario: wall time of the end-to-end evaluation scenario.
+
+Each run is a fresh interpreter in a temporary directory, so it gets its
+own database. The fake model (benchmarks/fake_llm.py) keeps the scenario
+offline. Pass --repo to measure another checkout, e.g. a git worktree of
+an older commit.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--top 10] [--repo .]
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+HEAVY_MODULES = ("google.generativeai", "pypdf")
+
+
+def _env(repo: str):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = repo
+    env["HEALTHMATE_MODEL_FACTORY"] = "benchmarks.fake_llm:fake_model_factory"
+    # Older checkouts chose the fake model with this flag instead
+    env["HEALTHMATE_FAKE_LLM"] = "1"
+    env["HEALTHMATE_FAKE_LLM_LATENCY_MS"] = "0"
+    env["PYTHONWARNINGS"] = "ignore"
+    return env
+
+
+def _imports(stderr: str):
+    """
+    {module: cumulative microseconds} for every import in an -X importtime report.
+    """
+    cumulative = {}
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+
+def measure_import(repo: str, workdir: str):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import healthmate_ai.main"],
+                            cwd=workdir, env=_env(repo), capture_output=True, text=True, check=True)
+    return _imports(result.stderr)
+
+
+def measure_cli_prompt(repo: str, workdir: str) -> float:
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-u", "-m", "healthmate_ai.main", "--cli"],
+                               cwd=workdir, env=_env(repo), stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    output = b""
+    while b"Select Role:" not in output:
+        chunk = os.read(process.stdout.fileno(), 4096)
+        if not chunk:
+            raise RuntimeError("CLI exited before showing the menu")
+        output += chunk
+    elapsed = time.perf_counter() - start
+    process.communicate(b"q\n", timeout=30)
+    return elapsed
+
+
+def measure_scenario(repo: str, workdir: str) -> float:
+    with open(os.path.join(repo, "healthmate_ai", "evaluation", "end_to_end_eval.json"), 'r') as f:
+        scenario = json.load(f)
+    scenario["report_path"] = os.path.join(repo, scenario["report_path"])
+    scenario_path = os.path.join(workdir, "scenario.json")
+    with open(scenario_path, 'w') as f:
+        json.dump(scenario, f)
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "healthmate_ai.main", "--test-scenario", scenario_path],
+                   cwd=workdir, env=_env(repo), capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def _fresh_dir(root: str, name: str) -> str:
+    path = os.path.join(root, name)
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--repo", default=os.getcwd())
+    args = parser.parse_args()
+    repo = os.path.abspath(args.repo)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        imports = [measure_import(repo, _fresh_dir(tmp, "import")) for _ in range(args.runs)]
+        cli = [measure_cli_prompt(repo, _fresh_dir(tmp, "cli")) for _ in range(args.runs)]
+        scenario = [measure_scenario(repo, _fresh_dir(tmp, "scenario")) for _ in range(args.runs)]
+
+    main_ms = statistics.median(run["healthmate_ai.main"] for run in imports) / 1000
+    print(f"Startup of {repo} (median of {args.runs} runs)")
+    print(f"  import healthmate_ai.main: {main_ms:8.1f} ms")
+    print(f"  --cli to menu prompt:      {statistics.median(cli) * 1000:8.1f} ms")
+    print(f"  --test-scenario total:     {statistics.median(scenario) * 1000:8.1f} ms")
+
+    loaded = [name for name in HEAVY_MODULES if name in imports[-1]]
+    print(f"\nHeavy modules loaded by import: {', '.join(loaded) or 'none'}")
+    print(f"Slowest imports (cumulative ms):")
+    for name, micros in sorted(imports[-1].items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {micros / 1000:8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
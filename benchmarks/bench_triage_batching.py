@@ -0,0 +1,115 @@
+"""
+Compares one triage model call per patient against micro-batched calls
+through TriageBatcher, for a burst of concurrent arrivals.
+
+The model is a stand-in with a fixed per-call latency plus a small
+per-patient cost; it answers batched prompts with a JSON array and
+deliberately garbles one item in --bad-every to exercise the per-item
+fallback.
+
+Usage: python benchmarks/bench_triage_batching.py [--arrivals 200] [--call-ms 300] [--batch-size 16] [--wait-ms 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from healthmate_ai.agents.triage_agent import TriageAgent
+from healthmate_ai.agents.triage_batcher import TriageBatcher
+from healthmate_ai.core.executors import Executors
+from healthmate_ai.tools.triage_cache import TriageCache
+
+_PATIENT_LINE = re.compile(r"^\s*(\d+)\. ", re.MULTILINE)
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StandInModel:
+    """
+    Answers single and batched triage prompts after a simulated delay.
+    """
+    def __init__(self, call_ms: float, item_ms: float, bad_every: int):
+        self.call_s = call_ms / 1000
+        self.item_s = item_ms / 1000
+        self.bad_every = bad_every
+        self.calls = 0
+        self.items = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str):
+        numbers = [int(n) for n in _PATIENT_LINE.findall(prompt)] if "Patients:" in prompt else []
+        with self._lock:
+            self.calls += 1
+            self.items += max(1, len(numbers))
+            first_item = self.items
+        time.sleep(self.call_s + self.item_s * max(1, len(numbers)))
+        answer = {"severity": "Low", "department": "General", "summary": "Simulated"}
+        if not numbers:
+            return _Response(json.dumps(answer))
+        items = []
+        for n in numbers:
+            if self.bad_every and (first_item + n) % self.bad_every == 0:
+                items.append({"id": n, "severity": "???"})
+            else:
+                items.append({"id": n, **answer})
+        return _Response(json.dumps(items))
+
+
+async def _burst(triage, arrivals: int, tag: str):
+    return await asyncio.gather(*(triage(f"{tag} symptom variant {i}") for i in range(arrivals)))
+
+
+def _agent(db_path: str, model: StandInModel) -> TriageAgent:
+    agent = TriageAgent(cache=TriageCache(db_path))
+    agent.model = model
+    return agent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Triage micro-batching benchmark")
+    parser.add_argument("--arrivals", type=int, default=200)
+    parser.add_argument("--call-ms", type=float, default=300)
+    parser.add_argument("--item-ms", type=float, default=5)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--wait-ms", type=float, default=20)
+    parser.add_argument("--in-flight", type=int, default=8)
+    parser.add_argument("--bad-every", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    executors = Executors(io_workers=max(16, args.in_flight * 2), cpu_workers=0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "triage.db")
+        for label, batch_size in [("one call per patient", 1), ("micro-batched", args.batch_size)]:
+            model = StandInModel(args.call_ms, args.item_ms, args.bad_every)
+            batcher = TriageBatcher(_agent(db_path, model), executors, max_batch_size=batch_size,
+                                    max_wait_ms=args.wait_ms, max_in_flight=args.in_flight)
+            start = time.perf_counter()
+            # A distinct tag per run keeps the triage cache out of the comparison
+            results = asyncio.run(_burst(batcher.analyze, args.arrivals, label))
+            elapsed = time.perf_counter() - start
+            assert len(results) == args.arrivals and all(r.get("department") for r in results)
+            stats = batcher.stats()
+            print(f"{label}:")
+            print(f"  wall time:    {elapsed:7.2f} s")
+            print(f"  model calls:  {model.calls}")
+            if batch_size > 1:
+                print(f"  batches:      {stats['batches']} (avg {stats['avg_batch_size']:.1f} patients)")
+
+    executors.shutdown()
+
+
+if __name__ == "__main__":
+    main()
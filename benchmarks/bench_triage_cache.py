@@ -0,0 +1,100 @@
+"""
+Replays a surge of arrivals with repetitive symptom descriptions through
+TriageAgent, against a stand-in model with a fixed response time, and
+reports the triage cache hit rate and the model latency it saved.
+
+A second pass starts with an empty in-memory tier, as after a restart,
+so its hits come from the SQLite tier.
+
+Usage: python benchmarks/bench_triage_cache.py [--arrivals 500] [--model-ms 300]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from healthmate_ai.agents.triage_agent import TriageAgent
+from healthmate_ai.tools.triage_cache import TriageCache
+
+COMPLAINTS = [
+    "headache", "chest pain", "swollen knee", "fever and cough", "dizzy",
+    "shortness of breath", "back pain", "sore throat", "leg fracture", "migraine",
+]
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FixedLatencyModel:
+    """
+    Stands in for the Gemini model: answers every prompt after a fixed delay.
+    """
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.calls = 0
+
+    def generate_content(self, prompt: str):
+        self.calls += 1
+        time.sleep(self.seconds)
+        return _Response(json.dumps({"severity": "Low", "department": "General", "summary": "Simulated"}))
+
+
+def _variant(complaint: str, rng: random.Random) -> str:
+    # Same complaint as typed by different staff: case, spacing, punctuation, order
+    words = complaint.split()
+    if rng.random() < 0.3:
+        rng.shuffle(words)
+    text = rng.choice([" ", "  ", ", "]).join(words)
+    text = text.upper() if rng.random() < 0.2 else text.capitalize()
+    return text + rng.choice(["", ".", "!", " "])
+
+
+def _run(agent: TriageAgent, arrivals, label: str):
+    start = time.perf_counter()
+    for symptoms in arrivals:
+        agent.analyze_symptoms(symptoms)
+    elapsed = time.perf_counter() - start
+    stats = agent.cache_stats()
+    print(f"{label}:")
+    print(f"  wall time:        {elapsed:8.2f} s ({elapsed / len(arrivals) * 1000:.2f} ms/arrival)")
+    print(f"  model calls:      {agent.model.calls}")
+    print(f"  memory / db hits: {stats['memory_hits']} / {stats['db_hits']}  (misses {stats['misses']})")
+    print(f"  hit rate:         {stats['hit_rate']:.1%}")
+    print(f"  latency saved:    {stats['latency_saved_ms'] / 1000:.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Triage cache benchmark")
+    parser.add_argument("--arrivals", type=int, default=500)
+    parser.add_argument("--model-ms", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    arrivals = [_variant(rng.choice(COMPLAINTS), rng) for _ in range(args.arrivals)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "triage.db")
+        os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+        agent = TriageAgent(cache=TriageCache(db_path))
+        agent.model = FixedLatencyModel(args.model_ms / 1000)
+        _run(agent, arrivals, "Cold start")
+
+        # Fresh counters and an empty memory tier, same SQLite table
+        restarted = TriageAgent(cache=TriageCache(db_path))
+        restarted.cache._memory.clear()
+        restarted.model = FixedLatencyModel(args.model_ms / 1000)
+        _run(restarted, arrivals, "After restart")
+
+
+if __name__ == "__main__":
+    main()
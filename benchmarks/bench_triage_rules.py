@@ -0,0 +1,128 @@
+"""
+Scores the rule-based triage fallback against the labelled corpus in
+healthmate_ai/evaluation/triage_rules_corpus.json, next to the keyword
+if-chain it replaced, and measures classification throughput. The
+corpus's "query" cases score the doctor-portal routing rules the same way.
+
+Exits with code 1 if the rules get any corpus case wrong.
+
+Usage: python benchmarks/bench_triage_rules.py [--strings 100000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from healthmate_ai.core.rule_engine import RuleEngine
+from healthmate_ai.tools.triage_rules import RULES_DIR, TriageRules
+
+CORPUS_PATH = os.path.join("healthmate_ai", "evaluation", "triage_rules_corpus.json")
+
+
+def legacy_mock_analysis(symptoms: str):
+    """
+    The keyword if-chain TriageAgent._mock_analysis used before the rule engine.
+    """
+    symptoms_lower = symptoms.lower()
+    if any(x in symptoms_lower for x in ["chest pain", "heart", "breathing", "shortness of breath"]):
+        return {"severity": "Critical", "department": "Cardiology"}
+    elif any(x in symptoms_lower for x in ["headache", "migraine", "dizzy"]):
+        return {"severity": "Low", "department": "Neurology"}
+    elif any(x in symptoms_lower for x in ["knee", "bone", "fracture", "leg", "arm", "swollen"]):
+        return {"severity": "Medium", "department": "Orthopedics"}
+    return {"severity": "Medium", "department": "General"}
+
+
+def legacy_route(query: str) -> str:
+    """
+    The substring routing the doctor portal used before the routing rules.
+    """
+    query_lower = query.lower()
+    if any(x in query_lower for x in ['schedule', 'appointments', 'calendar', 'today', 'patients']):
+        return "schedule"
+    elif any(x in query_lower for x in ['patient', 'history', 'report', 'details', 'insight']):
+        return "insight"
+    return "default"
+
+
+def score_routes(route, cases, show_misses: bool = False) -> int:
+    ok = 0
+    for case in cases:
+        got = route(case["query"])
+        ok += got == case["expected"]["route"]
+        if got != case["expected"]["route"] and show_misses:
+            print(f"    miss: {case['query']!r} -> {got}, expected {case['expected']['route']}")
+    return ok
+
+
+def score(classify, corpus, show_misses: bool = False):
+    department_ok = both_ok = 0
+    for case in corpus:
+        got = classify(case["symptoms"])
+        expected = case["expected"]
+        department_ok += got["department"] == expected["department"]
+        if got["department"] == expected["department"] and got["severity"] == expected["severity"]:
+            both_ok += 1
+        elif show_misses:
+            print(f"    miss: {case['symptoms']!r} -> {got['department']}/{got['severity']}, "
+                  f"expected {expected['department']}/{expected['severity']}")
+    return department_ok, both_ok
+
+
+def throughput(classify, strings) -> float:
+    start = time.perf_counter()
+    for text in strings:
+        classify(text)
+    return len(strings) / ((time.perf_counter() - start) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rule-based triage benchmark")
+    parser.add_argument("--strings", type=int, default=100000)
+    args = parser.parse_args()
+
+    with open(CORPUS_PATH, 'r') as f:
+        cases = json.load(f)
+    corpus = [case for case in cases if "symptoms" in case]
+    routing = [case for case in cases if "query" in case]
+    rules = TriageRules()
+    router = RuleEngine.from_file(os.path.join(RULES_DIR, "doctor_routing.json"))
+
+    def rule_route(query: str) -> str:
+        route = router.best(query)
+        return route["agent"] if route else "default"
+
+    print(f"Corpus: {len(corpus)} labelled cases (department / department+severity correct)")
+    for label, classify in [("legacy if-chain", legacy_mock_analysis), ("rule engine", rules.classify)]:
+        department_ok, both_ok = score(classify, corpus, show_misses=classify is rules.classify)
+        print(f"  {label:16} {department_ok:3d} / {both_ok:3d}")
+    print(f"Routing: {len(routing)} labelled doctor-portal queries (route correct)")
+    for label, route in [("legacy substrings", legacy_route), ("routing rules", rule_route)]:
+        print(f"  {label:17} {score_routes(route, routing, show_misses=route is rule_route):3d}")
+
+    rng = random.Random(1)
+    repeated = [rng.choice(corpus)["symptoms"] + rng.choice(["", " since yesterday", ", getting worse"])
+                for _ in range(args.strings)]
+    # Every string distinct, so the memo never hits
+    distinct = [f"{text} for {i} days" for i, text in enumerate(repeated)]
+    uncached = TriageRules(memo_size=0)
+
+    print(f"\nThroughput over {args.strings} strings (strings per ms):")
+    print(f"  {'':26} {'distinct':>9} {'repeated':>9}")
+    for label, classify in [("legacy if-chain", legacy_mock_analysis),
+                            ("rule scan only", rules._engine.scan),
+                            ("rule engine, no memo", uncached.classify),
+                            ("rule engine", rules.classify)]:
+        print(f"  {label:26} {throughput(classify, distinct):9.0f} {throughput(classify, repeated):9.0f}")
+
+    if score(rules.classify, corpus)[1] != len(corpus) or score_routes(rule_route, routing) != len(routing):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Seeds a large throwaway database and fails (exit code 1) if any hot query
+falls back to a full table SCAN instead of an index search.
+
+Usage: python benchmarks/check_query_plans.py [--patients 20000] [--visits-per-patient 10]
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from healthmate_ai.agents.report_ingest_agent import _CHECKPOINT_SELECT
+from healthmate_ai.core.datetime_utils import day_range
+from healthmate_ai.tools.database_tool import (_HISTORY_SELECT, _PATIENT_SELECT, _PENDING_REMINDERS_SELECT,
+                                               _REMINDER_CLAIM, _UNINDEXED_REPORTS_SELECT, DatabaseTool)
+from healthmate_ai.tools.doctor_database_tool import _APPOINTMENTS_RANGE_QUERY, _LAB_MATCH_QUERY, _LAB_SINCE
+from healthmate_ai.tools.patient_context_query import (_CONTEXT_QUERY, _REPORT_CURSOR, _UNDATED_VISIT_CURSOR,
+                                                       _VISIT_CURSOR)
+
+# (label, SQL, parameters) for every query on a request path. The SQL is
+# imported from the tools that run it, so this check cannot drift from them.
+HOT_QUERIES = [
+    ("get_patient",
+     _PATIENT_SELECT.format(column="patient_id"), ("p_1",)),
+    ("find_patient_by_name",
+     _PATIENT_SELECT.format(column="name"), ("Patient 1",)),
+    ("get_patient_history",
+     _HISTORY_SELECT, ("p_1",)),
+    ("get_pending_reminders",
+     _PENDING_REMINDERS_SELECT, (2**40,)),
+    ("claim_due_reminders",
+     _REMINDER_CLAIM, ("worker", 2**40, 2**40, 2**40, 100)),
+    ("get_doctor_appointments_range",
+     _APPOINTMENTS_RANGE_QUERY, ("Dr. Smith", *day_range("2023-10-23", "2023-10-29"))),
+    ("get_patient_context",
+     _CONTEXT_QUERY.format(visit_cursor="", report_cursor=""),
+     {"patient_id": "p_1", "visit_limit": 11, "report_limit": 6}),
+    ("get_patient_context (older pages)",
+     _CONTEXT_QUERY.format(visit_cursor=_VISIT_CURSOR, report_cursor=_REPORT_CURSOR),
+     {"patient_id": "p_1", "visit_limit": 11, "report_limit": 6,
+      "visited_at": 2**40, "visit_id": "", "report_seq": 2**40}),
+    ("get_patient_context (undated visits)",
+     _CONTEXT_QUERY.format(visit_cursor=_UNDATED_VISIT_CURSOR, report_cursor=""),
+     {"patient_id": "p_1", "visit_limit": 11, "report_limit": 6, "visit_id": "v_9"}),
+    ("find_patients_by_lab",
+     _LAB_MATCH_QUERY.format(op=">", since=""), ("bp_systolic", 140.0, 100)),
+    ("find_patients_by_lab (since)",
+     _LAB_MATCH_QUERY.format(op=">", since=_LAB_SINCE), ("bp_systolic", 140.0, 0, 100)),
+    ("backfill_lab_results",
+     _UNINDEXED_REPORTS_SELECT, (1000,)),
+    ("report ingest checkpoints",
+     _CHECKPOINT_SELECT, ("/data/drop/", "/data/drop0")),
+]
+
+# "SCAN visits" is a full table scan; "SCAN reminders USING INDEX ..." walks a (partial) index
+TABLE_SCAN = re.compile(r"^SCAN (\w+)$")
+# Subquery results ("CO-ROUTINE v") are scanned by design and are not tables
+SUBQUERY = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\w+)")
+
+
+def seed(db: DatabaseTool, patients: int, visits_per_patient: int):
+    doctors = ["Dr. Smith", "Dr. Jones", "Dr. Doe", "Dr. White", "Dr. Strange"]
+    db.add_patient_bulk(
+        {"patient_id": f"p_{i}", "name": f"Patient {i}", "age": 20 + i % 60,
+         "gender": "Female", "phone": "555-0000", "email": "n/a"}
+        for i in range(patients)
+    )
+    db.add_visit_bulk(
+        {"visit_id": f"v_{i}_{j}", "patient_id": f"p_{i}", "symptoms": "Headache",
+         "triage_summary": "Summary", "severity": "Low", "department": "Neurology",
+         "timestamp": f"2023-{1 + j % 12:02d}-{1 + i % 28:02d}T09:00:00"}
+        for i in range(patients) for j in range(visits_per_patient)
+    )
+    db.add_appointment_bulk(
+        {"appointment_id": f"a_{i}", "patient_id": f"p_{i}", "doctor_id": doctors[i % len(doctors)],
+         "date": f"2023-{1 + i % 12:02d}-{1 + i % 28:02d} {9 + i % 8:02d}:00", "status": "confirmed"}
+        for i in range(patients)
+    )
+    db.add_reminder_bulk(
+        {"reminder_id": f"r_{i}", "appointment_id": f"a_{i}",
+         "reminder_date": f"2023-{1 + i % 12:02d}-{1 + i % 28:02d}"}
+        for i in range(patients)
+    )
+    db.add_medical_report_bulk(
+        {"report_id": f"rep_{i}", "patient_id": f"p_{i}",
+         "extracted_data": {"bp": f"{100 + i % 80}/80", "glucose": f"{70 + i % 200} mg/dL",
+                            "date": f"2023-{1 + i % 12:02d}-{1 + i % 28:02d}"}}
+        for i in range(patients)
+    )
+    conn = db._get_connection()
+    with conn:
+        # Most reminders have already gone out
+        conn.execute("UPDATE reminders SET sent_flag = 1 WHERE CAST(substr(reminder_id, 3) AS INTEGER) % 50 != 0")
+    conn.execute('ANALYZE')
+
+
+def check(db: DatabaseTool) -> bool:
+    conn = db._get_connection()
+    ok = True
+    for label, sql, params in HOT_QUERIES:
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        subqueries = {m.group(1) for m in map(SUBQUERY.match, plan) if m}
+        scans = [step for step in plan
+                 if TABLE_SCAN.match(step) and TABLE_SCAN.match(step).group(1) not in subqueries]
+        status = "FAIL" if scans else "ok"
+        ok = ok and not scans
+        print(f"[{status:>4}] {label}")
+        for step in plan:
+            print(f"         {step}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query plan regression check")
+    parser.add_argument("--patients", type=int, default=20000)
+    parser.add_argument("--visits-per-patient", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseTool(os.path.join(tmp, "plans.db"))
+        seed(db, args.patients, args.visits_per_patient)
+        ok = check(db)
+
+    if not ok:
+        print("\nOne or more hot queries fell back to a full table scan.")
+        sys.exit(1)
+    print("\nAll hot queries use indexes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+A local stand-in for the Gemini model, for running the app, benchmarks and
+tests without an API key or network.
+
+Set HEALTHMATE_MODEL_FACTORY=benchmarks.fake_llm:fake_model_factory (with
+the repository root on PYTHONPATH) and the agents talk to
+FakeGenerativeModel instead of Gemini; tests pass fake_model_factory, or a
+FakeGenerativeModel, to the agents directly. It answers triage prompts (single and batched) from the
+rule-based triage, echoes chat messages, and can be told to be slow, fail
+or hang so that timeouts, retries and the circuit breaker can be exercised.
+Chat replies can be streamed in chunks, and a FakeChat can be scripted to
+call tools so that multi-turn function calling runs offline too.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+FAKE_LLM_MODEL_NAME = "fake-llm"
+FAKE_LLM_LATENCY_MS = float(os.getenv("HEALTHMATE_FAKE_LLM_LATENCY_MS", "50"))
+# Fraction of calls that raise ServiceUnavailable, and that hang for FAKE_LLM_HANG_S
+FAKE_LLM_ERROR_RATE = float(os.getenv("HEALTHMATE_FAKE_LLM_ERROR_RATE", "0"))
+FAKE_LLM_HANG_RATE = float(os.getenv("HEALTHMATE_FAKE_LLM_HANG_RATE", "0"))
+FAKE_LLM_HANG_S = float(os.getenv("HEALTHMATE_FAKE_LLM_HANG_S", "30"))
+# Streamed chat replies: words per chunk and delay between chunks
+FAKE_LLM_CHUNK_WORDS = int(os.getenv("HEALTHMATE_FAKE_LLM_CHUNK_WORDS", "4"))
+FAKE_LLM_CHUNK_MS = float(os.getenv("HEALTHMATE_FAKE_LLM_CHUNK_MS", "20"))
+
+_PATIENT_LINE = re.compile(r"^\s*(\d+)\. (.*)$", re.MULTILINE)
+_SYMPTOMS_LINE = re.compile(r"^\s*Symptoms: (.*)$", re.MULTILINE)
+
+
+class ServiceUnavailable(Exception):
+    """
+    Named and coded like google.api_core's 503 error, so callers treat it as transient.
+    """
+    code = 503
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeChunk:
+    """
+    One streamed chunk, shaped like the SDK's: candidates[0].content.parts,
+    where each part has .text and .function_call (.name, .args).
+    """
+    def __init__(self, text: str = "", function_call: Optional[Dict[str, Any]] = None):
+        call = function_call or {}
+        part = SimpleNamespace(text=text,
+                               function_call=SimpleNamespace(name=call.get("name", ""), args=call.get("args", {})))
+        self.text = text
+        self.candidates = [SimpleNamespace(content=SimpleNamespace(parts=[part]))]
+
+
+def fake_function_response(name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A tool result as FakeChat expects it back (Gemini takes a protos.Part).
+    """
+    return {"function_response": {"name": name, "response": result}}
+
+
+def triage_responder(prompt: str) -> str:
+    """
+    Answers TriageAgent prompts from the triage rules; anything else is echoed.
+    """
+    from healthmate_ai.tools.triage_rules import get_triage_rules
+    rules = get_triage_rules()
+    if "Patients:" in prompt:
+        patients = _PATIENT_LINE.findall(prompt.split("Patients:", 1)[1])
+        return json.dumps([{"id": int(n), **rules.classify(symptoms)} for n, symptoms in patients])
+    match = _SYMPTOMS_LINE.search(prompt)
+    if match:
+        return json.dumps(rules.classify(match.group(1)))
+    return f"(fake model) {prompt.strip()}"
+
+
+class FakeGenerativeModel:
+    """
+    Mimics genai.GenerativeModel.generate_content and start_chat.
+    """
+    model_name = FAKE_LLM_MODEL_NAME
+
+    def __init__(self,
+                 latency_ms: float = FAKE_LLM_LATENCY_MS,
+                 error_rate: float = FAKE_LLM_ERROR_RATE,
+                 hang_rate: float = FAKE_LLM_HANG_RATE,
+                 hang_s: float = FAKE_LLM_HANG_S,
+                 responder: Callable[[str], str] = triage_responder,
+                 seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_s = hang_s
+        self.responder = responder
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "FakeGenerativeModel":
+        # Module constants are read at import; re-read so tests can change them
+        return cls(latency_ms=float(os.getenv("HEALTHMATE_FAKE_LLM_LATENCY_MS", FAKE_LLM_LATENCY_MS)),
+                   error_rate=float(os.getenv("HEALTHMATE_FAKE_LLM_ERROR_RATE", FAKE_LLM_ERROR_RATE)),
+                   hang_rate=float(os.getenv("HEALTHMATE_FAKE_LLM_HANG_RATE", FAKE_LLM_HANG_RATE)))
+
+    def _simulate(self):
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+        if roll < self.error_rate:
+            time.sleep(self.latency_ms / 1000)
+            raise ServiceUnavailable("503 The model is overloaded (fake)")
+        if roll < self.error_rate + self.hang_rate:
+            time.sleep(self.hang_s)
+        time.sleep(self.latency_ms / 1000)
+
+    def generate_content(self, prompt: str, **kwargs) -> FakeResponse:
+        self._simulate()
+        return FakeResponse(self.responder(prompt))
+
+    def start_chat(self, script: Optional[List[Dict[str, Any]]] = None, **kwargs) -> "FakeChat":
+        return FakeChat(self, script)
+
+    def function_response(self, name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        return fake_function_response(name, result)
+
+
+def fake_model_factory(model_name: str, **kwargs) -> FakeGenerativeModel:
+    """
+    A model_factory for the agents; tools and instructions are ignored.
+    """
+    return FakeGenerativeModel.from_env()
+
+
+class FakeChat:
+    """
+    Mimics genai.ChatSession.send_message, with and without stream=True.
+
+    Without a script every message is echoed back. A script is a list of
+    turns, each {"text": ..., "calls": [{"name": ..., "args": {...}}]},
+    played one per send_message; the agent answers calls by sending back
+    fake_function_response() results. Once the script runs out the chat
+    echoes again.
+    """
+    def __init__(self, model: FakeGenerativeModel, script: Optional[List[Dict[str, Any]]] = None,
+                 chunk_words: int = FAKE_LLM_CHUNK_WORDS, chunk_ms: float = FAKE_LLM_CHUNK_MS):
+        self.model = model
+        self.script = list(script or [])
+        self.chunk_words = chunk_words
+        self.chunk_ms = float(os.getenv("HEALTHMATE_FAKE_LLM_CHUNK_MS", chunk_ms))
+        self.history: List[Any] = []
+
+    def _next_turn(self, content: Union[str, List[Any]]) -> Dict[str, Any]:
+        if self.script:
+            return self.script.pop(0)
+        if isinstance(content, str):
+            return {"text": f"(fake model) Received: {content}"}
+        names = [item["function_response"]["name"] for item in content]
+        return {"text": f"(fake model) Tool results received: {', '.join(names)}"}
+
+    def _chunks(self, turn: Dict[str, Any]) -> List[FakeChunk]:
+        words = turn.get("text", "").split()
+        texts = [" ".join(words[i:i + self.chunk_words]) for i in range(0, len(words), self.chunk_words)]
+        chunks = [FakeChunk(text=text if i == 0 else " " + text) for i, text in enumerate(texts)]
+        return chunks + [FakeChunk(function_call=call) for call in turn.get("calls", [])]
+
+    def _stream(self, chunks: List[FakeChunk]) -> Iterator[FakeChunk]:
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(self.chunk_ms / 1000)
+            yield chunk
+
+    def send_message(self, content: Union[str, List[Any]], stream: bool = False, **kwargs):
+        # The model latency is the time to the first chunk
+        self.model._simulate()
+        turn = self._next_turn(content)
+        self.history.extend([content, turn])
+        chunks = self._chunks(turn)
+        if stream:
+            return self._stream(chunks)
+        time.sleep(max(0, len(chunks) - 1) * self.chunk_ms / 1000)
+        return FakeResponse("".join(chunk.text for chunk in chunks))
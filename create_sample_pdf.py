@@ -1,5 +1,7 @@
 from fpdf import FPDF
+import argparse
 import os
+import random
 
 def create_sample_pdf(path: str):
     pdf = FPDF()
@@ -11,10 +13,60 @@ def create_sample_pdf(path: str):
     pdf.ln(10)
     pdf.cell(200, 10, txt="Findings:", ln=1, align="L")
     pdf.multi_cell(0, 10, txt="Blood Pressure: 120/80 mmHg\nHeart Rate: 72 bpm\nCholesterol: 180 mg/dL\n\nNotes: Patient is in good health. No significant abnormalities detected.")
-    
+
     pdf.output(path)
     print(f"Created sample PDF at {path}")
 
+_NOTE_WORDS = ("patient", "stable", "overnight", "reports", "mild", "pain", "no", "fever", "tolerating",
+               "diet", "ambulating", "with", "assistance", "continue", "current", "medications", "monitor",
+               "telemetry", "labs", "reviewed", "plan", "discussed", "family", "improving", "dyspnea",
+               "resolved", "edema", "decreased", "wound", "clean", "dry", "intact")
+
+def create_large_pdf(path: str, pages: int, seed: int = 0):
+    """
+    Writes a synthetic multi-page discharge summary: a header page followed
+    by daily progress notes, each with vitals, labs and free-text notes, so
+    that text extraction does realistic work on every page.
+    """
+    rng = random.Random(seed)
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=False)
+
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.cell(200, 10, txt="Discharge Summary", ln=1, align="C")
+    pdf.cell(200, 10, txt="Patient: John Doe", ln=1, align="L")
+    pdf.cell(200, 10, txt="Date: 2023-10-27", ln=1, align="L")
+    pdf.multi_cell(0, 8, txt="Admitted with chest pain and shortness of breath. "
+                             "Daily progress notes follow.")
+
+    for day in range(1, pages):
+        pdf.add_page()
+        pdf.set_font("Arial", size=10)
+        pdf.cell(200, 8, txt=f"Progress Note - Hospital Day {day}", ln=1, align="L")
+        pdf.multi_cell(0, 6, txt=(
+            f"Blood Pressure: {rng.randint(100, 170)}/{rng.randint(60, 100)} mmHg\n"
+            f"Heart Rate: {rng.randint(55, 120)} bpm\n"
+            f"Glucose: {rng.randint(70, 250)} mg/dL\n"
+            f"Cholesterol: {rng.randint(140, 280)} mg/dL\n"
+            f"Hemoglobin: {rng.uniform(9, 17):.1f} g/dL\n"
+            f"Creatinine: {rng.uniform(0.6, 2.0):.2f} mg/dL"
+        ))
+        pdf.ln(4)
+        for _ in range(12):
+            pdf.multi_cell(0, 5, txt=" ".join(rng.choice(_NOTE_WORDS) for _ in range(40)) + ".")
+
+    pdf.output(path)
+    print(f"Created {pages}-page PDF at {path}")
+
 if __name__ == "__main__":
-    os.makedirs("healthmate_ai/samples", exist_ok=True)
-    create_sample_pdf("healthmate_ai/samples/sample_report.pdf")
+    parser = argparse.ArgumentParser(description="Create sample PDF reports")
+    parser.add_argument("--pages", type=int, help="Write a synthetic report with this many pages instead")
+    parser.add_argument("--out", help="Output path")
+    args = parser.parse_args()
+
+    if args.pages:
+        create_large_pdf(args.out or f"healthmate_ai/samples/large_report_{args.pages}p.pdf", args.pages)
+    else:
+        os.makedirs("healthmate_ai/samples", exist_ok=True)
+        create_sample_pdf(args.out or "healthmate_ai/samples/sample_report.pdf")
@@ -1,5 +1,7 @@
+from typing import Any, Callable, Iterator, Optional
+
 from healthmate_ai.core.llm_infrastructure import LlmAgent, FunctionTool
-from healthmate_ai.tools.doctor_tools_definitions import get_doctor_schedule, get_patient_list_for_date
+from healthmate_ai.tools.doctor_tools_definitions import get_doctor_schedule, get_doctor_calendar, get_patient_list_for_date
 from healthmate_ai.core.logger import setup_logger
 
 logger = setup_logger("DoctorScheduleAgent")
@@ -8,9 +10,10 @@ class DoctorScheduleAgent:
     """
     LLM-powered agent responsible for helping the doctor know their schedule.
     """
-    def __init__(self):
+    def __init__(self, model_factory: Optional[Callable[..., Any]] = None):
         self.agent = LlmAgent(
             name="DoctorScheduleAgent",
+            model_factory=model_factory,
             instruction="""You are a helpful and efficient assistant for a doctor. 
             Your primary goal is to help the doctor manage and understand their daily schedule.
             
@@ -18,14 +21,16 @@ class DoctorScheduleAgent:
             
             When asked about the schedule:
             1. Use `get_doctor_schedule` to retrieve the appointments.
-            2. Provide a clear, chronological summary of the day.
-            3. Highlight any critical information (though currently we only have basic status).
-            4. If the schedule is empty, inform the doctor politely.
+            2. For questions about several days (e.g. "this week"), use `get_doctor_calendar` with the date range instead.
+            3. Provide a clear, chronological summary of the day.
+            4. Highlight any critical information (though currently we only have basic status).
+            5. If the schedule is empty, inform the doctor politely.
             
             Be concise, professional, and friendly.
             """,
             tools=[
                 FunctionTool(get_doctor_schedule),
+                FunctionTool(get_doctor_calendar),
                 FunctionTool(get_patient_list_for_date)
             ]
         )
@@ -36,3 +41,16 @@ class DoctorScheduleAgent:
         """
         logger.info(f"Processing query: {query}")
         return self.agent.send_message(query)
+
+    def process_query_stream(self, query: str) -> Iterator[str]:
+        """
+        Like process_query, but yields the answer in chunks as the model writes it.
+        """
+        logger.info(f"Processing query: {query}")
+        return self.agent.send_message_stream(query)
+
+    def new_session(self):
+        """
+        Starts a fresh conversation, e.g. when another doctor logs in.
+        """
+        self.agent.reset()
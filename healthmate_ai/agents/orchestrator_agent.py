@@ -1,42 +1,91 @@
 import asyncio
+import os
 import uuid
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterable, AsyncIterator, Iterable, Optional, Union
 
 from healthmate_ai.agents.triage_agent import TriageAgent
+from healthmate_ai.agents.triage_batcher import TriageBatcher
 from healthmate_ai.agents.report_parser_agent import ReportParserAgent
 from healthmate_ai.agents.scheduler_agent import SchedulerAgent
 from healthmate_ai.agents.reminder_agent import ReminderAgent
 from healthmate_ai.tools.database_tool import DatabaseTool
+from healthmate_ai.tools.async_database_tool import AsyncDatabaseTool
 from healthmate_ai.core.session_memory import SessionMemory
 from healthmate_ai.core.memory_bank import MemoryBank
+from healthmate_ai.core.executors import Executors, get_executors
 from healthmate_ai.core.tracing import trace_agent
 from healthmate_ai.core.logger import setup_logger
 
 logger = setup_logger("OrchestratorAgent")
 
+# How many requests of each stage may be in flight at once, across all
+# concurrent admissions. Extra requests wait for a slot instead of piling
+# up in the executor queues.
+STAGE_LIMITS = {
+    "llm": int(os.getenv("HEALTHMATE_LLM_CONCURRENCY", "8")),
+    "pdf": int(os.getenv("HEALTHMATE_PDF_CONCURRENCY", "4")),
+    "db": int(os.getenv("HEALTHMATE_DB_CONCURRENCY", "4")),
+}
+# Admissions processed at once by process_patient_requests_batch
+BATCH_CONCURRENCY = int(os.getenv("HEALTHMATE_BATCH_CONCURRENCY", "16"))
+
+# Marks the end of the input queue for batch workers
+_DONE = object()
+
 class OrchestratorAgent:
-    def __init__(self):
-        self.db_tool = DatabaseTool()
+    def __init__(self,
+                 executors: Optional[Executors] = None,
+                 db_tool: Optional[DatabaseTool] = None,
+                 async_db: Optional[AsyncDatabaseTool] = None,
+                 triage_agent: Optional[TriageAgent] = None,
+                 report_agent: Optional[ReportParserAgent] = None,
+                 scheduler_agent: Optional[SchedulerAgent] = None,
+                 reminder_agent: Optional[ReminderAgent] = None):
+        # Long-running processes pass in the shared instances from AppContext;
+        # anything not passed is created here
+        self.db_tool = db_tool or DatabaseTool()
+        # Blocking LLM/IO calls go to threads and PDF parsing to processes,
+        # so triage and report parsing actually overlap
+        self.executors = executors or get_executors()
+        # All DB access from the event loop goes through the async facade
+        self.async_db = async_db or AsyncDatabaseTool(self.db_tool)
         self.session = SessionMemory()
-        self.memory_bank = MemoryBank(self.db_tool)
+        self.memory_bank = MemoryBank(self.async_db)
         
-        self.triage_agent = TriageAgent()
-        self.report_agent = ReportParserAgent()
-        self.scheduler_agent = SchedulerAgent()
+        self.triage_agent = triage_agent or TriageAgent()
+        # Concurrent admissions share triage model calls; the batcher applies
+        # the "llm" limit per batch rather than per patient
+        self.triage_batcher = TriageBatcher(self.triage_agent, self.executors,
+                                            max_in_flight=STAGE_LIMITS["llm"])
+        self.report_agent = report_agent or ReportParserAgent(self.executors, db_path=self.db_tool.db_path)
+        self.scheduler_agent = scheduler_agent or SchedulerAgent()
         # Reminder agent is usually a background process, but we can trigger it here for simulation
-        self.reminder_agent = ReminderAgent(self.db_tool)
+        self.reminder_agent = reminder_agent or ReminderAgent(self.db_tool)
+        self._stage_limits: Dict[str, asyncio.Semaphore] = {}
+        self._stage_limits_loop = None
+
+    def _limit(self, stage: str) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; rebuild them if the agent is
+        # reused from a new asyncio.run()
+        loop = asyncio.get_running_loop()
+        if self._stage_limits_loop is not loop:
+            self._stage_limits = {name: asyncio.Semaphore(size) for name, size in STAGE_LIMITS.items()}
+            self._stage_limits_loop = loop
+        return self._stage_limits[stage]
 
     @trace_agent
     async def process_patient_request(self, 
                                       patient_id: str, 
                                       symptoms: str, 
-                                      report_path: Optional[str] = None) -> Dict[str, Any]:
+                                      report_path: Optional[str] = None,
+                                      run_reminders: bool = True) -> Dict[str, Any]:
         
         logger.info(f"Starting workflow for patient {patient_id}")
         
         # 1. Load Context
-        context = self.memory_bank.get_patient_context(patient_id)
+        async with self._limit("db"):
+            context = await self.memory_bank.get_patient_context(patient_id)
         self.session.add_message("system", f"Loaded context for {patient_id}")
 
         # 2. Parallel Execution: Triage & Report Parsing
@@ -48,40 +97,47 @@ class OrchestratorAgent:
         triage_result = results[0]
         report_result = results[1] if report_path else None
 
-        # 3. Store Visit Data
-        visit_id = str(uuid.uuid4())
-        self.db_tool.add_visit({
-            "visit_id": visit_id,
+        # 3. Build Visit Record
+        visit = {
+            "visit_id": str(uuid.uuid4()),
             "patient_id": patient_id,
             "symptoms": symptoms,
             "triage_summary": triage_result.get("summary"),
             "severity": triage_result.get("severity"),
             "department": triage_result.get("department"),
             "timestamp": datetime.now().isoformat()
-        })
+        }
 
         # 4. Sequential Execution: Scheduling
         appointment = None
+        reminder = None
         if triage_result.get("department"):
             # Auto-schedule for today for simplicity
             today = datetime.now().strftime("%Y-%m-%d")
-            appointment = self.scheduler_agent.schedule_appointment(
+            appointment = await self.executors.run_io(
+                self.scheduler_agent.schedule_appointment,
                 patient_id, 
                 triage_result["department"], 
                 today
             )
             
             if appointment and appointment.get("status") == "confirmed":
-                self.db_tool.add_appointment(appointment)
                 # Schedule reminder
-                self.db_tool.add_reminder({
+                reminder = {
                     "reminder_id": str(uuid.uuid4()),
                     "appointment_id": appointment["appointment_id"],
                     "reminder_date": today # Mock: remind immediately
-                })
+                }
+
+        # Persist visit, appointment and reminder atomically in one commit
+        async with self._limit("db"):
+            await self.async_db.run_in_transaction(self._persist_visit, visit, appointment, reminder)
 
         # 5. Trigger Reminder Cycle (Simulation)
-        self.reminder_agent.run_cycle()
+        # Not under the "db" limit: the cycle spends most of its time sending,
+        # on the I/O threads, and its few writes queue on the writer thread
+        if run_reminders:
+            await self.reminder_agent.run_cycle_async(self.async_db, self.executors)
 
         # 6. Final Summary
         summary = {
@@ -94,8 +150,107 @@ class OrchestratorAgent:
         logger.info("Workflow completed.")
         return summary
 
+    @staticmethod
+    def _persist_visit(db_tool: DatabaseTool,
+                       visit: Dict[str, Any],
+                       appointment: Optional[Dict[str, Any]],
+                       reminder: Optional[Dict[str, Any]]):
+        db_tool.add_visit(visit)
+        if reminder:
+            db_tool.add_appointment(appointment)
+            db_tool.add_reminder(reminder)
+
     async def _run_triage(self, symptoms: str):
-        return self.triage_agent.analyze_symptoms(symptoms)
+        return await self.triage_batcher.analyze(symptoms)
 
     async def _run_report_parsing(self, path: str):
-        return self.report_agent.process_report(path)
+        async with self._limit("pdf"):
+            # The cache lookup and hashing are I/O, and the page ranges go to
+            # the CPU processes, so this thread mostly waits
+            return await self.executors.run_io(self.report_agent.process_report, path)
+
+    async def process_patient_requests_batch(self,
+                                             requests: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+                                             max_concurrency: int = BATCH_CONCURRENCY,
+                                             queue_size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Admits many patients concurrently and yields each outcome as soon as it
+        completes (not in input order):
+
+            async for outcome in orchestrator.process_patient_requests_batch(arrivals):
+                ...
+
+        Each request is a dict with "patient_id", "symptoms" and an optional
+        "report_path". Each outcome has the request's "index" and "request",
+        a "status" of "ok" or "error", and the "result" or "error" message.
+        A failing request never stops the batch.
+
+        At most max_concurrency requests run at once, and requests are read
+        from `requests` only as fast as a bounded queue (queue_size, default
+        2 * max_concurrency) drains, so a large or endless source is never
+        loaded into memory. Per-stage limits (STAGE_LIMITS) still apply.
+        The reminder cycle runs once after the batch instead of per request.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or 2 * max_concurrency)
+        outcomes: asyncio.Queue = asyncio.Queue(maxsize=max_concurrency)
+        source_error: list = []
+
+        async def _feed():
+            try:
+                index = 0
+                if hasattr(requests, "__aiter__"):
+                    async for request in requests:
+                        await queue.put((index, request))
+                        index += 1
+                else:
+                    for request in requests:
+                        await queue.put((index, request))
+                        index += 1
+            except Exception as e:
+                logger.error(f"Batch input failed after {index} requests: {e}")
+                source_error.append(e)
+            # Not in a finally: once cancelled nobody drains the queue
+            for _ in range(max_concurrency):
+                await queue.put(_DONE)
+
+        async def _work():
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    await outcomes.put(_DONE)
+                    return
+                index, request = item
+                await outcomes.put(await self._process_isolated(index, request))
+
+        tasks = [asyncio.create_task(_feed())]
+        tasks += [asyncio.create_task(_work()) for _ in range(max_concurrency)]
+        try:
+            remaining = max_concurrency
+            while remaining:
+                outcome = await outcomes.get()
+                if outcome is _DONE:
+                    remaining -= 1
+                    continue
+                yield outcome
+        finally:
+            # Also reached when the caller stops iterating early
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        await self.reminder_agent.run_cycle_async(self.async_db, self.executors)
+        if source_error:
+            raise source_error[0]
+
+    async def _process_isolated(self, index: int, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            result = await self.process_patient_request(
+                request["patient_id"],
+                request["symptoms"],
+                request.get("report_path"),
+                run_reminders=False
+            )
+            return {"index": index, "request": request, "status": "ok", "result": result}
+        except Exception as e:
+            logger.warning(f"Batch request {index} failed: {e}")
+            return {"index": index, "request": request, "status": "error", "error": str(e)}
@@ -1,5 +1,7 @@
+from typing import Any, Callable, Iterator, Optional
+
 from healthmate_ai.core.llm_infrastructure import LlmAgent, FunctionTool
-from healthmate_ai.tools.doctor_tools_definitions import get_patient_insight
+from healthmate_ai.tools.doctor_tools_definitions import get_patient_insight, find_patients_by_lab_result
 from healthmate_ai.core.logger import setup_logger
 
 logger = setup_logger("PatientInsightAgent")
@@ -8,13 +10,19 @@ class PatientInsightAgent:
     """
     LLM-powered agent responsible for providing detailed insights about patients.
     """
-    def __init__(self):
+    def __init__(self, model_factory: Optional[Callable[..., Any]] = None):
         self.agent = LlmAgent(
             name="PatientInsightAgent",
+            model_factory=model_factory,
             instruction="""You are a highly knowledgeable medical insight assistant.
             Your role is to assist the doctor by providing comprehensive summaries of patient data.
             
             You have access to `get_patient_insight` to fetch patient details, history, and reports.
+            It returns the most recent visits and reports first; if the doctor asks about older
+            history, call it again with the returned `next_visits_cursor` / `next_reports_cursor`.
+            
+            For questions across patients ("who has glucose above 180?", "BP over 140 this month"),
+            use `find_patients_by_lab_result` instead of reading patients one by one.
             
             When asked about a patient:
             1. Use the tool to get the data.
@@ -25,7 +33,8 @@ class PatientInsightAgent:
             Maintain a professional, clinical tone.
             """,
             tools=[
-                FunctionTool(get_patient_insight)
+                FunctionTool(get_patient_insight),
+                FunctionTool(find_patients_by_lab_result)
             ]
         )
 
@@ -35,3 +44,16 @@ class PatientInsightAgent:
         """
         logger.info(f"Processing query: {query}")
         return self.agent.send_message(query)
+
+    def process_query_stream(self, query: str) -> Iterator[str]:
+        """
+        Like process_query, but yields the answer in chunks as the model writes it.
+        """
+        logger.info(f"Processing query: {query}")
+        return self.agent.send_message_stream(query)
+
+    def new_session(self):
+        """
+        Starts a fresh conversation, e.g. when another doctor logs in.
+        """
+        self.agent.reset()
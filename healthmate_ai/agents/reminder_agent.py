@@ -1,38 +1,78 @@
+import asyncio
 import time
-from typing import List
+import uuid
+from typing import List, Optional, Tuple
+from healthmate_ai.tools.async_database_tool import AsyncDatabaseTool
 from healthmate_ai.tools.database_tool import DatabaseTool
 from healthmate_ai.tools.notification_tool import NotificationTool
+from healthmate_ai.tools.records import Reminder
+from healthmate_ai.core.executors import Executors
 from healthmate_ai.core.tracing import trace_agent
 from healthmate_ai.core.logger import setup_logger
 
 logger = setup_logger("ReminderAgent")
 
 class ReminderAgent:
-    def __init__(self, db_tool: DatabaseTool):
+    def __init__(self, db_tool: DatabaseTool, worker_id: Optional[str] = None, batch_size: int = 100):
         self.db_tool = db_tool
         self.notifier = NotificationTool()
+        # Identifies this worker's leases; several workers may drain the queue at once
+        self.worker_id = worker_id or f"reminder-{uuid.uuid4().hex[:8]}"
+        self.batch_size = batch_size
 
     @trace_agent
     def run_cycle(self):
+        """
+        run_cycle_async for callers without an event loop: runs it on a
+        private loop, with database and I/O threads of its own.
+        """
+        async_db = AsyncDatabaseTool(self.db_tool, reader_threads=1)
+        executors = Executors(io_workers=1, cpu_workers=0)
+        try:
+            asyncio.run(self.run_cycle_async(async_db, executors))
+        finally:
+            async_db.close()
+            executors.shutdown()
+
+    async def run_cycle_async(self, async_db: AsyncDatabaseTool, executors: Executors):
         """
         Runs a single cycle of checking and sending reminders.
+        Claims due reminders in leased batches until none are left. Only the
+        claim, mark and release calls go to the database writer thread; the
+        reminders are sent on the I/O threads, so admissions can write while
+        notifications go out.
         """
         logger.info("Running reminder cycle...")
-        pending = self.db_tool.get_pending_reminders()
-        
-        for reminder in pending:
-            self._process_reminder(reminder)
+        failed: List[str] = []
+        while True:
+            batch = await async_db.claim_due_reminders(self.worker_id, self.batch_size)
+            if not batch:
+                break
 
-    def _process_reminder(self, reminder):
+            sent, batch_failed = await executors.run_io(self._send_batch, batch)
+            failed.extend(batch_failed)
+            await async_db.mark_reminders_sent(sent)
+            logger.info(f"Sent {len(sent)}/{len(batch)} reminders in batch.")
+
+            if len(batch) < self.batch_size:
+                break
+
+        # Released only now, so failures are not re-claimed within this cycle
+        await async_db.release_reminders(failed)
+
+    def _send_batch(self, batch: List[Reminder]) -> Tuple[List[str], List[str]]:
+        # IDs of the reminders sent and of those that failed
+        sent, failed = [], []
+        for reminder in batch:
+            (sent if self._process_reminder(reminder) else failed).append(reminder.reminder_id)
+        return sent, failed
+
+    def _process_reminder(self, reminder: Reminder) -> bool:
         # In a real app, we'd fetch patient details to get phone/email
         # Here we mock it
-        logger.info(f"Processing reminder {reminder['reminder_id']}")
-        
-        success = self.notifier.send_sms("555-0123", f"Reminder for appointment {reminder['appointment_id']}")
+        logger.info(f"Processing reminder {reminder.reminder_id}")
         
-        if success:
-            self.db_tool.mark_reminder_sent(reminder['reminder_id'])
-            logger.info(f"Reminder {reminder['reminder_id']} sent and marked.")
+        return self.notifier.send_sms("555-0123", f"Reminder for appointment {reminder.appointment_id}")
 
     def start_loop(self, interval=60):
         """
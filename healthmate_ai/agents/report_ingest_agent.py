@@ -0,0 +1,285 @@
+"""
+Bulk ingestion of report files, for nightly drops of lab PDFs.
+
+Every PDF under a directory is matched to a patient, parsed on the CPU
+worker processes (one whole report per task) and stored with
+add_medical_report_bulk, a batch per transaction. Each file's outcome is
+checkpointed in the report_ingest table in the same transaction as its
+report, so an interrupted run resumes where it stopped and a file is
+stored once however often the directory is ingested. Failed files are
+retried on the next run, and a file that changed after it was ingested
+replaces its report (keeping its report_id).
+
+A worker process that dies fails every report its pool was parsing, and
+which report killed it is unknown. Those reports are parsed again one at
+a time on a fresh pool, so only a report that kills a worker on its own
+is marked failed.
+
+A file is matched to a patient by its name ("<patient_id>__anything.pdf"
+or "<patient_id>.pdf"), its directory ("<patient_id>/anything.pdf"), or
+failing those the "Patient:" name printed in the report.
+"""
+
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from healthmate_ai.agents.report_parser_agent import ReportParserAgent, parse_report_file
+from healthmate_ai.core.db_pool import get_pool
+from healthmate_ai.core.executors import Executors, get_executors
+from healthmate_ai.core.logger import setup_logger
+from healthmate_ai.tools.database_tool import DatabaseTool
+from healthmate_ai.tools.records import Patient
+from healthmate_ai.tools.report_cache import file_digest
+
+logger = setup_logger("ReportIngestAgent")
+
+# Reports being parsed at once, and reports written per transaction
+INGEST_IN_FLIGHT = int(os.getenv("HEALTHMATE_INGEST_IN_FLIGHT", "16"))
+INGEST_BATCH_SIZE = int(os.getenv("HEALTHMATE_INGEST_BATCH_SIZE", "200"))
+INGEST_EXTENSIONS = (".pdf",)
+# Separates the patient ID from the rest of a file name
+PATIENT_ID_SEPARATOR = "__"
+# Failures listed in the summary; all of them are in report_ingest
+INGEST_MAX_FAILURES_SHOWN = 20
+
+_CHECKPOINT_UPSERT = '''
+    INSERT INTO report_ingest (path, size_bytes, mtime_ns, status, report_id, patient_id, error, attempts, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+    ON CONFLICT(path) DO UPDATE SET
+        size_bytes = excluded.size_bytes, mtime_ns = excluded.mtime_ns, status = excluded.status,
+        report_id = COALESCE(excluded.report_id, report_ingest.report_id),
+        patient_id = excluded.patient_id, error = excluded.error,
+        attempts = report_ingest.attempts + 1, updated_at = excluded.updated_at
+'''
+
+# Range scan of the primary key for the paths under a root
+_CHECKPOINT_SELECT = '''
+    SELECT path, size_bytes, mtime_ns, status, report_id FROM report_ingest
+    WHERE path >= ? AND path < ?
+'''
+
+# (path, size_bytes, mtime_ns, patient_id matched from the path, report_id
+# of an earlier ingestion of the path)
+_Item = Tuple[str, int, int, Optional[str], Optional[str]]
+# (report to store or None, checkpoint row, earlier report it replaces)
+_Write = Tuple[Optional[Dict[str, Any]], tuple, Optional[str]]
+
+
+def discover_reports(root: str) -> Iterator[str]:
+    """
+    Absolute paths of the report files under root, in a stable order.
+    """
+    for dirpath, dirnames, filenames in os.walk(os.path.abspath(root)):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(INGEST_EXTENSIONS):
+                yield os.path.join(dirpath, name)
+
+
+def _parse_timed(file_path: str) -> Tuple[Dict[str, Any], float]:
+    # Timed in the worker, so the cache records the parse and not the queueing
+    start = time.perf_counter()
+    result = parse_report_file(file_path)
+    return result, (time.perf_counter() - start) * 1000
+
+
+class ReportIngestAgent:
+    def __init__(self,
+                 db_tool: Optional[DatabaseTool] = None,
+                 report_agent: Optional[ReportParserAgent] = None,
+                 executors: Optional[Executors] = None,
+                 in_flight: int = INGEST_IN_FLIGHT,
+                 batch_size: int = INGEST_BATCH_SIZE):
+        self.db_tool = db_tool or DatabaseTool()
+        self.executors = executors or get_executors()
+        self.report_agent = report_agent or ReportParserAgent(self.executors, db_path=self.db_tool.db_path)
+        self.in_flight = max(1, in_flight)
+        self.batch_size = max(1, batch_size)
+        # The database tool's pool, so a batch of reports and its checkpoint
+        # rows commit together
+        self._pool = get_pool(self.db_tool.db_path)
+
+    def ingest(self, root: str) -> Dict[str, Any]:
+        """
+        Ingests every report under root not already ingested unchanged.
+        Returns counts, throughput and the first failures.
+        """
+        root = os.path.abspath(root)
+        if not os.path.isdir(root):
+            raise NotADirectoryError(root)
+        checkpoints = self._checkpoints(root)
+        stats: Dict[str, Any] = {"discovered": 0, "skipped": 0, "ingested": 0, "cached": 0, "failed": 0,
+                                 "bytes": 0, "failures": []}
+        writes: List[_Write] = []
+        pending: Dict[Future, Tuple[_Item, str, Executor]] = {}
+        start = time.perf_counter()
+
+        def finish(item: _Item, result: Dict[str, Any]):
+            report, checkpoint = self._outcome(root, item, result)
+            stats["ingested" if report else "failed"] += 1
+            if report is None and len(stats["failures"]) < INGEST_MAX_FAILURES_SHOWN:
+                stats["failures"].append((item[0], checkpoint[6]))
+            writes.append((report, checkpoint, item[4]))
+            if len(writes) >= self.batch_size:
+                self._write(writes)
+
+        def parsed(item: _Item, digest: str, result: Dict[str, Any], parse_ms: float):
+            self.report_agent.cache_report(digest, result, parse_ms)
+            finish(item, result)
+
+        def submit(item: _Item, digest: str):
+            pool = self.executors.cpu
+            try:
+                future = pool.submit(_parse_timed, item[0])
+            except BrokenProcessPool:
+                # Broken by a report still pending, which collect() sorts out
+                self.executors.restart_cpu(pool)
+                pool = self.executors.cpu
+                future = pool.submit(_parse_timed, item[0])
+            pending[future] = (item, digest, pool)
+
+        def take(futures) -> List[Tuple[_Item, str]]:
+            # Finishes the reports of done futures; returns those lost to a dead worker
+            crashed = []
+            for future in futures:
+                item, digest, pool = pending.pop(future)
+                try:
+                    result, parse_ms = future.result()
+                except BrokenProcessPool:
+                    self.executors.restart_cpu(pool)
+                    crashed.append((item, digest))
+                    continue
+                except Exception as e:
+                    result, parse_ms = {"status": "error", "error": f"worker failed: {e}"}, 0.0
+                parsed(item, digest, result, parse_ms)
+            return crashed
+
+        def collect(block: bool):
+            finished, _ = wait(list(pending), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            crashed = take(finished)
+            if crashed:
+                # The rest of the broken pool's reports fail the same way
+                crashed += take(wait(list(pending))[0])
+                for item, digest in crashed:
+                    parsed(item, digest, *self._parse_alone(item[0]))
+
+        try:
+            for path in discover_reports(root):
+                stats["discovered"] += 1
+                try:
+                    stat = os.stat(path)
+                    size, mtime, status, report_id = checkpoints.get(path, (None, None, None, None))
+                    if status == "done" and (size, mtime) == (stat.st_size, stat.st_mtime_ns):
+                        stats["skipped"] += 1
+                        continue
+                    item = (path, stat.st_size, stat.st_mtime_ns, self._match_path(root, path), report_id)
+                    stats["bytes"] += stat.st_size
+                    # Hashed here while the workers parse earlier files
+                    digest = file_digest(path)
+                except OSError as e:
+                    finish((path, 0, 0, None, None), {"status": "error", "error": str(e)})
+                    continue
+
+                cached = self.report_agent.cached_report(path, digest)
+                if cached is not None:
+                    stats["cached"] += 1
+                    finish(item, cached)
+                    continue
+                submit(item, digest)
+                if len(pending) >= self.in_flight:
+                    collect(block=True)
+                elif pending:
+                    collect(block=False)
+            while pending:
+                collect(block=True)
+        finally:
+            # Whatever finished before an interruption is kept
+            for future in pending:
+                future.cancel()
+            if writes:
+                self._write(writes)
+
+        elapsed = time.perf_counter() - start
+        processed = stats["ingested"] + stats["failed"]
+        stats["elapsed_s"] = elapsed
+        stats["reports_per_s"] = processed / elapsed if elapsed else 0.0
+        stats["mb_per_s"] = stats["bytes"] / elapsed / (1024 * 1024) if elapsed else 0.0
+        logger.info(f"Ingested {stats['ingested']} reports from {root} ({stats['failed']} failed, "
+                    f"{stats['skipped']} already done) in {elapsed:.1f}s")
+        return stats
+
+    def _checkpoints(self, root: str) -> Dict[str, Tuple[int, int, str, Optional[str]]]:
+        # path -> (size_bytes, mtime_ns, status, report_id)
+        prefix = root.rstrip(os.sep) + os.sep
+        rows = self._pool.get_connection().execute(
+            _CHECKPOINT_SELECT, (prefix, prefix[:-1] + chr(ord(os.sep) + 1))).fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def _parse_alone(self, path: str) -> Tuple[Dict[str, Any], float]:
+        # Nothing else runs on the pool, so if the worker dies again this
+        # report is the cause
+        pool = self.executors.cpu
+        try:
+            return pool.submit(_parse_timed, path).result()
+        except BrokenProcessPool:
+            self.executors.restart_cpu(pool)
+            return {"status": "error", "error": "worker process died parsing this report"}, 0.0
+        except Exception as e:
+            return {"status": "error", "error": f"worker failed: {e}"}, 0.0
+
+    def _match_path(self, root: str, path: str) -> Optional[str]:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        candidates = [stem.split(PATIENT_ID_SEPARATOR)[0]]
+        parent = os.path.dirname(path)
+        if parent != root:
+            candidates.append(os.path.basename(parent))
+        for candidate in candidates:
+            if candidate and self.db_tool.get_patient(candidate) is not None:
+                return candidate
+        return None
+
+    def _match_content(self, data: Dict[str, Any]) -> Optional[str]:
+        fields = data.get("extracted_fields") or {}
+        patient: Optional[Patient] = None
+        if isinstance(fields.get("patient_id"), str):
+            patient = self.db_tool.get_patient(fields["patient_id"])
+        if patient is None and isinstance(fields.get("patient"), str):
+            patient = self.db_tool.find_patient_by_name(fields["patient"])
+        return patient.patient_id if patient else None
+
+    def _outcome(self, root: str, item: _Item, result: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], tuple]:
+        """
+        The report to store (None on failure) and the file's checkpoint row.
+        A file ingested before keeps its report_id; if it now fails, the
+        checkpoint keeps pointing at the earlier report.
+        """
+        path, size, mtime, patient_id, previous_id = item
+        report = error = None
+        if result["status"] != "success":
+            error = result.get("error") or "parse failed"
+        else:
+            patient_id = patient_id or self._match_content(result["data"])
+            if patient_id is None:
+                error = "no matching patient"
+            else:
+                data = {k: v for k, v in result["data"].items() if k != "cached"}
+                report = {"report_id": previous_id or f"rep_{uuid.uuid4().hex[:12]}", "patient_id": patient_id,
+                          "extracted_data": data}
+        checkpoint = (path, size, mtime, "failed" if report is None else "done",
+                      report["report_id"] if report else None, patient_id, error, int(time.time()))
+        if error:
+            logger.warning(f"Could not ingest {os.path.relpath(path, root)}: {error}")
+        return report, checkpoint
+
+    def _write(self, writes: List[_Write]):
+        with self._pool.transaction() as conn:
+            # A changed file's new report takes the place of the old one
+            replaced = [previous_id for report, _, previous_id in writes if report is not None and previous_id]
+            if replaced:
+                self.db_tool.delete_medical_reports(replaced)
+            self.db_tool.add_medical_report_bulk(report for report, _, _ in writes if report is not None)
+            conn.executemany(_CHECKPOINT_UPSERT, [checkpoint for _, checkpoint, _ in writes])
+        writes.clear()
@@ -1,28 +1,109 @@
-from typing import Dict, Any
-from healthmate_ai.tools.pdf_parser_tool import PDFParserTool
+import time
+from typing import Dict, Any, Optional
+from healthmate_ai.tools.pdf_parser_tool import PARSER_VERSION, PDF_MAX_PAGES, REPORT_PREVIEW_CHARS, PDFParserTool
+from healthmate_ai.tools.report_cache import ReportCache, file_digest
+from healthmate_ai.core.executors import Executors
 from healthmate_ai.core.tracing import trace_agent
 from healthmate_ai.core.logger import setup_logger
 
 logger = setup_logger("ReportParserAgent")
 
+# One parser per process; worker processes create theirs on first use
+_pdf_tool: Optional[PDFParserTool] = None
+
+# Everything that changes what _parse returns for the same file
+REPORT_CACHE_VERSION = f"{PARSER_VERSION}:stream:{PDF_MAX_PAGES}:{REPORT_PREVIEW_CHARS}"
+
+
+def parse_report_file(file_path: str) -> Dict[str, Any]:
+    """
+    Parses a report into {"status": ..., "data" | "error": ...}.
+    Module-level so it can be sent to a worker process (see core.executors).
+    """
+    global _pdf_tool
+    try:
+        if _pdf_tool is None:
+            _pdf_tool = PDFParserTool()
+    except ImportError as e:
+        return {"status": "error", "error": str(e)}
+    return _parse(_pdf_tool, file_path)
+
+
+def _parse(pdf_tool: PDFParserTool, file_path: str) -> Dict[str, Any]:
+    logger.info(f"Processing report: {file_path}")
+    try:
+        # Only the fields and a preview are kept, not the whole text, since
+        # the result travels on in the admission summary
+        data = pdf_tool.parse_report_stream(file_path)
+        # In a real agent, we might post-process this data with an LLM
+        # to extract specific lab values.
+        return {
+            "status": "success",
+            "data": data
+        }
+    except Exception as e:
+        logger.error(f"Report processing failed: {e}")
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+
+
 class ReportParserAgent:
-    def __init__(self):
-        self.pdf_tool = PDFParserTool()
+    def __init__(self, executors: Optional[Executors] = None, cache: Optional[ReportCache] = None,
+                 db_path: str = "healthmate.db"):
+        # With executors, the pages of a report are split across the CPU
+        # worker processes; process_report then only waits and joins
+        self.executors = executors
+        self.cache = cache or ReportCache(db_path)
+        self._pdf_tool: Optional[PDFParserTool] = None
+
+    @property
+    def pdf_tool(self) -> PDFParserTool:
+        # Built on first report, so starting up does not load the PDF library
+        # (or start the worker processes)
+        if self._pdf_tool is None:
+            # Without worker processes the "CPU pool" is the I/O threads, and
+            # a thread waiting there for its own page ranges could deadlock
+            parallel = self.executors is not None and self.executors.cpu_workers > 0
+            self._pdf_tool = PDFParserTool(executor=self.executors.cpu if parallel else None)
+        return self._pdf_tool
 
     @trace_agent
     def process_report(self, file_path: str) -> Dict[str, Any]:
-        logger.info(f"Processing report: {file_path}")
+        """
+        Parses a report, or returns the cached result if a file with the
+        same content was parsed before (by any process).
+        """
         try:
-            data = self.pdf_tool.parse_report(file_path)
-            # In a real agent, we might post-process this data with an LLM
-            # to extract specific lab values.
-            return {
-                "status": "success",
-                "data": data
-            }
-        except Exception as e:
-            logger.error(f"Report processing failed: {e}")
-            return {
-                "status": "error",
-                "error": str(e)
-            }
+            digest = file_digest(file_path)
+        except OSError:
+            # Reported by _parse like any other unreadable report
+            return _parse(self.pdf_tool, file_path)
+
+        result = self.cached_report(file_path, digest)
+        if result is not None:
+            return result
+
+        start = time.perf_counter()
+        result = _parse(self.pdf_tool, file_path)
+        self.cache_report(digest, result, (time.perf_counter() - start) * 1000)
+        return result
+
+    def cached_report(self, file_path: str, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        The result process_report would return for a file with this digest,
+        if one was parsed before, else None.
+        """
+        data = self.cache.get(digest, REPORT_CACHE_VERSION)
+        if data is None:
+            return None
+        logger.info(f"Report cache hit: {file_path}")
+        return {"status": "success", "data": {**data, "file_path": file_path, "cached": True}}
+
+    def cache_report(self, digest: str, result: Dict[str, Any], parse_ms: float):
+        if result["status"] == "success":
+            # The memory figures stay: a cache hit reports what parsing the
+            # report took
+            data = {k: v for k, v in result["data"].items() if k != "file_path"}
+            self.cache.put(digest, REPORT_CACHE_VERSION, data, parse_ms)
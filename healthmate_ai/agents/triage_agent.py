@@ -1,27 +1,100 @@
+import json
 import os
-import google.generativeai as genai
-from typing import Dict, Any
+import threading
+import time
+from typing import Callable, Dict, Any, List, Optional
 from healthmate_ai.core.tracing import trace_agent
+from healthmate_ai.core.llm_infrastructure import LlmClient, get_llm_client, load_genai
 from healthmate_ai.core.logger import setup_logger
+from healthmate_ai.tools.triage_cache import TriageCache
+from healthmate_ai.tools.triage_rules import get_triage_rules
 
 logger = setup_logger("TriageAgent")
 
+TRIAGE_MODEL = "gemini-2.5-flash-lite"
+# Bump whenever the prompt below changes, so cached answers to the old
+# prompt are no longer served
+TRIAGE_PROMPT_VERSION = "1"
+
+TRIAGE_SEVERITIES = ("Low", "Medium", "High", "Critical")
+TRIAGE_DEPARTMENTS = ("General", "Cardiology", "Neurology", "Orthopedics")
+
+def _strip_code_fence(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:-3]
+    elif text.startswith("```"):
+        text = text[3:-3]
+    return text.strip()
+
+def _validated(answer: Any) -> Optional[Dict[str, Any]]:
+    # One item of a batched reply, or None if it is not a usable triage
+    if not isinstance(answer, dict) or not isinstance(answer.get("summary"), str):
+        return None
+    severity = next((s for s in TRIAGE_SEVERITIES if s.lower() == str(answer.get("severity", "")).lower()), None)
+    department = next((d for d in TRIAGE_DEPARTMENTS if d.lower() == str(answer.get("department", "")).lower()), None)
+    if not severity or not department:
+        return None
+    return {"severity": severity, "department": department, "summary": answer["summary"]}
+
 class TriageAgent:
-    def __init__(self):
+    def __init__(self, cache: Optional[TriageCache] = None, db_path: str = "healthmate.db",
+                 llm_client: Optional[LlmClient] = None, model_factory: Optional[Callable[..., Any]] = None):
         self.api_key = os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
+        self.model_name = TRIAGE_MODEL
+        self.cache = cache or TriageCache(db_path)
+        # Shared deadline, retry budget and circuit breaker for model calls
+        self.llm = llm_client or get_llm_client()
+        # Builds the model instead of Gemini (model_factory(model_name)), e.g. a local stand-in
+        self.model_factory = model_factory
+        self._model = None
+        self._model_lock = threading.Lock()
+        if model_factory is None and not self.api_key:
             logger.warning("GEMINI_API_KEY not found. Triage agent will use mock responses.")
-        else:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
+
+    @property
+    def model(self):
+        """
+        The model, created (and the SDK loaded) on first use; None means mock triage.
+        """
+        with self._model_lock:
+            if self._model is None:
+                if self.model_factory is not None:
+                    self._model = self.model_factory(self.model_name)
+                    # Keeps its answers apart from Gemini's in the triage cache
+                    self.model_name = getattr(self._model, "model_name", self.model_name)
+                elif self.api_key:
+                    genai = load_genai()
+                    genai.configure(api_key=self.api_key)
+                    self._model = genai.GenerativeModel(self.model_name)
+            return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Hit rate and model latency saved by the triage cache.
+        """
+        return self.cache.stats()
 
     @trace_agent
     def analyze_symptoms(self, symptoms: str) -> Dict[str, Any]:
         logger.info(f"Analyzing symptoms: {symptoms}")
         
-        if not self.api_key:
+        if self.model is None:
             return self._mock_analysis(symptoms)
 
+        # Only model answers are cached; the mock fallback is already instant
+        cache_key = TriageCache.make_key(symptoms, TRIAGE_PROMPT_VERSION, self.model_name)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info("Triage cache hit")
+            return cached
+        return self._analyze_uncached(symptoms, cache_key)
+
+    def _analyze_uncached(self, symptoms: str, cache_key: str) -> Dict[str, Any]:
         prompt = f"""
         You are a medical triage assistant. Analyze the following symptoms and provide:
         1. Severity (Low, Medium, High, Critical)
@@ -40,44 +113,100 @@ class TriageAgent:
         """
         
         try:
-            response = self.model.generate_content(prompt)
-            # Simple parsing assuming the model returns valid JSON or close to it
-            # In production, use structured output parsing or regex
-            import json
-            text = response.text.strip()
-            if text.startswith("```json"):
-                text = text[7:-3]
-            return json.loads(text)
+            start = time.perf_counter()
+            response = self.llm.call_sync(self.model.generate_content, prompt)
+            latency_ms = (time.perf_counter() - start) * 1000
+            result = _validated(json.loads(_strip_code_fence(response.text)))
         except Exception as e:
             # Log a clean warning instead of a full error stack trace
             logger.warning(f"LLM Triage unavailable ({str(e)}). Using fallback logic.")
             return self._mock_analysis(symptoms)
+        if result is None:
+            # Never cached, or every process would be served it for the whole TTL
+            logger.warning("LLM Triage answer unusable. Using fallback logic.")
+            return self._mock_analysis(symptoms)
+        self.cache.put(cache_key, result, latency_ms)
+        return result
+
+    @trace_agent
+    def analyze_symptoms_batch(self, symptoms_list: List[str]) -> List[Dict[str, Any]]:
+        """
+        Triages several patients with a single model call and returns one
+        result per input, in input order. Cached inputs skip the model. Items
+        the reply leaves out or gets wrong are triaged on their own; if the
+        call itself fails every item gets the mock analysis.
+        """
+        logger.info(f"Analyzing {len(symptoms_list)} symptom descriptions in one batch")
+
+        if self.model is None:
+            return [self._mock_analysis(symptoms) for symptoms in symptoms_list]
+
+        keys = [TriageCache.make_key(s, TRIAGE_PROMPT_VERSION, self.model_name) for s in symptoms_list]
+        results: List[Optional[Dict[str, Any]]] = [self.cache.get(key) for key in keys]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if len(pending) == 1:
+            i = pending[0]
+            results[i] = self._analyze_uncached(symptoms_list[i], keys[i])
+        elif pending:
+            try:
+                start = time.perf_counter()
+                response = self.llm.call_sync(self.model.generate_content,
+                                              self._batch_prompt([symptoms_list[i] for i in pending]))
+                latency_ms = (time.perf_counter() - start) * 1000
+                answers = self._parse_batch(response.text, len(pending))
+            except Exception as e:
+                logger.warning(f"Batched LLM Triage unavailable ({str(e)}). Using fallback logic.")
+                answers = None
+
+            for slot, i in enumerate(pending):
+                if answers is None:
+                    results[i] = self._mock_analysis(symptoms_list[i])
+                elif answers[slot] is None:
+                    logger.warning(f"Batched triage item {slot + 1} unusable; triaging it on its own.")
+                    results[i] = self._analyze_uncached(symptoms_list[i], keys[i])
+                else:
+                    results[i] = answers[slot]
+                    self.cache.put(keys[i], answers[slot], latency_ms)
+        return results
+
+    @staticmethod
+    def _batch_prompt(symptoms_list: List[str]) -> str:
+        patients = "\n".join(f"        {n}. {symptoms}" for n, symptoms in enumerate(symptoms_list, 1))
+        return f"""
+        You are a medical triage assistant. For EACH numbered patient below provide:
+        1. Severity (Low, Medium, High, Critical)
+        2. Recommended Department. MUST be one of: [General, Cardiology, Neurology, Orthopedics].
+           If the condition is critical/emergency, choose the most relevant specialist (e.g. Cardiology for heart attack) or 'General'.
+        3. Brief Summary (1 sentence)
+
+        Patients:
+{patients}
+
+        Output a JSON array with exactly one object per patient, in the same order:
+        [
+            {{"id": 1, "severity": "...", "department": "...", "summary": "..."}}
+        ]
+        """
+
+    @staticmethod
+    def _parse_batch(text: str, expected: int) -> List[Optional[Dict[str, Any]]]:
+        """
+        Maps a batched reply back to its inputs. Items are matched by "id"
+        when the model gives one and by position otherwise; anything missing
+        or invalid comes back as None.
+        """
+        items = json.loads(_strip_code_fence(text))
+        if not isinstance(items, list):
+            raise ValueError("batched triage reply is not a JSON array")
+        answers: List[Optional[Dict[str, Any]]] = [None] * expected
+        for position, item in enumerate(items):
+            item_id = item.get("id") if isinstance(item, dict) else None
+            slot = item_id - 1 if isinstance(item_id, int) else position
+            if 0 <= slot < expected and answers[slot] is None:
+                answers[slot] = _validated(item)
+        return answers
 
     def _mock_analysis(self, symptoms: str) -> Dict[str, Any]:
-        # Fallback for testing without API key or if API fails
-        symptoms_lower = symptoms.lower()
-        
-        if any(x in symptoms_lower for x in ["chest pain", "heart", "breathing", "shortness of breath"]):
-            return {
-                "severity": "Critical",
-                "department": "Cardiology",
-                "summary": f"Patient reports {symptoms}. Immediate cardiology consultation required."
-            }
-        elif any(x in symptoms_lower for x in ["headache", "migraine", "dizzy"]):
-             return {
-                "severity": "Low",
-                "department": "Neurology",
-                "summary": f"Patient reports {symptoms}. Neurology checkup recommended."
-            }
-        elif any(x in symptoms_lower for x in ["knee", "bone", "fracture", "leg", "arm", "swollen"]):
-             return {
-                "severity": "Medium",
-                "department": "Orthopedics",
-                "summary": f"Patient reports {symptoms}. Orthopedic evaluation recommended."
-            }
-        
-        return {
-            "severity": "Medium",
-            "department": "General",
-            "summary": f"Patient reports {symptoms}. Recommended general checkup."
-        }
+        # Fallback for testing without API key or if API fails.
+        # Rules live in healthmate_ai/rules/triage_rules.json.
+        return get_triage_rules().classify(symptoms)
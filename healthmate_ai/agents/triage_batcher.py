@@ -0,0 +1,104 @@
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+from healthmate_ai.agents.triage_agent import TriageAgent
+from healthmate_ai.core.executors import Executors
+from healthmate_ai.core.logger import setup_logger
+
+logger = setup_logger("TriageBatcher")
+
+# A batch is sent when it holds this many requests or when its oldest
+# request has waited this long, whichever comes first. A size of 1 turns
+# batching off.
+TRIAGE_BATCH_SIZE = int(os.getenv("HEALTHMATE_TRIAGE_BATCH_SIZE", "16"))
+TRIAGE_BATCH_WAIT_MS = float(os.getenv("HEALTHMATE_TRIAGE_BATCH_WAIT_MS", "20"))
+
+
+class TriageBatcher:
+    """
+    Coalesces concurrent triage requests into one model call per batch.
+
+    Callers await analyze() as if it were a single triage; requests arriving
+    within the batching window share a call to
+    TriageAgent.analyze_symptoms_batch, which runs on the I/O thread pool.
+    At most max_in_flight batches are sent to the model at once.
+    """
+    def __init__(self,
+                 agent: TriageAgent,
+                 executors: Executors,
+                 max_batch_size: int = TRIAGE_BATCH_SIZE,
+                 max_wait_ms: float = TRIAGE_BATCH_WAIT_MS,
+                 max_in_flight: int = 8):
+        self.agent = agent
+        self.executors = executors
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_in_flight = max_in_flight
+        self.batches = 0
+        self.items = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def analyze(self, symptoms: str) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or reused from a new asyncio.run()
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+
+        if self.max_batch_size <= 1:
+            async with self._in_flight:
+                return await self.executors.run_io(self.agent.analyze_symptoms, symptoms)
+
+        future = loop.create_future()
+        self._pending.append((symptoms, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = self._loop.create_task(self._send(batch))
+            # Keep a reference so the task is not garbage collected mid-flight
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            async with self._in_flight:
+                results = await self.executors.run_io(self.agent.analyze_symptoms_batch, [s for s, _ in batch])
+        except Exception as e:
+            # analyze_symptoms_batch handles model failures itself, so this
+            # is an infrastructure error (e.g. the executor was shut down)
+            logger.error(f"Triage batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.items += len(batch)
+        for (_, future), result in zip(batch, results):
+            # A caller that was cancelled while waiting has a done future
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms
+        }
@@ -0,0 +1,157 @@
+import importlib
+import os
+
+from healthmate_ai.core.db_pool import get_pool
+from healthmate_ai.core.logger import setup_logger
+from healthmate_ai.core.service_container import ServiceContainer
+from healthmate_ai.tools.db_migrations import ensure_schema
+
+logger = setup_logger("AppContext")
+
+DB_PATH = os.getenv("HEALTHMATE_DB_PATH", "healthmate.db")
+# "module:function" that builds the agents' model instead of Gemini, e.g.
+# benchmarks.fake_llm:fake_model_factory to run without an API key
+MODEL_FACTORY = os.getenv("HEALTHMATE_MODEL_FACTORY", "")
+
+
+# Factories import what they build, so a service's dependencies are only
+# loaded when something first asks for it (see ServiceContainer).
+
+def _db_tool(app: "AppContext"):
+    from healthmate_ai.tools.database_tool import DatabaseTool
+    return DatabaseTool(app.db_path)
+
+def _async_db(app: "AppContext"):
+    from healthmate_ai.tools.async_database_tool import AsyncDatabaseTool
+    return AsyncDatabaseTool(app.get("db_tool"))
+
+def _doctor_db(app: "AppContext"):
+    from healthmate_ai.tools.doctor_database_tool import DoctorDatabaseTool
+    return DoctorDatabaseTool(app.db_path)
+
+def _executors(app: "AppContext"):
+    from healthmate_ai.core.executors import get_executors
+    return get_executors()
+
+def _llm_client(app: "AppContext"):
+    from healthmate_ai.core.llm_infrastructure import get_llm_client
+    return get_llm_client()
+
+def _model_factory(app: "AppContext"):
+    # None: the agents use Gemini
+    if not MODEL_FACTORY:
+        return None
+    module_name, _, name = MODEL_FACTORY.partition(":")
+    return getattr(importlib.import_module(module_name), name)
+
+def _triage_cache(app: "AppContext"):
+    from healthmate_ai.tools.triage_cache import TriageCache
+    return TriageCache(app.db_path)
+
+def _report_cache(app: "AppContext"):
+    from healthmate_ai.tools.report_cache import ReportCache
+    return ReportCache(app.db_path)
+
+def _triage_agent(app: "AppContext"):
+    from healthmate_ai.agents.triage_agent import TriageAgent
+    return TriageAgent(cache=app.get("triage_cache"), llm_client=app.get("llm_client"),
+                       model_factory=app.get("model_factory"))
+
+def _report_agent(app: "AppContext"):
+    from healthmate_ai.agents.report_parser_agent import ReportParserAgent
+    return ReportParserAgent(app.get("executors"), cache=app.get("report_cache"))
+
+def _ingest_agent(app: "AppContext"):
+    from healthmate_ai.agents.report_ingest_agent import ReportIngestAgent
+    return ReportIngestAgent(db_tool=app.get("db_tool"), report_agent=app.get("report_agent"),
+                             executors=app.get("executors"))
+
+def _scheduler_agent(app: "AppContext"):
+    from healthmate_ai.agents.scheduler_agent import SchedulerAgent
+    return SchedulerAgent()
+
+def _reminder_agent(app: "AppContext"):
+    from healthmate_ai.agents.reminder_agent import ReminderAgent
+    return ReminderAgent(app.get("db_tool"))
+
+def _orchestrator(app: "AppContext"):
+    from healthmate_ai.agents.orchestrator_agent import OrchestratorAgent
+    return OrchestratorAgent(
+        executors=app.get("executors"),
+        db_tool=app.get("db_tool"),
+        async_db=app.get("async_db"),
+        triage_agent=app.get("triage_agent"),
+        report_agent=app.get("report_agent"),
+        scheduler_agent=app.get("scheduler_agent"),
+        reminder_agent=app.get("reminder_agent")
+    )
+
+def _doctor_tools(app: "AppContext"):
+    # The doctor agents' tools are module-level functions; point them at our database
+    from healthmate_ai.tools import doctor_tools_definitions
+    doctor_tools_definitions.use_db_tool(app.get("doctor_db"))
+    return doctor_tools_definitions
+
+def _doctor_router(app: "AppContext"):
+    # Picks the doctor-portal agent for a question
+    from healthmate_ai.core.rule_engine import RuleEngine
+    from healthmate_ai.tools.triage_rules import RULES_DIR
+    return RuleEngine.from_file(os.path.join(RULES_DIR, "doctor_routing.json"))
+
+def _schedule_agent(app: "AppContext"):
+    app.get("doctor_tools")
+    from healthmate_ai.agents.doctor_schedule_agent import DoctorScheduleAgent
+    return DoctorScheduleAgent(model_factory=app.get("model_factory"))
+
+def _insight_agent(app: "AppContext"):
+    app.get("doctor_tools")
+    from healthmate_ai.agents.patient_insight_agent import PatientInsightAgent
+    return PatientInsightAgent(model_factory=app.get("model_factory"))
+
+
+class AppContext(ServiceContainer):
+    """
+    Everything the application shares for the lifetime of the process: one
+    database layer, one set of agents, the worker pools, the LLM client and
+    the caches.
+
+    Create it once at startup and get() services from it instead of
+    constructing tools and agents ad hoc. The schema is brought up to date
+    here, once, before any service exists. The services themselves are
+    still built on first use, so a session that never parses a PDF or calls
+    the model does not load either.
+    """
+    def __init__(self, db_path: str = DB_PATH):
+        super().__init__()
+        self.db_path = db_path
+        ensure_schema(get_pool(db_path))
+
+        self.register("db_tool", _db_tool)
+        self.register("async_db", _async_db)
+        self.register("doctor_db", _doctor_db)
+        self.register("executors", _executors)
+        self.register("llm_client", _llm_client)
+        self.register("model_factory", _model_factory)
+        self.register("triage_cache", _triage_cache)
+        self.register("report_cache", _report_cache)
+        self.register("triage_agent", _triage_agent)
+        self.register("report_agent", _report_agent)
+        self.register("ingest_agent", _ingest_agent)
+        self.register("scheduler_agent", _scheduler_agent)
+        self.register("reminder_agent", _reminder_agent)
+        self.register("orchestrator", _orchestrator)
+        self.register("doctor_tools", _doctor_tools)
+        self.register("doctor_router", _doctor_router)
+        self.register("schedule_agent", _schedule_agent)
+        self.register("insight_agent", _insight_agent)
+
+    def close(self):
+        """
+        Stops the worker threads and processes of the services that were started.
+        """
+        if self.is_loaded("async_db"):
+            self.get("async_db").close()
+        if self.is_loaded("executors"):
+            from healthmate_ai.core.executors import shutdown_executors
+            shutdown_executors()
+        logger.info(f"Closed services: {', '.join(self.loaded()) or 'none'}")
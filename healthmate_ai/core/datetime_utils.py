@@ -0,0 +1,70 @@
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple, Union
+
+SECONDS_PER_DAY = 86400
+
+_EPOCH = datetime(1970, 1, 1)
+
+DateLike = Union[str, date, datetime]
+
+
+def _parse(value: DateLike) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, date):
+        dt = datetime(value.year, value.month, value.day)
+    elif isinstance(value, str) and value.strip():
+        try:
+            dt = datetime.fromisoformat(value.strip())
+        except ValueError:
+            return None
+    else:
+        return None
+    if dt.tzinfo is not None:
+        # Store aware values as the server's local wall-clock time
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt
+
+
+def to_epoch(value: DateLike) -> Optional[int]:
+    """
+    Converts a date/datetime (or an ISO string such as "2023-10-27 09:00")
+    to integer seconds on a wall-clock epoch.
+
+    Naive values are encoded as if they were UTC, so the stored integer
+    round-trips to the same wall-clock time regardless of server timezone
+    or DST. Returns None for values that cannot be parsed.
+    """
+    dt = _parse(value)
+    if dt is None:
+        return None
+    return calendar.timegm(dt.timetuple())
+
+
+def from_epoch(epoch: int) -> datetime:
+    """
+    Inverse of to_epoch: returns the naive wall-clock datetime.
+    """
+    return _EPOCH + timedelta(seconds=epoch)
+
+
+def is_date_only(value: DateLike) -> bool:
+    if isinstance(value, str):
+        return len(value.strip()) == 10
+    return isinstance(value, date) and not isinstance(value, datetime)
+
+
+def day_range(start: DateLike, end: DateLike) -> Tuple[int, int]:
+    """
+    Returns a half-open [start, end) epoch range.
+    A date-only end covers that whole day, so day_range("2023-10-23", "2023-10-29")
+    spans the full week.
+    """
+    start_epoch = to_epoch(start)
+    end_epoch = to_epoch(end)
+    if start_epoch is None or end_epoch is None:
+        raise ValueError(f"Invalid date range: {start!r} - {end!r}")
+    if is_date_only(end):
+        end_epoch += SECONDS_PER_DAY
+    return start_epoch, end_epoch
@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+from healthmate_ai.core.logger import setup_logger
+
+logger = setup_logger("ConnectionPool")
+
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+DEFAULT_STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionPool:
+    """
+    Hands out one long-lived SQLite connection per thread for a database file.
+
+    Connections are opened lazily, switched to WAL journaling with
+    synchronous=NORMAL, and keep a prepared-statement cache so repeated
+    queries skip re-compilation.
+    """
+    def __init__(self,
+                 db_path: str,
+                 busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+                 statement_cache_size: int = DEFAULT_STATEMENT_CACHE_SIZE):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.statement_cache_size = statement_cache_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.statement_cache_size,
+            # Each connection is only ever used by the thread that opened it;
+            # this just lets close_all() run from a different thread.
+            check_same_thread=False
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def get_connection(self) -> sqlite3.Connection:
+        """
+        Returns the calling thread's connection, opening it on first use.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+            logger.info(f"Opened pooled connection to {self.db_path} "
+                        f"({len(self._connections)} open)")
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Yields the thread's connection and commits on success or rolls back on error.
+        Nested calls on the same thread join the outermost transaction, which
+        owns the single commit.
+        """
+        conn = self.get_connection()
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        if not depth:
+            self._local.after_commit = []
+        try:
+            if depth:
+                yield conn
+            else:
+                with conn:
+                    yield conn
+        finally:
+            self._local.depth = depth
+        if not depth:
+            callbacks, self._local.after_commit = self._local.after_commit, []
+            for callback in callbacks:
+                callback()
+
+    def in_transaction(self) -> bool:
+        """
+        Whether the calling thread is inside transaction().
+        """
+        return getattr(self._local, "depth", 0) > 0
+
+    def call_after_commit(self, callback: Callable[[], None]):
+        """
+        Runs callback once the calling thread's current transaction commits,
+        or immediately when no transaction is open. Dropped on rollback.
+        """
+        if getattr(self._local, "depth", 0):
+            self._local.after_commit.append(callback)
+        else:
+            callback()
+
+    def close_all(self):
+        """
+        Closes every connection handed out by this pool.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """
+    Returns the process-wide pool for a database file, creating it if needed.
+    """
+    key = db_path if db_path == ":memory:" else os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_path)
+            _pools[key] = pool
+        return pool
@@ -0,0 +1,117 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from healthmate_ai.core.logger import setup_logger
+
+logger = setup_logger("Executors")
+
+# Threads for blocking I/O and LLM calls, which release the GIL while waiting
+IO_WORKERS = int(os.getenv("HEALTHMATE_IO_WORKERS", "8"))
+# Processes for CPU-bound work such as PDF text extraction. 0 runs that work
+# on the I/O threads instead (for environments that cannot start processes).
+CPU_WORKERS = int(os.getenv("HEALTHMATE_CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+# "spawn" by default: forking a process that already runs DB and executor
+# threads can copy held locks into the child
+CPU_START_METHOD = os.getenv("HEALTHMATE_CPU_START_METHOD", "spawn")
+
+
+class Executors:
+    """
+    Owns the worker pools that blocking work is dispatched to from the event loop.
+
+    run_io() sends a call to the thread pool, run_cpu() to the process pool.
+    Functions passed to run_cpu() and their arguments and results must be
+    picklable, so use module-level functions rather than bound methods.
+    The process pool is started on first use.
+    """
+    def __init__(self,
+                 io_workers: int = IO_WORKERS,
+                 cpu_workers: int = CPU_WORKERS,
+                 start_method: str = CPU_START_METHOD):
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self.start_method = start_method
+        self.io = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="healthmate-io")
+        self._cpu: Optional[ProcessPoolExecutor] = None
+        self._cpu_lock = threading.Lock()
+
+    @property
+    def cpu(self) -> Executor:
+        if self.cpu_workers <= 0:
+            return self.io
+        with self._cpu_lock:
+            if self._cpu is None:
+                context = multiprocessing.get_context(self.start_method)
+                self._cpu = ProcessPoolExecutor(max_workers=self.cpu_workers, mp_context=context)
+                logger.info(f"Started {self.cpu_workers} CPU worker processes ({self.start_method})")
+            return self._cpu
+
+    def restart_cpu(self, broken: Executor):
+        """
+        Drops the process pool after one of its workers died (the pool then
+        raises BrokenProcessPool for everything), if `broken` is still the
+        current pool. The next use of cpu starts a new one.
+        """
+        with self._cpu_lock:
+            if self._cpu is not None and self._cpu is broken:
+                self._cpu.shutdown(wait=False)
+                self._cpu = None
+                logger.warning("A CPU worker process died; the process pool will be restarted")
+
+    def warm_up(self):
+        """
+        Starts every CPU worker process now, so the first request does not pay
+        the process start-up cost.
+        """
+        if self.cpu_workers > 0:
+            futures = [self.cpu.submit(os.getpid) for _ in range(self.cpu_workers)]
+            for future in futures:
+                future.result()
+
+    async def run_io(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Runs a blocking I/O or LLM call on the thread pool.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.io, functools.partial(func, *args, **kwargs))
+
+    async def run_cpu(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Runs a CPU-bound call on the process pool.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.cpu, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        self.io.shutdown(wait=wait)
+        with self._cpu_lock:
+            if self._cpu is not None:
+                self._cpu.shutdown(wait=wait)
+                self._cpu = None
+
+
+_executors: Optional[Executors] = None
+_executors_lock = threading.Lock()
+
+
+def get_executors() -> Executors:
+    """
+    Returns the process-wide Executors, created with the configured sizes on first use.
+    """
+    global _executors
+    with _executors_lock:
+        if _executors is None:
+            _executors = Executors()
+        return _executors
+
+
+def shutdown_executors(wait: bool = True):
+    global _executors
+    with _executors_lock:
+        if _executors is not None:
+            _executors.shutdown(wait=wait)
+            _executors = None
@@ -1,11 +1,334 @@
 import os
+import asyncio
 import inspect
-import google.generativeai as genai
-from typing import List, Callable, Dict, Any, Optional
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Callable, Dict, Any, Iterator, Optional
 from healthmate_ai.core.logger import setup_logger
 
 logger = setup_logger("LlmInfrastructure")
 
+# Seconds a model call may take, across all of its attempts
+LLM_TIMEOUT = float(os.getenv("HEALTHMATE_LLM_TIMEOUT", "15"))
+LLM_MAX_ATTEMPTS = int(os.getenv("HEALTHMATE_LLM_MAX_ATTEMPTS", "3"))
+# Retries may add at most this fraction of extra calls on top of first attempts
+LLM_RETRY_RATIO = float(os.getenv("HEALTHMATE_LLM_RETRY_RATIO", "0.2"))
+# Consecutive failures that open the circuit, and how long it stays open
+LLM_BREAKER_FAILURES = int(os.getenv("HEALTHMATE_LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("HEALTHMATE_LLM_BREAKER_COOLDOWN", "30"))
+# Threads that run model calls; a call that timed out keeps its thread until the SDK returns
+LLM_THREADS = int(os.getenv("HEALTHMATE_LLM_THREADS", "32"))
+# Model/tool round trips allowed for one user message
+LLM_MAX_TOOL_TURNS = int(os.getenv("HEALTHMATE_LLM_MAX_TOOL_TURNS", "8"))
+
+# Upstream errors worth retrying: overload, rate limits and transient faults.
+# Matched by name so google.api_core does not have to be imported here.
+_RETRYABLE_ERROR_NAMES = {
+    "ServiceUnavailable", "TooManyRequests", "ResourceExhausted", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "BadGateway", "Aborted",
+}
+_RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class LlmUnavailableError(Exception):
+    """
+    A model call failed after its retries, timed out, or was refused by the
+    circuit breaker. Callers should take their fallback path.
+    """
+
+class LlmTimeoutError(LlmUnavailableError):
+    pass
+
+class CircuitOpenError(LlmUnavailableError):
+    pass
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (LlmTimeoutError, TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in _RETRYABLE_ERROR_NAMES:
+        return True
+    return getattr(error, "code", None) in _RETRYABLE_STATUS_CODES
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of overall traffic. Every call deposits
+    `ratio` tokens and every retry spends one, so during an outage retries
+    stop once the budget is spent instead of multiplying the load.
+    """
+    def __init__(self, ratio: float = LLM_RETRY_RATIO, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and refuses calls
+    for `cooldown` seconds. After that a single probe call is let through:
+    success closes the circuit, failure opens it again. Every call that
+    allow() let through must end in record_success, record_failure or
+    record_abandoned, or a probe would leave the circuit half-open for good.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, cooldown: float = LLM_BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                return True
+            # Open, or half-open with the probe already in flight
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"LLM circuit opened after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def record_abandoned(self):
+        """
+        A call ended without an answer either way (cancelled, interrupted).
+        If it was the probe, the circuit opens again for another cooldown.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+class LlmClient:
+    """
+    Shared wrapper for blocking model SDK calls (generate_content, chat
+    send_message) that adds:
+
+    - a deadline per call, covering every attempt;
+    - retries with full-jitter exponential backoff for transient errors,
+      limited by a process-wide RetryBudget;
+    - a CircuitBreaker, so that while the model is down callers fail fast
+      with CircuitOpenError and go straight to their fallback.
+
+    Use `await client.call(func, ...)` from the event loop and
+    `client.call_sync(func, ...)` from worker threads. Both raise
+    LlmUnavailableError when the caller should fall back.
+    """
+    def __init__(self,
+                 timeout: float = LLM_TIMEOUT,
+                 max_attempts: int = LLM_MAX_ATTEMPTS,
+                 retry_budget: Optional[RetryBudget] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 base_backoff: float = 0.2,
+                 max_backoff: float = 2.0,
+                 threads: int = LLM_THREADS):
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.retry_budget = retry_budget or RetryBudget()
+        self.breaker = breaker or CircuitBreaker()
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="healthmate-llm")
+        self._stats_lock = threading.Lock()
+        self._stats = {"calls": 0, "successes": 0, "failures": 0, "retries": 0,
+                       "timeouts": 0, "short_circuits": 0}
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _start(self, timeout: Optional[float]) -> float:
+        # Returns the call's deadline, or raises if the circuit is open
+        if not self.breaker.allow():
+            self._count("short_circuits")
+            raise CircuitOpenError("LLM circuit is open")
+        self._count("calls")
+        self.retry_budget.deposit()
+        return time.monotonic() + (timeout if timeout is not None else self.timeout)
+
+    def _succeeded(self, result: Any) -> Any:
+        self.breaker.record_success()
+        self._count("successes")
+        return result
+
+    def _next_delay(self, error: Exception, attempt: int, deadline: float, retry: bool) -> float:
+        """
+        Records a failed attempt and returns how long to wait before the next
+        one, or raises LlmUnavailableError if there should be no next one.
+        """
+        if isinstance(error, LlmTimeoutError):
+            self._count("timeouts")
+        if not _is_retryable(error):
+            # The request itself is bad; the model answered, so as far as
+            # the breaker is concerned the upstream is healthy
+            self.breaker.record_success()
+            self._count("failures")
+            raise LlmUnavailableError(str(error)) from error
+
+        self.breaker.record_failure()
+        delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+        if (not retry or attempt + 1 >= self.max_attempts
+                or time.monotonic() + delay >= deadline
+                or self.breaker.state == CircuitBreaker.OPEN
+                or not self.retry_budget.try_spend()):
+            self._count("failures")
+            raise error if isinstance(error, LlmUnavailableError) else LlmUnavailableError(str(error)) from error
+        self._count("retries")
+        return delay
+
+    def call_sync(self, func: Callable, *args, timeout: Optional[float] = None, retry: bool = True, **kwargs) -> Any:
+        """
+        Calls func(*args, **kwargs) under the deadline, retry and breaker rules.
+        Pass retry=False for calls that are not safe to repeat.
+        """
+        deadline = self._start(timeout)
+        attempt = 0
+        try:
+            while True:
+                future = self._pool.submit(func, *args, **kwargs)
+                try:
+                    return self._succeeded(future.result(timeout=max(0.0, deadline - time.monotonic())))
+                except FutureTimeoutError:
+                    error: Exception = LlmTimeoutError("LLM call exceeded its deadline")
+                except Exception as e:
+                    error = e
+                time.sleep(self._next_delay(error, attempt, deadline, retry))
+                attempt += 1
+        except LlmUnavailableError:
+            # Outcome already recorded by _next_delay
+            raise
+        except BaseException:
+            self.breaker.record_abandoned()
+            raise
+
+    def stream_sync(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Iterator[Any]:
+        """
+        Yields the chunks of a streaming call (func(*args, **kwargs) returns an
+        iterable) as they arrive. The deadline covers the whole stream and the
+        breaker sees the stream as one call. Streams are never retried, since
+        chunks already handed out cannot be taken back.
+        """
+        deadline = self._start(timeout)
+        chunks: queue.Queue = queue.Queue()
+
+        def produce():
+            try:
+                for chunk in func(*args, **kwargs):
+                    chunks.put(("chunk", chunk))
+                chunks.put(("done", None))
+            except Exception as e:
+                chunks.put(("error", e))
+
+        self._pool.submit(produce)
+        try:
+            while True:
+                try:
+                    kind, item = chunks.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    kind, item = "error", LlmTimeoutError("LLM stream exceeded its deadline")
+                if kind == "chunk":
+                    yield item
+                elif kind == "done":
+                    self._succeeded(None)
+                    return
+                else:
+                    # Records the failure and raises, as retry is off
+                    self._next_delay(item, 0, deadline, retry=False)
+        except GeneratorExit:
+            # The caller stopped reading; the model was answering, so this
+            # must not leave a half-open breaker waiting on its probe
+            self._succeeded(None)
+            raise
+        except LlmUnavailableError:
+            raise
+        except BaseException:
+            self.breaker.record_abandoned()
+            raise
+
+    async def call(self, func: Callable, *args, timeout: Optional[float] = None, retry: bool = True, **kwargs) -> Any:
+        """
+        Awaitable call_sync: the blocking SDK call runs on the client's threads
+        and the event loop stays free while it waits.
+        """
+        deadline = self._start(timeout)
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    result = await asyncio.wait_for(
+                        loop.run_in_executor(self._pool, lambda: func(*args, **kwargs)),
+                        max(0.0, deadline - time.monotonic())
+                    )
+                    return self._succeeded(result)
+                except asyncio.TimeoutError:
+                    error: Exception = LlmTimeoutError("LLM call exceeded its deadline")
+                except Exception as e:
+                    error = e
+                await asyncio.sleep(self._next_delay(error, attempt, deadline, retry))
+                attempt += 1
+        except LlmUnavailableError:
+            raise
+        except BaseException:
+            # Cancelled by the caller, for instance
+            self.breaker.record_abandoned()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["circuit"] = self.breaker.state
+        stats["retry_tokens"] = round(self.retry_budget.tokens, 2)
+        return stats
+
+def load_genai():
+    """
+    Imports google.generativeai on first use. The SDK takes about a second
+    to import, which every CLI start used to pay even when no model was called.
+    """
+    import google.generativeai as genai
+    return genai
+
+_llm_client: Optional[LlmClient] = None
+_llm_client_lock = threading.Lock()
+
+def get_llm_client() -> LlmClient:
+    """
+    The process-wide LlmClient, so every agent shares one circuit breaker and retry budget.
+    """
+    global _llm_client
+    with _llm_client_lock:
+        if _llm_client is None:
+            _llm_client = LlmClient()
+        return _llm_client
+
 class ToolContext:
     """
     Context passed to tools, allowing them to request confirmation or access shared state.
@@ -39,35 +362,128 @@ class LlmAgent:
     """
     An agent powered by an LLM that can use tools.
     """
-    def __init__(self, name: str, model_name: str = "gemini-2.5-flash-lite", instruction: str = "", tools: List[FunctionTool] = []):
+    def __init__(self, name: str, model_name: str = "gemini-2.5-flash-lite", instruction: str = "", tools: List[FunctionTool] = [],
+                 llm_client: Optional[LlmClient] = None, model_factory: Optional[Callable[..., Any]] = None):
         self.name = name
         self.instruction = instruction
         self.tools = tools
         self.tool_map = {t.name: t.func for t in tools}
-        
+        self.llm = llm_client or get_llm_client()
+        self.model_name = model_name
+        # Builds the model instead of Gemini: model_factory(model_name, tools=, system_instruction=)
+        # returns a model with start_chat() and function_response(name, result)
+        self.model_factory = model_factory
+        self._chat = None
+        self._chat_lock = threading.Lock()
+        # Wraps a tool result for the chat in use (set by _start_chat)
+        self._function_response: Optional[Callable[[str, Dict[str, Any]], Any]] = None
+        self.last_timing: Optional[Dict[str, Optional[float]]] = None
+
+    @property
+    def chat(self):
+        """
+        The chat session, created (and the SDK loaded) on the first message.
+        """
+        with self._chat_lock:
+            if self._chat is None:
+                self._chat = self._start_chat()
+            return self._chat
+
+    def reset(self):
+        """
+        Forgets the conversation; the next message starts a new chat.
+        """
+        with self._chat_lock:
+            self._chat = None
+
+    def _start_chat(self):
+        if self.model_factory is not None:
+            model = self.model_factory(self.model_name, tools=[t.to_gemini_tool() for t in self.tools],
+                                       system_instruction=self.instruction)
+            self._function_response = model.function_response
+            return model.start_chat(enable_automatic_function_calling=False)
+
+        genai = load_genai()
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             logger.warning("GEMINI_API_KEY not found. Agent will not work correctly.")
         else:
             genai.configure(api_key=api_key)
-            
-        self.model = genai.GenerativeModel(
-            model_name=model_name,
-            tools=[t.to_gemini_tool() for t in tools],
-            system_instruction=instruction
+
+        model = genai.GenerativeModel(
+            model_name=self.model_name,
+            tools=[t.to_gemini_tool() for t in self.tools],
+            system_instruction=self.instruction
         )
-        self.chat = self.model.start_chat(enable_automatic_function_calling=True)
+        self._function_response = lambda name, result: genai.protos.Part(
+            function_response=genai.protos.FunctionResponse(name=name, response=result)
+        )
+        # The SDK cannot stream with automatic function calling, so tool
+        # calls are run by _stream_turns instead
+        return model.start_chat(enable_automatic_function_calling=False)
 
     def send_message(self, message: str) -> str:
         """
         Sends a message to the agent and returns the response.
         """
+        return "".join(self.send_message_stream(message))
+
+    def send_message_stream(self, message: str) -> Iterator[str]:
+        """
+        Sends a message to the agent and yields the response text as it
+        arrives. Tools the model asks for are run between turns, and the
+        text of every turn is streamed. Time to first chunk and total time
+        are logged and kept in `last_timing`.
+        """
         logger.info(f"[{self.name}] User: {message}")
+        start = time.perf_counter()
+        first_chunk_ms = None
+        text_parts = []
         try:
-            response = self.chat.send_message(message)
-            text = response.text
-            logger.info(f"[{self.name}] Agent: {text}")
-            return text
+            for text in self._stream_turns(message):
+                if first_chunk_ms is None:
+                    first_chunk_ms = (time.perf_counter() - start) * 1000
+                text_parts.append(text)
+                yield text
+        except CircuitOpenError:
+            logger.warning(f"[{self.name}] LLM circuit open, not sending message")
+            yield "The assistant is temporarily unavailable. Please try again shortly."
         except Exception as e:
             logger.error(f"[{self.name}] Error: {e}")
-            return f"I encountered an error: {str(e)}"
+            yield f"{chr(10) if text_parts else ''}I encountered an error: {str(e)}"
+
+        total_ms = (time.perf_counter() - start) * 1000
+        self.last_timing = {"ttft_ms": first_chunk_ms, "total_ms": total_ms}
+        logger.info(f"[{self.name}] Agent: {''.join(text_parts)}")
+        ttft = f"{first_chunk_ms:.0f} ms" if first_chunk_ms is not None else "n/a"
+        logger.info(f"[{self.name}] Time to first token {ttft}, total {total_ms:.0f} ms")
+
+    def _stream_turns(self, message: str) -> Iterator[str]:
+        # Not retried: earlier turns may already have run tools (e.g. booked an appointment)
+        chat = self.chat
+        content: Any = message
+        for _ in range(LLM_MAX_TOOL_TURNS):
+            calls = []
+            for chunk in self.llm.stream_sync(chat.send_message, content, stream=True):
+                for part in (chunk.candidates[0].content.parts if chunk.candidates else []):
+                    if part.function_call.name:
+                        calls.append(part.function_call)
+                    elif part.text:
+                        yield part.text
+            if not calls:
+                return
+            content = [self._run_tool(call) for call in calls]
+        logger.warning(f"[{self.name}] Stopped after {LLM_MAX_TOOL_TURNS} tool turns")
+
+    def _run_tool(self, call) -> Any:
+        args = dict(call.args)
+        logger.info(f"[{self.name}] Tool call: {call.name}({args})")
+        func = self.tool_map.get(call.name)
+        try:
+            result = func(**args) if func else {"error": f"Unknown tool: {call.name}"}
+        except Exception as e:
+            logger.error(f"[{self.name}] Tool {call.name} failed: {e}")
+            result = {"error": str(e)}
+        if not isinstance(result, dict):
+            result = {"result": result}
+        return self._function_response(call.name, result)
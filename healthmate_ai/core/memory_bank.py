@@ -1,29 +1,28 @@
 from typing import List, Dict, Any
-from healthmate_ai.tools.database_tool import DatabaseTool
+from healthmate_ai.tools.async_database_tool import AsyncDatabaseTool
 
 class MemoryBank:
-    def __init__(self, db_tool: DatabaseTool):
+    def __init__(self, db_tool: AsyncDatabaseTool):
         self.db_tool = db_tool
 
-    def get_patient_context(self, patient_id: str) -> Dict[str, Any]:
+    async def get_patient_context(self, patient_id: str) -> Dict[str, Any]:
         """
         Retrieves comprehensive patient context including:
         - Basic info
-        - Past visits
-        - Recent medical reports (metadata)
+        - Most recent visits (older pages via the cursor)
+        - Recent medical reports
         """
-        patient = self.db_tool.get_patient(patient_id)
-        if not patient:
+        # Info, recent visits and recent reports come back in one query
+        context = await self.db_tool.get_patient_context(patient_id)
+        if not context:
             return {}
 
-        history = self.db_tool.get_patient_history(patient_id)
-        
-        # In a real system, we might also fetch report summaries here
-        
         return {
-            "patient_info": patient,
-            "visit_history": history
+            "patient_info": context["info"],
+            "visit_history": context["visits"],
+            "recent_reports": context["reports"],
+            "older_visits_cursor": context["next_visits_cursor"]
         }
 
-    def store_visit_summary(self, visit_data: Dict[str, Any]):
-        self.db_tool.add_visit(visit_data)
+    async def store_visit_summary(self, visit_data: Dict[str, Any]):
+        await self.db_tool.add_visit(visit_data)
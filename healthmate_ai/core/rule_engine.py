@@ -0,0 +1,160 @@
+import json
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+# Words that negate the terms following them in the same clause
+NEGATION_CUES = ("no", "not", "denies", "denied", "without", "negative for", "free of", "never")
+# Punctuation and words that end a negation's scope
+CLAUSE_BREAKS = ("but", "however", "although", "except")
+# A cue only negates terms at most this many words after it
+NEGATION_WINDOW = 4
+
+
+class RuleHit(NamedTuple):
+    rule: Dict[str, Any]
+    term: str
+    negated: bool
+
+
+def load_rules(path: str) -> Dict[str, Any]:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """
+    Builds a regex alternation shaped like a trie of the phrases, e.g.
+    ["chest pain", "chest pressure", "cold"] -> "c(?:hest\\s+p(?:ain|ressure)|old)".
+    The regex engine then rejects most positions on their first character
+    instead of trying every phrase in turn. Spaces match any whitespace.
+    """
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [(r"\s+" if char == " " else re.escape(char)) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return body + "?" if len(branches) == 1 and len(body) == 1 else "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+def _normalize(term: str) -> str:
+    return " ".join(term.lower().split())
+
+
+class RuleEngine:
+    """
+    Keyword rules compiled into a single regular expression.
+
+    Each rule is a dict with a list of "terms" and an optional "priority";
+    any other keys (department, score, ...) are carried through for the
+    caller. One left-to-right scan finds every term and negation cue, so the
+    cost does not grow with the number of rules the way a chain of
+    `any(x in text for x in ...)` checks does. A term is negated when a cue
+    precedes it within NEGATION_WINDOW words in the same clause; only texts
+    that contain a cue pay for a second scan that tracks clause breaks.
+    """
+    def __init__(self,
+                 rules: List[Dict[str, Any]],
+                 negation_cues: Iterable[str] = NEGATION_CUES,
+                 clause_breaks: Iterable[str] = CLAUSE_BREAKS,
+                 negation_window: int = NEGATION_WINDOW):
+        self.rules = rules
+        self.negation_window = negation_window
+        # Every phrase maps to "neg", "brk" or the rule that owns it
+        self._kinds: Dict[str, Any] = {}
+        for cue in negation_cues:
+            self._kinds.setdefault(_normalize(cue), "neg")
+        for word in clause_breaks:
+            self._kinds.setdefault(_normalize(word), "brk")
+        for rule in rules:
+            for term in rule["terms"]:
+                # The first rule to claim a term keeps it
+                self._kinds.setdefault(_normalize(term), rule)
+        # Terms and cues only: clause breaks and punctuation matter only
+        # once a cue has been seen
+        self._terms = {phrase: kind for phrase, kind in self._kinds.items() if kind != "brk"}
+
+        # Text is lowercased before scanning, which is much faster than IGNORECASE
+        self._pattern = re.compile(rf"\b(?:{_trie_pattern(self._kinds)})\b|[.;:!?,]")
+        self._terms_pattern = re.compile(rf"\b(?:{_trie_pattern(self._terms)})\b")
+
+    @classmethod
+    def from_file(cls, path: str, section: str = "rules", **kwargs) -> "RuleEngine":
+        """
+        Loads the rules in `section` of a JSON file. A top-level
+        "negation_cues" list replaces the default cues; [] turns negation
+        off, e.g. for routing, where "not on my schedule" is still about
+        the schedule.
+        """
+        config = load_rules(path)
+        if "negation_cues" in config:
+            kwargs.setdefault("negation_cues", config["negation_cues"])
+        return cls(config[section], **kwargs)
+
+    def _lookup(self, phrase: str):
+        kind = self._kinds.get(phrase)
+        if kind is None:
+            # Punctuation, or a phrase matched across a run of whitespace
+            phrase = _normalize(phrase)
+            kind = self._kinds.get(phrase, "brk")
+        return phrase, kind
+
+    def scan(self, text: str) -> List[RuleHit]:
+        """
+        Every rule term found in text, in order, with its negation status.
+        """
+        text = text.lower()
+        phrases = self._terms_pattern.findall(text)
+        kinds = [self._terms.get(phrase) for phrase in phrases]
+        if "neg" in kinds or None in kinds:
+            return self._scan_negated(text)
+        return [RuleHit(kind, phrase, False) for phrase, kind in zip(phrases, kinds)]
+
+    def matches(self, text: str) -> List[Dict[str, Any]]:
+        """
+        The rules with a non-negated term in text, once per term found, in order.
+        """
+        text = text.lower()
+        # Fast path: most texts have no negation cue, so one findall and a
+        # dict lookup per term is all it takes
+        kinds = [self._terms.get(phrase) for phrase in self._terms_pattern.findall(text)]
+        if "neg" in kinds or None in kinds:
+            # A cue, or a phrase matched across a run of whitespace
+            return [hit.rule for hit in self._scan_negated(text) if not hit.negated]
+        return kinds
+
+    def _scan_negated(self, text: str) -> List[RuleHit]:
+        hits = []
+        negation_end = None
+        for match in self._pattern.finditer(text):
+            phrase, kind = self._lookup(match.group())
+            if kind == "neg":
+                negation_end = match.end()
+            elif kind == "brk":
+                negation_end = None
+            else:
+                negated = negation_end is not None and \
+                    len(text[negation_end:match.start()].split()) <= self.negation_window
+                hits.append(RuleHit(kind, phrase, negated))
+        return hits
+
+    def best(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        The highest-priority rule with a non-negated term in text, if any.
+        """
+        best = None
+        for rule in self.matches(text):
+            if best is None or rule.get("priority", 0) > best.get("priority", 0):
+                best = rule
+        return best
@@ -0,0 +1,46 @@
+import threading
+from typing import Any, Callable, Dict, List
+
+from healthmate_ai.core.logger import setup_logger
+
+logger = setup_logger("ServiceContainer")
+
+
+class ServiceContainer:
+    """
+    Builds services on first use.
+
+    Each service is registered as a factory that takes the container, so it
+    can get the services it depends on. Factories should import what they
+    build inside the function: then neither the service's module nor its
+    dependencies (the Gemini SDK, pypdf) are loaded until something calls
+    get() for that service. Later get() calls return the same instance.
+    """
+    def __init__(self):
+        self._factories: Dict[str, Callable[["ServiceContainer"], Any]] = {}
+        self._services: Dict[str, Any] = {}
+        # Reentrant, because a factory may get() its dependencies
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[["ServiceContainer"], Any]):
+        with self._lock:
+            self._factories[name] = factory
+            self._services.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        with self._lock:
+            if name not in self._services:
+                if name not in self._factories:
+                    raise KeyError(f"No service registered as '{name}'")
+                logger.info(f"Starting service: {name}")
+                self._services[name] = self._factories[name](self)
+            return self._services[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._services
+
+    def loaded(self) -> List[str]:
+        """
+        Names of the services built so far, in build order.
+        """
+        return list(self._services)
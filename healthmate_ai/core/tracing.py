@@ -1,5 +1,9 @@
 import functools
+import threading
 import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator
 from healthmate_ai.core.logger import setup_logger
 
 logger = setup_logger("Tracer")
@@ -39,3 +43,39 @@ def trace_tool(func):
             logger.error(f"[Tool:{tool_name}] Error in {method_name}: {str(e)}")
             raise e
     return wrapper
+
+_memory_lock = threading.Lock()
+_memory_users = 0
+_memory_started_here = False
+
+@contextmanager
+def measure_peak_memory() -> Iterator[Dict[str, float]]:
+    """
+    Measures the peak Python memory allocated while the block runs:
+
+        with measure_peak_memory() as memory:
+            ...
+        memory["peak_kb"]
+
+    tracemalloc is started for the block (unless it already runs) and
+    stopped after the last one. It counts the whole process, so blocks that
+    overlap in different threads see each other's allocations.
+    """
+    global _memory_users, _memory_started_here
+    with _memory_lock:
+        if _memory_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _memory_started_here = True
+        _memory_users += 1
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    result: Dict[str, float] = {}
+    try:
+        yield result
+    finally:
+        with _memory_lock:
+            result["peak_kb"] = max(0, tracemalloc.get_traced_memory()[1] - baseline) / 1024
+            _memory_users -= 1
+            if _memory_users == 0 and _memory_started_here:
+                tracemalloc.stop()
+                _memory_started_here = False
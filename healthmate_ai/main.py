@@ -2,19 +2,17 @@ import asyncio
 import argparse
 import json
 import os
-from healthmate_ai.agents.orchestrator_agent import OrchestratorAgent
-from healthmate_ai.tools.database_tool import DatabaseTool
+from typing import Iterable, Optional
 from healthmate_ai.core.logger import setup_logger
+from healthmate_ai.core.app_context import AppContext
 
 logger = setup_logger("Main")
 
 import uuid
 
-from healthmate_ai.agents.doctor_schedule_agent import DoctorScheduleAgent
-from healthmate_ai.agents.patient_insight_agent import PatientInsightAgent
 from datetime import datetime
 
-async def run_cli():
+async def run_cli(app: AppContext):
     print("\n========================================")
     print("       🏥 HEALTHMATE AI SYSTEM       ")
     print("========================================")
@@ -28,21 +26,22 @@ async def run_cli():
         choice = input("\nSelect Role: ").strip().lower()
         
         if choice in ['1', 'staff']:
-            await run_staff_interface()
+            await run_staff_interface(app)
         elif choice in ['2', 'doctor']:
-            await run_doctor_interface()
+            await run_doctor_interface(app)
         elif choice in ['q', 'exit', 'quit']:
             print("Shutting down system. Goodbye! 👋")
             break
         else:
             print("Invalid selection. Please try again.")
 
-async def run_staff_interface():
+async def run_staff_interface(app: AppContext):
     print("\n--- 👩‍💼 Staff Portal ---")
-    orchestrator = OrchestratorAgent()
+    orchestrator = app.get("orchestrator")
+    orchestrator.session.clear()
     
     # Setup Patient Entity
-    db = DatabaseTool()
+    db = orchestrator.async_db
     while True:
         print("\n--- 👤 Patient Identification ---")
         name = input("Enter Patient Name (e.g. John Doe) or 'back' to menu: ").strip()
@@ -50,10 +49,10 @@ async def run_staff_interface():
         if name.lower() == 'back':
             break
 
-        existing_patient = db.find_patient_by_name(name)
+        existing_patient = await db.find_patient_by_name(name)
         
         if existing_patient:
-            patient_id = existing_patient['patient_id']
+            patient_id = existing_patient.patient_id
             print(f"Welcome back, {name}! (ID: {patient_id})")
         else:
             print(f"New patient detected. Creating profile for {name}...")
@@ -78,7 +77,7 @@ async def run_staff_interface():
             email = input("Enter Email (or enter to skip): ").strip() or "N/A"
             
             patient_id = f"p_{uuid.uuid4().hex[:6]}"
-            db.add_patient({
+            await db.add_patient({
                 "patient_id": patient_id,
                 "name": name,
                 "age": age,
@@ -141,12 +140,21 @@ async def run_staff_interface():
 
         print("\n" + "="*40 + "\n")
 
-async def run_doctor_interface():
+def _print_stream(chunks: Iterable[str]):
+    # Show the answer as it is written instead of after the last chunk
+    print()
+    for chunk in chunks:
+        print(chunk, end="", flush=True)
+    print()
+
+async def run_doctor_interface(app: AppContext):
     print("\n--- 👨‍⚕️ Doctor Portal ---")
     
-    # Initialize Agents
-    schedule_agent = DoctorScheduleAgent()
-    insight_agent = PatientInsightAgent()
+    # Agents are created on the first question routed to them and shared
+    # across logins; each login starts a fresh conversation
+    for name in ("schedule_agent", "insight_agent"):
+        if app.is_loaded(name):
+            app.get(name).new_session()
     
     doctor_id = input("Enter Doctor ID (default: Dr. Smith): ").strip()
     if not doctor_id:
@@ -164,42 +172,40 @@ async def run_doctor_interface():
         if not query:
             continue
             
-        # Routing logic
-        query_lower = query.lower()
+        # Routing logic (rules in healthmate_ai/rules/doctor_routing.json)
+        route = app.get("doctor_router").best(query)
+        route_name = route["agent"] if route else None
         
-        if any(x in query_lower for x in ['schedule', 'appointments', 'calendar', 'today', 'patients']):
+        if route_name == "schedule":
             today = datetime.now().strftime("%Y-%m-%d")
             context_query = f"Doctor ID: {doctor_id}, Date: {today}. Question: {query}"
             print("\n🤖 Schedule Agent is thinking...")
-            response = schedule_agent.process_query(context_query)
-            print(f"\n{response}")
+            _print_stream(app.get("schedule_agent").process_query_stream(context_query))
             
-        elif any(x in query_lower for x in ['patient', 'history', 'report', 'details', 'insight']):
+        elif route_name == "insight":
             print("\n🤖 Insight Agent is thinking...")
-            response = insight_agent.process_query(query)
-            print(f"\n{response}")
+            _print_stream(app.get("insight_agent").process_query_stream(query))
             
         else:
             print("\n🤖 Schedule Agent (Default):")
-            response = schedule_agent.process_query(f"Doctor ID: {doctor_id}. Question: {query}")
-            print(f"\n{response}")
+            _print_stream(app.get("schedule_agent").process_query_stream(f"Doctor ID: {doctor_id}. Question: {query}"))
 
-async def run_test_scenario(scenario_path: str):
+async def run_test_scenario(app: AppContext, scenario_path: str):
     logger.info(f"Running test scenario from {scenario_path}")
     with open(scenario_path, 'r') as f:
         scenario = json.load(f)
     
-    orchestrator = OrchestratorAgent()
-    db = DatabaseTool()
+    orchestrator = app.get("orchestrator")
+    db = app.get("async_db")
     
     # Setup patient
     patient = scenario.get("patient")
     if patient:
-        db.add_patient(patient)
+        await db.add_patient(patient)
         patient_id = patient["patient_id"]
     else:
         patient_id = "test_patient"
-        db.add_patient({"patient_id": patient_id, "name": "Test", "age": 25, "gender": "F", "phone": "000", "email": "test@test.com"})
+        await db.add_patient({"patient_id": patient_id, "name": "Test", "age": 25, "gender": "F", "phone": "000", "email": "test@test.com"})
 
     symptoms = scenario.get("symptoms", "Headache")
     report_path = scenario.get("report_path")
@@ -213,14 +219,94 @@ async def run_test_scenario(scenario_path: str):
     
     logger.info("Test scenario passed successfully.")
 
+def _read_batch_requests(batch_path: str):
+    # A JSON list, or JSON Lines read one arrival at a time
+    with open(batch_path, 'r') as f:
+        first = f.read(1)
+        f.seek(0)
+        if first == '[':
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+async def run_batch(app: AppContext, batch_path: str, max_concurrency: Optional[int]):
+    from healthmate_ai.agents.orchestrator_agent import BATCH_CONCURRENCY
+    logger.info(f"Running batch admissions from {batch_path}")
+    orchestrator = app.get("orchestrator")
+    
+    ok = failed = 0
+    async for outcome in orchestrator.process_patient_requests_batch(
+            _read_batch_requests(batch_path), max_concurrency=max_concurrency or BATCH_CONCURRENCY):
+        patient_id = outcome["request"].get("patient_id")
+        if outcome["status"] == "ok":
+            ok += 1
+            triage = outcome["result"]["triage"]
+            print(f"[{outcome['index']}] {patient_id}: {triage.get('severity')} -> {triage.get('department')}")
+        else:
+            failed += 1
+            print(f"[{outcome['index']}] {patient_id}: ERROR {outcome['error']}")
+    
+    print(f"\nBatch complete: {ok} admitted, {failed} failed.")
+
+def run_ingest_reports(app: AppContext, directory: str, max_concurrency: Optional[int]):
+    logger.info(f"Ingesting reports from {directory}")
+    agent = app.get("ingest_agent")
+    if max_concurrency:
+        agent.in_flight = max_concurrency
+    stats = agent.ingest(directory)
+    
+    print(f"\nIngest complete: {stats['discovered']} files, {stats['ingested']} ingested "
+          f"({stats['cached']} from cache), {stats['skipped']} already done, {stats['failed']} failed.")
+    print(f"{stats['elapsed_s']:.1f}s, {stats['reports_per_s']:.1f} reports/s, {stats['mb_per_s']:.1f} MB/s")
+    for path, error in stats["failures"]:
+        print(f"  FAILED {os.path.relpath(path, directory)}: {error}")
+    if stats["failed"] > len(stats["failures"]):
+        print(f"  ... and {stats['failed'] - len(stats['failures'])} more (see the report_ingest table)")
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="HealthMate AI")
     parser.add_argument("--cli", action="store_true", help="Run in CLI mode")
     parser.add_argument("--test-scenario", type=str, help="Path to test scenario JSON")
+    parser.add_argument("--batch", type=str,
+                        help="Admit every request in a JSON or JSON Lines file of {patient_id, symptoms, report_path}")
+    parser.add_argument("--max-concurrency", type=int,
+                        help="Admissions processed at once with --batch (default: HEALTHMATE_BATCH_CONCURRENCY or 16), "
+                             "or reports parsed at once with --ingest-reports (default: HEALTHMATE_INGEST_IN_FLIGHT or 16)")
+    parser.add_argument("--ingest-reports", type=str, metavar="DIR",
+                        help="Parse and store every PDF report under DIR, matched to patients by file name, "
+                             "directory or the name in the report. Re-running resumes where it stopped.")
+    parser.add_argument("--serve", action="store_true", help="Run the HTTP service instead of the CLI")
+    parser.add_argument("--host", type=str, help="Address to listen on with --serve (default: HEALTHMATE_HOST or 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="Port to listen on with --serve (default: HEALTHMATE_PORT or 8080)")
+    parser.add_argument("--workers", type=int,
+                        help="Server processes sharing the port with --serve (default: HEALTHMATE_SERVER_WORKERS or 1)")
+    parser.add_argument("--backfill-lab-results", action="store_true",
+                        help="Index lab values of reports stored before the lab_results table existed, "
+                             "or whose lab dates a migration marked for re-indexing")
     
     args = parser.parse_args()
     
-    if args.test_scenario:
-        asyncio.run(run_test_scenario(args.test_scenario))
-    else:
-        asyncio.run(run_cli())
+    if args.serve:
+        # Each server process builds its own AppContext
+        from healthmate_ai.server import run_server, SERVER_HOST, SERVER_PORT, SERVER_WORKERS
+        run_server(args.host or SERVER_HOST, args.port or SERVER_PORT, args.workers or SERVER_WORKERS)
+        raise SystemExit(0)
+
+    # One database layer, set of agents and worker pools for the whole run
+    app = AppContext()
+    try:
+        if args.backfill_lab_results:
+            count = app.get("db_tool").backfill_lab_results()
+            logger.info(f"Backfilled lab results for {count} reports.")
+        elif args.ingest_reports:
+            run_ingest_reports(app, args.ingest_reports, args.max_concurrency)
+        elif args.batch:
+            asyncio.run(run_batch(app, args.batch, args.max_concurrency))
+        elif args.test_scenario:
+            asyncio.run(run_test_scenario(app, args.test_scenario))
+        else:
+            asyncio.run(run_cli(app))
+    finally:
+        app.close()
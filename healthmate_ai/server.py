@@ -0,0 +1,411 @@
+"""
+Headless HTTP service for the admissions pipeline (`python -m healthmate_ai.main --serve`).
+
+Endpoints:
+    POST /admissions                      {"patient_id", "symptoms", "report_path"?}
+    GET  /doctors/{doctor_id}/schedule    ?date=YYYY-MM-DD (default today)
+    GET  /patients/{patient_id}/insight   ?visits_cursor=&reports_cursor=
+    POST /doctor/query                    {"doctor_id", "question"}
+    GET  /healthz
+    GET  /metrics
+
+Admissions go through a bounded queue served by a fixed pool of worker
+coroutines. When the queue is full a request is rejected straight away
+with 503 and Retry-After, instead of piling up latency for everyone.
+On SIGTERM/SIGINT the server stops accepting connections, reports
+"draining" on /healthz, finishes the admissions it has accepted and then
+closes its services.
+
+With --workers N, N processes bind the same port with SO_REUSEPORT and
+the kernel spreads connections across them. Each process has its own
+AppContext; they share the SQLite database in WAL mode (and so the triage
+cache table).
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from aiohttp import web
+
+from healthmate_ai.core.app_context import AppContext
+from healthmate_ai.core.logger import setup_logger
+
+logger = setup_logger("Server")
+
+SERVER_HOST = os.getenv("HEALTHMATE_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("HEALTHMATE_PORT", "8080"))
+SERVER_WORKERS = int(os.getenv("HEALTHMATE_SERVER_WORKERS", "1"))
+# Per process: admissions processed at once, and how many more may wait for a worker
+ADMISSION_WORKERS = int(os.getenv("HEALTHMATE_ADMISSION_WORKERS", "16"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("HEALTHMATE_ADMISSION_QUEUE", "64"))
+# Seconds a client waits for its admission before getting 504
+ADMISSION_TIMEOUT = float(os.getenv("HEALTHMATE_ADMISSION_TIMEOUT", "60"))
+# Doctor questions answered by the model at once, per process
+DOCTOR_QUERY_CONCURRENCY = int(os.getenv("HEALTHMATE_DOCTOR_QUERY_CONCURRENCY", "8"))
+# Reminders are sent by a periodic cycle rather than after every admission
+REMINDER_INTERVAL = float(os.getenv("HEALTHMATE_REMINDER_INTERVAL", "30"))
+SHUTDOWN_TIMEOUT = float(os.getenv("HEALTHMATE_SHUTDOWN_TIMEOUT", "30"))
+# Admissions may only reference report files inside this directory; unset disables report_path
+REPORTS_DIR = os.getenv("HEALTHMATE_REPORTS_DIR", "")
+
+# Latencies kept per route for the percentiles in /metrics
+_LATENCY_WINDOW = 1000
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class AdmissionQueue:
+    """
+    A bounded queue of admissions drained by a fixed number of worker coroutines.
+    """
+    def __init__(self, orchestrator, workers: int = ADMISSION_WORKERS, queue_size: int = ADMISSION_QUEUE_SIZE):
+        self.orchestrator = orchestrator
+        self.workers = workers
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._work(), name=f"admission-worker-{i}")
+                       for i in range(self.workers)]
+
+    async def submit(self, request: Dict[str, Any], timeout: float = ADMISSION_TIMEOUT) -> Dict[str, Any]:
+        """
+        Queues an admission and waits for its result. Raises QueueFullError
+        when the queue is full and asyncio.TimeoutError after `timeout`.
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((request, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError()
+        # On timeout the future is cancelled; a worker that has not started
+        # the admission yet skips it
+        return await asyncio.wait_for(future, timeout)
+
+    async def _work(self):
+        while True:
+            request, future = await self._queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                self.in_flight += 1
+                try:
+                    result = await self.orchestrator.process_patient_request(
+                        request["patient_id"], request["symptoms"], request.get("report_path"),
+                        run_reminders=False
+                    )
+                except Exception as e:
+                    self.failed += 1
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    self.completed += 1
+                    if not future.done():
+                        future.set_result(result)
+                finally:
+                    self.in_flight -= 1
+            finally:
+                self._queue.task_done()
+
+    async def drain(self, timeout: float):
+        """
+        Waits for accepted admissions to finish, then stops the workers.
+        """
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self._queue.qsize() + self.in_flight} admissions unfinished at shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
+
+
+class Metrics:
+    """
+    Request counts by route and status, and recent latency percentiles by route.
+    """
+    def __init__(self):
+        self.started_at = time.time()
+        self.requests: Counter = Counter()
+        self._latencies: Dict[str, Deque[float]] = {}
+
+    def observe(self, route: str, status: int, seconds: float):
+        self.requests[(route, status)] += 1
+        self._latencies.setdefault(route, deque(maxlen=_LATENCY_WINDOW)).append(seconds * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        routes: Dict[str, Any] = {}
+        for (route, status), count in self.requests.items():
+            routes.setdefault(route, {"status": {}})["status"][str(status)] = count
+        for route, window in self._latencies.items():
+            latencies = sorted(window)
+            routes[route]["p50_ms"] = round(latencies[len(latencies) // 2], 1)
+            routes[route]["p95_ms"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1)
+        return {"uptime_s": round(time.time() - self.started_at, 1), "routes": routes}
+
+
+APP_CONTEXT = web.AppKey("app_context", AppContext)
+ADMISSIONS = web.AppKey("admissions", AdmissionQueue)
+METRICS = web.AppKey("metrics", Metrics)
+STATE = web.AppKey("state", dict)
+
+
+def _error(status: int, message: str, **headers) -> web.Response:
+    return web.json_response({"error": message}, status=status, headers=headers or None)
+
+
+@web.middleware
+async def _observe(request: web.Request, handler):
+    start = time.perf_counter()
+    resource = request.match_info.route.resource
+    route = f"{request.method} {resource.canonical if resource else 'unmatched'}"
+    try:
+        response = await handler(request)
+    except web.HTTPException as e:
+        response = e
+    except Exception as e:
+        logger.error(f"{route} failed: {e}")
+        response = _error(500, "internal error")
+    request.app[METRICS].observe(route, response.status, time.perf_counter() - start)
+    if isinstance(response, web.HTTPException):
+        raise response
+    return response
+
+
+async def _json_body(request: web.Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise web.HTTPBadRequest(text=json.dumps({"error": "body must be JSON"}), content_type="application/json")
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text=json.dumps({"error": "body must be a JSON object"}), content_type="application/json")
+    return body
+
+
+def _report_path(value: Any) -> Optional[str]:
+    # Clients name a file inside REPORTS_DIR; anything resolving outside it is refused
+    if value in (None, ""):
+        return None
+    if not REPORTS_DIR or not isinstance(value, str):
+        raise ValueError("report_path is not accepted by this server")
+    root = os.path.realpath(REPORTS_DIR)
+    path = os.path.realpath(os.path.join(root, value))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError("report_path must be inside the reports directory")
+    return path
+
+
+async def admit(request: web.Request) -> web.Response:
+    body = await _json_body(request)
+    patient_id, symptoms = body.get("patient_id"), body.get("symptoms")
+    if not isinstance(patient_id, str) or not patient_id or not isinstance(symptoms, str) or not symptoms.strip():
+        return _error(400, "patient_id and symptoms are required strings")
+    try:
+        report_path = _report_path(body.get("report_path"))
+    except ValueError as e:
+        return _error(400, str(e))
+
+    if request.app[STATE]["draining"]:
+        return _error(503, "server is shutting down", **{"Retry-After": "5"})
+    if await request.app[APP_CONTEXT].get("async_db").get_patient(patient_id) is None:
+        return _error(404, "patient not found")
+    try:
+        result = await request.app[ADMISSIONS].submit(
+            {"patient_id": patient_id, "symptoms": symptoms, "report_path": report_path},
+            timeout=ADMISSION_TIMEOUT
+        )
+    except QueueFullError:
+        return _error(503, "admission queue is full", **{"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        return _error(504, "admission timed out")
+    return web.json_response(result)
+
+
+async def doctor_schedule(request: web.Request) -> web.Response:
+    date = request.query.get("date") or datetime.now().strftime("%Y-%m-%d")
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        return _error(400, "date must be YYYY-MM-DD")
+    context = request.app[APP_CONTEXT]
+    tools = context.get("doctor_tools")
+    result = await context.get("executors").run_io(tools.get_doctor_schedule, request.match_info["doctor_id"], date)
+    return web.json_response(result)
+
+
+async def patient_insight(request: web.Request) -> web.Response:
+    context = request.app[APP_CONTEXT]
+    tools = context.get("doctor_tools")
+    result = await context.get("executors").run_io(
+        tools.get_patient_insight, request.match_info["patient_id"],
+        request.query.get("visits_cursor", ""), request.query.get("reports_cursor", "")
+    )
+    if result.get("error"):
+        return web.json_response(result, status=404 if result["error"] == "Patient not found" else 400)
+    return web.json_response(result)
+
+
+async def doctor_query(request: web.Request) -> web.Response:
+    body = await _json_body(request)
+    doctor_id = body.get("doctor_id") or "Dr. Smith"
+    question = body.get("question")
+    if not isinstance(question, str) or not question.strip():
+        return _error(400, "question is required")
+
+    state = request.app[STATE]
+    context = request.app[APP_CONTEXT]
+    route = context.get("doctor_router").best(question)
+    # A fresh agent per request: HTTP clients must not share a conversation
+    context.get("doctor_tools")
+    if route and route["agent"] == "insight":
+        from healthmate_ai.agents.patient_insight_agent import PatientInsightAgent
+        agent, query = PatientInsightAgent(context.get("model_factory")), question
+    else:
+        from healthmate_ai.agents.doctor_schedule_agent import DoctorScheduleAgent
+        today = datetime.now().strftime("%Y-%m-%d")
+        agent, query = DoctorScheduleAgent(context.get("model_factory")), f"Doctor ID: {doctor_id}, Date: {today}. Question: {question}"
+
+    async with state["doctor_queries"]:
+        answer = await context.get("executors").run_io(agent.process_query, query)
+    return web.json_response({"agent": type(agent).__name__, "answer": answer})
+
+
+async def healthz(request: web.Request) -> web.Response:
+    draining = request.app[STATE]["draining"]
+    return web.json_response({"status": "draining" if draining else "ok", "pid": os.getpid()},
+                             status=503 if draining else 200)
+
+
+async def metrics(request: web.Request) -> web.Response:
+    context = request.app[APP_CONTEXT]
+    snapshot = request.app[METRICS].snapshot()
+    snapshot["pid"] = os.getpid()
+    snapshot["admissions"] = request.app[ADMISSIONS].stats()
+    snapshot["llm"] = context.get("llm_client").stats()
+    snapshot["triage_cache"] = context.get("triage_cache").stats()
+    if context.is_loaded("report_cache"):
+        snapshot["report_cache"] = context.get("report_cache").stats()
+    snapshot["triage_batcher"] = context.get("orchestrator").triage_batcher.stats()
+    snapshot["db_caches"] = context.get("db_tool").cache_stats()
+    return web.json_response(snapshot)
+
+
+async def _reminder_loop(app: web.Application):
+    context = app[APP_CONTEXT]
+    while True:
+        await asyncio.sleep(REMINDER_INTERVAL)
+        try:
+            await context.get("reminder_agent").run_cycle_async(context.get("async_db"), context.get("executors"))
+        except Exception as e:
+            logger.error(f"Reminder cycle failed: {e}")
+
+
+async def _on_startup(app: web.Application):
+    context = app[APP_CONTEXT]
+    orchestrator = context.get("orchestrator")
+    # Start PDF worker processes now rather than on the first report
+    await asyncio.get_running_loop().run_in_executor(None, context.get("executors").warm_up)
+    app[ADMISSIONS] = AdmissionQueue(orchestrator, ADMISSION_WORKERS, ADMISSION_QUEUE_SIZE)
+    app[ADMISSIONS].start()
+    app[STATE]["doctor_queries"] = asyncio.Semaphore(DOCTOR_QUERY_CONCURRENCY)
+    app[STATE]["reminders"] = asyncio.create_task(_reminder_loop(app))
+    logger.info(f"Worker {os.getpid()} ready")
+
+
+async def _on_shutdown(app: web.Application):
+    # Runs once the listening socket is closed, before open requests finish
+    app[STATE]["draining"] = True
+    logger.info(f"Worker {os.getpid()} draining")
+
+
+async def _on_cleanup(app: web.Application):
+    await app[ADMISSIONS].drain(SHUTDOWN_TIMEOUT)
+    reminders = app[STATE]["reminders"]
+    reminders.cancel()
+    await asyncio.gather(reminders, return_exceptions=True)
+    context = app[APP_CONTEXT]
+    # One last cycle for reminders created by the final admissions
+    await context.get("reminder_agent").run_cycle_async(context.get("async_db"), context.get("executors"))
+    context.close()
+    logger.info(f"Worker {os.getpid()} stopped")
+
+
+def create_app(context: Optional[AppContext] = None) -> web.Application:
+    app = web.Application(middlewares=[_observe])
+    app[APP_CONTEXT] = context or AppContext()
+    app[METRICS] = Metrics()
+    app[STATE] = {"draining": False}
+    app.add_routes([
+        web.post("/admissions", admit),
+        web.get("/doctors/{doctor_id}/schedule", doctor_schedule),
+        web.get("/patients/{patient_id}/insight", patient_insight),
+        web.post("/doctor/query", doctor_query),
+        web.get("/healthz", healthz),
+        web.get("/metrics", metrics),
+    ])
+    app.on_startup.append(_on_startup)
+    app.on_shutdown.append(_on_shutdown)
+    app.on_cleanup.append(_on_cleanup)
+    return app
+
+
+def _serve(host: str, port: int, reuse_port: bool):
+    web.run_app(create_app(), host=host, port=port, reuse_port=reuse_port,
+                shutdown_timeout=SHUTDOWN_TIMEOUT, print=None, access_log=None)
+
+
+def run_server(host: str = SERVER_HOST, port: int = SERVER_PORT, workers: int = SERVER_WORKERS):
+    """
+    Serves until SIGINT/SIGTERM. With several workers, this process only
+    starts them, forwards SIGTERM, and waits for them to drain.
+    """
+    # Migrate once here, so the workers do not all race to do it
+    AppContext()
+    if workers <= 1:
+        logger.info(f"Serving on http://{host}:{port}")
+        _serve(host, port, reuse_port=False)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_serve, args=(host, port, True), name=f"healthmate-http-{i}")
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+    logger.info(f"Serving on http://{host}:{port} with {workers} worker processes")
+
+    def _forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _forward)
+    # Ctrl+C reaches the whole process group, so the workers get it themselves
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for process in processes:
+        process.join()
@@ -0,0 +1,126 @@
+"""
+Typed lab values from report text: "Blood Pressure: 120/80 mmHg" becomes
+("blood_pressure", {"systolic": 120.0, "diastolic": 80.0, "unit": "mmHg"}),
+"Glucose: 5.5 mmol/L" becomes ("glucose", {"value": 99.1, "unit": "mg/dL"}).
+
+The analytes, their spellings, units and conversions live in
+rules/lab_analytes.json. They are compiled into a single regular
+expression, so one scan of the text finds every reading whatever the number
+of analytes. Values are converted to the analyte's canonical unit and
+dropped if implausible (outside the analyte's range), which also rejects
+dates and reference ranges mistaken for readings. The value shapes are the
+ones lab_values.normalize_lab_values reads.
+"""
+
+import os
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from healthmate_ai.core.rule_engine import _trie_pattern, load_rules
+from healthmate_ai.tools.triage_rules import RULES_DIR
+
+LAB_ANALYTES_PATH = os.getenv("HEALTHMATE_LAB_ANALYTES", os.path.join(RULES_DIR, "lab_analytes.json"))
+
+_NUMBER = r"(\d+(?:\.\d+)?)"
+# Between the name and the value: spaces, a parenthesised qualifier
+# ("(fasting)"), a colon or equals sign, or "is" / "was" / "of"
+_GAP = r"[^\S\n]*(?:\([^)\n]{0,24}\)[^\S\n]*)?(?:[:=][^\S\n]*|(?:is|was|of)[^\S\n]+)?"
+
+Reading = Tuple[str, Dict[str, Any]]
+
+
+def _unit_key(unit: str) -> str:
+    return "".join(unit.lower().split())
+
+
+def _conversion(spec: Any) -> Tuple[float, float]:
+    # A unit maps to a factor, or to [scale, offset] for value * scale + offset
+    if isinstance(spec, list):
+        return float(spec[0]), float(spec[1])
+    return float(spec), 0.0
+
+
+class AnalyteExtractor:
+    """
+    Finds lab readings in text. scan() yields (name, value) for each reading
+    in order; extract() keeps the last reading of each analyte.
+    """
+    def __init__(self, path: str = LAB_ANALYTES_PATH):
+        config = load_rules(path)
+        self.version = config.get("version")
+        self.analytes: Dict[str, Dict[str, Any]] = {}
+        self._by_alias: Dict[str, Dict[str, Any]] = {}
+        units = set()
+        for analyte in config["analytes"]:
+            analyte = dict(analyte)
+            analyte["conversions"] = {_unit_key(unit): _conversion(spec) for unit, spec in analyte["units"].items()}
+            self.analytes[analyte["name"]] = analyte
+            for alias in analyte["aliases"]:
+                self._by_alias[" ".join(alias.lower().split())] = analyte
+            units.update(analyte["units"])
+
+        unit_pattern = "|".join(
+            r"\s*".join(re.escape(part) for part in unit.split())
+            for unit in sorted(units, key=len, reverse=True)
+        )
+        self._pattern = re.compile(
+            r"(?<![a-z0-9])(" + _trie_pattern(self._by_alias) + r")(?![a-z0-9])" + _GAP
+            + _NUMBER + r"(?:[^\S\n]*/[^\S\n]*" + _NUMBER + r")?"
+            + r"(?:[^\S\n]*(" + unit_pattern + r")(?![a-z]))?",
+            re.IGNORECASE
+        )
+
+    def scan(self, text: str) -> Iterator[Reading]:
+        for match in self._pattern.finditer(text):
+            analyte = self._by_alias[" ".join(match.group(1).lower().split())]
+            reading = self._reading(analyte, match.group(2), match.group(3), match.group(4))
+            if reading is not None:
+                yield analyte["name"], reading
+
+    def extract(self, text: str) -> Dict[str, Dict[str, Any]]:
+        return dict(self.scan(text))
+
+    def _reading(self, analyte: Dict[str, Any], first: str, second: Optional[str],
+                 unit: Optional[str]) -> Optional[Dict[str, Any]]:
+        pair = analyte.get("pair")
+        if pair and second is None:
+            return None
+        numbers = [float(first)] + ([float(second)] if pair else [])
+        values = self._convert(analyte, numbers, unit)
+        if values is None:
+            return None
+        if pair:
+            return {pair[0]: values[0], pair[1]: values[1], "unit": analyte["unit"]}
+        return {"value": values[0], "unit": analyte["unit"]}
+
+    def _convert(self, analyte: Dict[str, Any], numbers: List[float], unit: Optional[str]) -> Optional[List[float]]:
+        low, high = analyte["range"]
+        if unit:
+            candidates = [analyte["conversions"].get(_unit_key(unit))]
+        else:
+            # No unit: the canonical one if plausible, else the first unit
+            # that makes it plausible (98.6 -> 37.0 C, glucose 5.5 -> mmol/L)
+            candidates = [(1.0, 0.0)] + list(analyte["conversions"].values())
+        for conversion in candidates:
+            if conversion is None:
+                continue
+            scale, offset = conversion
+            values = [round(number * scale + offset, 2) for number in numbers]
+            if all(low <= value <= high for value in values):
+                return values
+        return None
+
+
+_extractor: Optional[AnalyteExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_analyte_extractor() -> AnalyteExtractor:
+    """
+    The process-wide AnalyteExtractor, compiled on first use.
+    """
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = AnalyteExtractor()
+        return _extractor
@@ -0,0 +1,118 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from healthmate_ai.tools.database_tool import DatabaseTool, BULK_CHUNK_SIZE
+from healthmate_ai.tools.records import Patient, Visit, Reminder
+
+DEFAULT_READER_THREADS = 4
+
+
+class AsyncDatabaseTool:
+    """
+    Awaitable facade over DatabaseTool for code running on the event loop.
+
+    Writes are serialized on one dedicated writer thread (SQLite only allows a
+    single writer anyway), while reads fan out over a pool of reader threads.
+    Every thread gets its own pooled WAL connection, so readers never wait on
+    the writer and the event loop never waits on disk.
+    """
+    def __init__(self,
+                 db_tool: Optional[DatabaseTool] = None,
+                 db_path: str = "healthmate.db",
+                 reader_threads: int = DEFAULT_READER_THREADS):
+        self.db_tool = db_tool or DatabaseTool(db_path)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="healthmate-db-writer")
+        self._readers = ThreadPoolExecutor(max_workers=reader_threads, thread_name_prefix="healthmate-db-reader")
+
+    async def run_read(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Runs a blocking read on a reader thread.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, functools.partial(func, *args, **kwargs))
+
+    async def run_write(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Runs a blocking write on the writer thread.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, functools.partial(func, *args, **kwargs))
+
+    async def run_in_transaction(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Calls func(db_tool, *args, **kwargs) on the writer thread inside a single
+        DatabaseTool transaction, so all of its writes commit together.
+        """
+        def _run():
+            with self.db_tool.transaction():
+                return func(self.db_tool, *args, **kwargs)
+        return await self.run_write(_run)
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.db_tool.cache_stats()
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+
+    # Reads
+
+    async def get_patient(self, patient_id: str) -> Optional[Patient]:
+        return await self.run_read(self.db_tool.get_patient, patient_id)
+
+    async def find_patient_by_name(self, name: str) -> Optional[Patient]:
+        return await self.run_read(self.db_tool.find_patient_by_name, name)
+
+    async def get_patient_history(self, patient_id: str) -> List[Visit]:
+        return await self.run_read(self.db_tool.get_patient_history, patient_id)
+
+    async def get_patient_context(self, patient_id: str, **kwargs) -> Dict[str, Any]:
+        return await self.run_read(self.db_tool.get_patient_context, patient_id, **kwargs)
+
+    async def get_pending_reminders(self) -> List[Reminder]:
+        return await self.run_read(self.db_tool.get_pending_reminders)
+
+    # Writes
+
+    async def add_patient(self, patient_data: Dict[str, Any]):
+        return await self.run_write(self.db_tool.add_patient, patient_data)
+
+    async def add_visit(self, visit_data: Dict[str, Any]):
+        return await self.run_write(self.db_tool.add_visit, visit_data)
+
+    async def add_appointment(self, appointment_data: Dict[str, Any]):
+        return await self.run_write(self.db_tool.add_appointment, appointment_data)
+
+    async def add_medical_report(self, report_data: Dict[str, Any]):
+        return await self.run_write(self.db_tool.add_medical_report, report_data)
+
+    async def add_reminder(self, reminder_data: Dict[str, Any]):
+        return await self.run_write(self.db_tool.add_reminder, reminder_data)
+
+    async def mark_reminder_sent(self, reminder_id: str):
+        return await self.run_write(self.db_tool.mark_reminder_sent, reminder_id)
+
+    async def claim_due_reminders(self, worker_id: str, limit: int = 100, **kwargs) -> List[Reminder]:
+        return await self.run_write(self.db_tool.claim_due_reminders, worker_id, limit, **kwargs)
+
+    async def mark_reminders_sent(self, reminder_ids: List[str]):
+        return await self.run_write(self.db_tool.mark_reminders_sent, reminder_ids)
+
+    async def release_reminders(self, reminder_ids: List[str]):
+        return await self.run_write(self.db_tool.release_reminders, reminder_ids)
+
+    async def add_patient_bulk(self, patients: Iterable[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        return await self.run_write(self.db_tool.add_patient_bulk, patients, chunk_size)
+
+    async def add_visit_bulk(self, visits: Iterable[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        return await self.run_write(self.db_tool.add_visit_bulk, visits, chunk_size)
+
+    async def add_appointment_bulk(self, appointments: Iterable[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        return await self.run_write(self.db_tool.add_appointment_bulk, appointments, chunk_size)
+
+    async def add_medical_report_bulk(self, reports: Iterable[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        return await self.run_write(self.db_tool.add_medical_report_bulk, reports, chunk_size)
+
+    async def add_reminder_bulk(self, reminders: Iterable[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        return await self.run_write(self.db_tool.add_reminder_bulk, reminders, chunk_size)
@@ -1,237 +1,454 @@
+import os
 import sqlite3
 import json
+import pickle
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Any
+from healthmate_ai.core.cache import LRUCache, get_cache
+from healthmate_ai.core.datetime_utils import to_epoch
+from healthmate_ai.core.db_pool import get_pool
+from healthmate_ai.tools.db_migrations import ensure_schema
+from healthmate_ai.tools.lab_values import normalize_lab_values, report_taken_at
+from healthmate_ai.tools.patient_context_query import (
+    DEFAULT_REPORT_LIMIT, DEFAULT_VISIT_LIMIT, fetch_patient_context
+)
+from healthmate_ai.tools.records import Patient, Visit, Reminder, MedicalReport, row_factory
+
+_PATIENT_COLUMNS = 'patient_id, name, age, gender, phone, email'
+_VISIT_COLUMNS = 'visit_id, patient_id, symptoms, triage_summary, severity, department, timestamp'
+_REMINDER_COLUMNS = 'reminder_id, appointment_id, reminder_date, sent_flag'
+
+_patient_rows = row_factory(Patient)
+_visit_rows = row_factory(Visit)
+_reminder_rows = row_factory(Reminder)
+_report_rows = row_factory(MedicalReport)
+
+# Rows per transaction for the add_*_bulk methods
+BULK_CHUNK_SIZE = 1000
+
+# Read-through caches for patient lookups. The TTL bounds staleness from
+# writes made by other processes, which cannot invalidate this one's cache.
+PATIENT_CACHE_SIZE = int(os.getenv("HEALTHMATE_PATIENT_CACHE_SIZE", "10000"))
+HISTORY_CACHE_SIZE = int(os.getenv("HEALTHMATE_HISTORY_CACHE_SIZE", "2000"))
+PATIENT_CACHE_TTL = float(os.getenv("HEALTHMATE_PATIENT_CACHE_TTL", "300"))
+
+# How long a claimed reminder stays reserved for its worker
+REMINDER_LEASE_SECONDS = 300
+
+_PATIENT_INSERT = '''
+    INSERT OR REPLACE INTO patients (patient_id, name, age, gender, phone, email)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+_VISIT_INSERT = '''
+    INSERT INTO visits (visit_id, patient_id, symptoms, triage_summary, severity, department, timestamp, visited_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+_APPOINTMENT_INSERT = '''
+    INSERT INTO appointments (appointment_id, patient_id, doctor_id, date, status, starts_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+_MEDICAL_REPORT_INSERT = '''
+    INSERT INTO medical_reports (report_id, patient_id, extracted_data, labs_indexed)
+    VALUES (?, ?, ?, 1)
+'''
+_LAB_RESULT_INSERT = '''
+    INSERT INTO lab_results (patient_id, report_id, analyte, value_num, unit, taken_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+_REMINDER_INSERT = '''
+    INSERT INTO reminders (reminder_id, appointment_id, reminder_date, sent_flag, remind_at)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+# Read queries on request paths; benchmarks/check_query_plans.py checks
+# these very strings for index use
+_PATIENT_SELECT = f'SELECT {_PATIENT_COLUMNS} FROM patients WHERE {{column}} = ?'
+_HISTORY_SELECT = f'SELECT {_VISIT_COLUMNS} FROM visits WHERE patient_id = ? ORDER BY visited_at DESC'
+_PENDING_REMINDERS_SELECT = f'SELECT {_REMINDER_COLUMNS} FROM reminders WHERE sent_flag = 0 AND remind_at <= ?'
+_REMINDER_CLAIM = f'''
+    UPDATE reminders SET lease_owner = ?, lease_until = ?
+    WHERE reminder_id IN (
+        SELECT reminder_id FROM reminders
+        WHERE sent_flag = 0 AND remind_at <= ?
+          AND (lease_until IS NULL OR lease_until <= ?)
+        ORDER BY remind_at
+        LIMIT ?
+    )
+    RETURNING {_REMINDER_COLUMNS}
+'''
+_UNINDEXED_REPORTS_SELECT = '''
+    SELECT report_id, patient_id, extracted_data FROM medical_reports
+    WHERE labs_indexed = 0
+    LIMIT ?
+'''
+
+def _patient_row(patient_data: Dict[str, Any]) -> tuple:
+    return (
+        patient_data['patient_id'],
+        patient_data['name'],
+        patient_data['age'],
+        patient_data['gender'],
+        patient_data['phone'],
+        patient_data['email']
+    )
+
+def _visit_row(visit_data: Dict[str, Any]) -> tuple:
+    timestamp = visit_data.get('timestamp', datetime.now().isoformat())
+    return (
+        visit_data['visit_id'],
+        visit_data['patient_id'],
+        visit_data['symptoms'],
+        visit_data['triage_summary'],
+        visit_data['severity'],
+        visit_data['department'],
+        timestamp,
+        to_epoch(timestamp)
+    )
+
+def _appointment_row(appointment_data: Dict[str, Any]) -> tuple:
+    return (
+        appointment_data['appointment_id'],
+        appointment_data['patient_id'],
+        appointment_data['doctor_id'],
+        appointment_data['date'],
+        appointment_data['status'],
+        to_epoch(appointment_data['date'])
+    )
+
+def _medical_report_row(report_data: Dict[str, Any]) -> tuple:
+    return (
+        report_data['report_id'],
+        report_data['patient_id'],
+        json.dumps(report_data['extracted_data'])
+    )
+
+def _lab_result_rows(report_id: str, patient_id: str, extracted_data: Any) -> List[tuple]:
+    taken_at = report_taken_at(extracted_data)
+    return [
+        (patient_id, report_id, analyte, value, unit, taken_at)
+        for analyte, value, unit in normalize_lab_values(extracted_data)
+    ]
+
+def _reminder_row(reminder_data: Dict[str, Any]) -> tuple:
+    return (
+        reminder_data['reminder_id'],
+        reminder_data['appointment_id'],
+        reminder_data['reminder_date'],
+        0,
+        to_epoch(reminder_data['reminder_date'])
+    )
 
 class DatabaseTool:
     def __init__(self, db_path: str = "healthmate.db"):
         self.db_path = db_path
+        # Connections are shared per thread across every tool pointing at this file
+        self._pool = get_pool(db_path)
+        # Caches are shared the same way, so a write through any instance invalidates them
+        cache_prefix = os.path.abspath(db_path)
+        self._patients = get_cache(f"{cache_prefix}:patients", PATIENT_CACHE_SIZE, PATIENT_CACHE_TTL)
+        self._patients_by_name = get_cache(f"{cache_prefix}:patients_by_name", PATIENT_CACHE_SIZE, PATIENT_CACHE_TTL)
+        self._histories = get_cache(f"{cache_prefix}:visit_history", HISTORY_CACHE_SIZE, PATIENT_CACHE_TTL)
+        self._contexts = get_cache(f"{cache_prefix}:patient_context", HISTORY_CACHE_SIZE, PATIENT_CACHE_TTL)
         self._init_db()
 
-    def _get_connection(self):
-        return sqlite3.connect(self.db_path)
+    def _get_connection(self) -> sqlite3.Connection:
+        return self._pool.get_connection()
 
     def _init_db(self):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        # Patients table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS patients (
-                patient_id TEXT PRIMARY KEY,
-                name TEXT,
-                age INTEGER,
-                gender TEXT,
-                phone TEXT,
-                email TEXT
-            )
-        ''')
-
-        # Visits table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS visits (
-                visit_id TEXT PRIMARY KEY,
-                patient_id TEXT,
-                symptoms TEXT,
-                triage_summary TEXT,
-                severity TEXT,
-                department TEXT,
-                timestamp TEXT,
-                FOREIGN KEY(patient_id) REFERENCES patients(patient_id)
-            )
-        ''')
-
-        # Appointments table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS appointments (
-                appointment_id TEXT PRIMARY KEY,
-                patient_id TEXT,
-                doctor_id TEXT,
-                date TEXT,
-                status TEXT,
-                FOREIGN KEY(patient_id) REFERENCES patients(patient_id)
-            )
-        ''')
-
-        # Medical Reports table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS medical_reports (
-                report_id TEXT PRIMARY KEY,
-                patient_id TEXT,
-                extracted_data TEXT,
-                FOREIGN KEY(patient_id) REFERENCES patients(patient_id)
-            )
-        ''')
-
-        # Reminders table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS reminders (
-                reminder_id TEXT PRIMARY KEY,
-                appointment_id TEXT,
-                reminder_date TEXT,
-                sent_flag INTEGER DEFAULT 0,
-                FOREIGN KEY(appointment_id) REFERENCES appointments(appointment_id)
-            )
-        ''')
-
-        conn.commit()
-        conn.close()
+        ensure_schema(self._pool)
+
+    def transaction(self):
+        """
+        Groups several writes into a single commit:
+
+            with db.transaction():
+                db.add_visit(...)
+                db.add_appointment(...)
+
+        Any add_* call made inside the block joins it, and an exception rolls
+        all of them back.
+        """
+        return self._pool.transaction()
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Hit/miss/eviction counters for the patient lookup caches.
+        """
+        caches = (self._patients, self._patients_by_name, self._histories, self._contexts)
+        return {cache.name: cache.stats() for cache in caches}
+
+    def _invalidate(self, cache: LRUCache, key: Any):
+        # Drop now for reads on this thread, and again after commit in case
+        # another thread re-read the old committed row in between
+        cache.invalidate(key)
+        self._pool.call_after_commit(lambda: cache.invalidate(key))
+
+    def _cached(self, cache: LRUCache, key: Any, loader: Callable[[], Any]) -> Any:
+        # Inside a transaction a read can see this thread's uncommitted rows,
+        # which must not reach the shared cache and outlive a rollback
+        if self._pool.in_transaction():
+            return loader()
+        return cache.get_or_load(key, loader)
+
+    def _insert_many(self, sql: str, rows: Iterable[tuple], chunk_size: int, on_chunk=None) -> int:
+        # Stream rows through executemany, committing once per chunk
+        rows = iter(rows)
+        total = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return total
+            with self._pool.transaction() as conn:
+                conn.executemany(sql, chunk)
+                if on_chunk:
+                    on_chunk(chunk)
+            total += len(chunk)
 
     def add_patient(self, patient_data: Dict[str, Any]):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO patients (patient_id, name, age, gender, phone, email)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            patient_data['patient_id'],
-            patient_data['name'],
-            patient_data['age'],
-            patient_data['gender'],
-            patient_data['phone'],
-            patient_data['email']
-        ))
-        conn.commit()
-        conn.close()
-
-    def get_patient(self, patient_id: str) -> Optional[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM patients WHERE patient_id = ?', (patient_id,))
-        row = cursor.fetchone()
-        conn.close()
-        if row:
-            return {
-                'patient_id': row[0],
-                'name': row[1],
-                'age': row[2],
-                'gender': row[3],
-                'phone': row[4],
-                'email': row[5]
-            }
-        return None
-
-    def find_patient_by_name(self, name: str) -> Optional[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM patients WHERE name = ?', (name,))
-        row = cursor.fetchone()
-        conn.close()
-        if row:
-            return {
-                'patient_id': row[0],
-                'name': row[1],
-                'age': row[2],
-                'gender': row[3],
-                'phone': row[4],
-                'email': row[5]
-            }
-        return None
+        patient_id = patient_data['patient_id']
+        with self._pool.transaction() as conn:
+            previous = conn.execute('SELECT name FROM patients WHERE patient_id = ?', (patient_id,)).fetchone()
+            conn.execute(_PATIENT_INSERT, _patient_row(patient_data))
+            self._invalidate(self._patients, patient_id)
+            self._invalidate(self._contexts, patient_id)
+            self._invalidate(self._patients_by_name, patient_data['name'])
+            if previous and previous[0] != patient_data['name']:
+                self._invalidate(self._patients_by_name, previous[0])
+
+    def add_patient_bulk(self, patients: Iterable[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """
+        Inserts many patients with executemany, one transaction per chunk.
+        Returns the number of rows written.
+        """
+        def _invalidate_chunk(chunk):
+            # Renames are not tracked row by row here, so drop every name entry
+            for row in chunk:
+                self._invalidate(self._patients, row[0])
+                self._invalidate(self._contexts, row[0])
+            self._patients_by_name.clear()
+            self._pool.call_after_commit(self._patients_by_name.clear)
+        return self._insert_many(_PATIENT_INSERT, map(_patient_row, patients), chunk_size, _invalidate_chunk)
+
+    def get_patient(self, patient_id: str) -> Optional[Patient]:
+        return self._cached(self._patients, patient_id, lambda: self._load_patient('patient_id', patient_id))
+
+    def find_patient_by_name(self, name: str) -> Optional[Patient]:
+        return self._cached(self._patients_by_name, name, lambda: self._load_patient('name', name))
+
+    def _load_patient(self, column: str, value: str) -> Optional[Patient]:
+        cursor = self._get_connection().cursor()
+        cursor.row_factory = _patient_rows
+        cursor.execute(_PATIENT_SELECT.format(column=column), (value,))
+        return cursor.fetchone()
 
     def add_visit(self, visit_data: Dict[str, Any]):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO visits (visit_id, patient_id, symptoms, triage_summary, severity, department, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            visit_data['visit_id'],
-            visit_data['patient_id'],
-            visit_data['symptoms'],
-            visit_data['triage_summary'],
-            visit_data['severity'],
-            visit_data['department'],
-            visit_data.get('timestamp', datetime.now().isoformat())
-        ))
-        conn.commit()
-        conn.close()
-    
-    def get_patient_history(self, patient_id: str) -> List[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM visits WHERE patient_id = ? ORDER BY timestamp DESC', (patient_id,))
-        rows = cursor.fetchall()
-        conn.close()
-        history = []
-        for row in rows:
-            history.append({
-                'visit_id': row[0],
-                'patient_id': row[1],
-                'symptoms': row[2],
-                'triage_summary': row[3],
-                'severity': row[4],
-                'department': row[5],
-                'timestamp': row[6]
-            })
-        return history
+        with self._pool.transaction() as conn:
+            conn.execute(_VISIT_INSERT, _visit_row(visit_data))
+            self._invalidate(self._histories, visit_data['patient_id'])
+            self._invalidate(self._contexts, visit_data['patient_id'])
+
+    def add_visit_bulk(self, visits: Iterable[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """
+        Inserts many visits with executemany, one transaction per chunk.
+        Returns the number of rows written.
+        """
+        def _invalidate_chunk(chunk):
+            for patient_id in {row[1] for row in chunk}:
+                self._invalidate(self._histories, patient_id)
+                self._invalidate(self._contexts, patient_id)
+        return self._insert_many(_VISIT_INSERT, map(_visit_row, visits), chunk_size, _invalidate_chunk)
+
+    def get_patient_history(self, patient_id: str) -> List[Visit]:
+        # Cached as a tuple so callers cannot mutate the shared entry
+        return list(self._cached(self._histories, patient_id, lambda: tuple(self._load_history(patient_id))))
+
+    def _load_history(self, patient_id: str) -> List[Visit]:
+        cursor = self._get_connection().cursor()
+        cursor.row_factory = _visit_rows
+        cursor.execute(_HISTORY_SELECT, (patient_id,))
+        return cursor.fetchall()
+
+    def get_patient_context(self,
+                            patient_id: str,
+                            visit_limit: int = DEFAULT_VISIT_LIMIT,
+                            report_limit: int = DEFAULT_REPORT_LIMIT,
+                            visits_cursor: Optional[str] = None,
+                            reports_cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Patient info plus the most recent visits and reports in one query,
+        with cursors for older pages. See fetch_patient_context.
+        """
+        def _load():
+            return fetch_patient_context(self._get_connection(), patient_id, visit_limit, report_limit,
+                                         visits_cursor, reports_cursor)
+
+        # Only the default first page is cached; it is what every admission reads.
+        # It is kept pickled so every caller gets its own copy to change
+        # (unpickling takes a fifth of the query; deepcopy takes longer than it).
+        if (visit_limit, report_limit) == (DEFAULT_VISIT_LIMIT, DEFAULT_REPORT_LIMIT) \
+                and not visits_cursor and not reports_cursor:
+            return pickle.loads(self._cached(self._contexts, patient_id,
+                                             lambda: pickle.dumps(_load(), pickle.HIGHEST_PROTOCOL)))
+        return _load()
 
     def add_appointment(self, appointment_data: Dict[str, Any]):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO appointments (appointment_id, patient_id, doctor_id, date, status)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            appointment_data['appointment_id'],
-            appointment_data['patient_id'],
-            appointment_data['doctor_id'],
-            appointment_data['date'],
-            appointment_data['status']
-        ))
-        conn.commit()
-        conn.close()
+        with self._pool.transaction() as conn:
+            conn.execute(_APPOINTMENT_INSERT, _appointment_row(appointment_data))
+
+    def add_appointment_bulk(self, appointments: Iterable[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """
+        Inserts many appointments with executemany, one transaction per chunk.
+        Returns the number of rows written.
+        """
+        return self._insert_many(_APPOINTMENT_INSERT, map(_appointment_row, appointments), chunk_size)
 
     def add_medical_report(self, report_data: Dict[str, Any]):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO medical_reports (report_id, patient_id, extracted_data)
-            VALUES (?, ?, ?)
-        ''', (
-            report_data['report_id'],
-            report_data['patient_id'],
-            json.dumps(report_data['extracted_data'])
-        ))
-        conn.commit()
-        conn.close()
+        with self._pool.transaction() as conn:
+            conn.execute(_MEDICAL_REPORT_INSERT, _medical_report_row(report_data))
+            conn.executemany(_LAB_RESULT_INSERT, _lab_result_rows(
+                report_data['report_id'], report_data['patient_id'], report_data['extracted_data']))
+            self._invalidate(self._contexts, report_data['patient_id'])
+
+    def add_medical_report_bulk(self, reports: Iterable[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """
+        Inserts many reports with executemany, one transaction per chunk.
+        Their lab_results rows are written in the same transaction.
+        Returns the number of reports written.
+        """
+        reports = iter(reports)
+        total = 0
+        while True:
+            chunk = list(islice(reports, chunk_size))
+            if not chunk:
+                return total
+            with self._pool.transaction() as conn:
+                conn.executemany(_MEDICAL_REPORT_INSERT, map(_medical_report_row, chunk))
+                conn.executemany(_LAB_RESULT_INSERT, [
+                    row for report in chunk
+                    for row in _lab_result_rows(report['report_id'], report['patient_id'], report['extracted_data'])
+                ])
+                for patient_id in {report['patient_id'] for report in chunk}:
+                    self._invalidate(self._contexts, patient_id)
+            total += len(chunk)
+
+    def delete_medical_reports(self, report_ids: Iterable[str]) -> int:
+        """
+        Deletes reports and their lab_results rows in one transaction.
+        Returns the number of reports deleted.
+        """
+        report_ids = json.dumps(list(report_ids))
+        with self._pool.transaction() as conn:
+            patient_ids = {row[0] for row in conn.execute('''
+                SELECT patient_id FROM medical_reports WHERE report_id IN (SELECT value FROM json_each(?))
+            ''', (report_ids,))}
+            conn.execute('''
+                DELETE FROM lab_results WHERE report_id IN (SELECT value FROM json_each(?))
+            ''', (report_ids,))
+            deleted = conn.execute('''
+                DELETE FROM medical_reports WHERE report_id IN (SELECT value FROM json_each(?))
+            ''', (report_ids,)).rowcount
+            for patient_id in patient_ids:
+                self._invalidate(self._contexts, patient_id)
+        return deleted
+
+    def backfill_lab_results(self, chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """
+        Extracts lab_results rows for reports stored before the table existed.
+        Works through them in chunks of one short transaction each, so it can
+        run alongside normal traffic and resume where it stopped.
+        Returns the number of reports processed.
+        """
+        total = 0
+        while True:
+            with self._pool.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = _report_rows
+                reports = cursor.execute(_UNINDEXED_REPORTS_SELECT, (chunk_size,)).fetchall()
+                if not reports:
+                    return total
+                lab_rows = []
+                for report in reports:
+                    try:
+                        data = report.data
+                    except ValueError:
+                        data = None
+                    lab_rows.extend(_lab_result_rows(report.report_id, report.patient_id, data))
+                report_ids = json.dumps([report.report_id for report in reports])
+                # Clear any partial rows so re-running never duplicates results
+                conn.execute('''
+                    DELETE FROM lab_results WHERE report_id IN (SELECT value FROM json_each(?))
+                ''', (report_ids,))
+                conn.executemany(_LAB_RESULT_INSERT, lab_rows)
+                conn.execute('''
+                    UPDATE medical_reports SET labs_indexed = 1
+                    WHERE report_id IN (SELECT value FROM json_each(?))
+                ''', (report_ids,))
+            total += len(reports)
 
     def add_reminder(self, reminder_data: Dict[str, Any]):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO reminders (reminder_id, appointment_id, reminder_date, sent_flag)
-            VALUES (?, ?, ?, ?)
-        ''', (
-            reminder_data['reminder_id'],
-            reminder_data['appointment_id'],
-            reminder_data['reminder_date'],
-            0
-        ))
-        conn.commit()
-        conn.close()
-
-    def get_pending_reminders(self) -> List[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        now = datetime.now().isoformat()
-        # Simple check: reminders that are due and not sent
-        # For simulation, we might just fetch all unsent
-        cursor.execute('SELECT * FROM reminders WHERE sent_flag = 0')
-        rows = cursor.fetchall()
-        conn.close()
-        reminders = []
-        for row in rows:
-            reminders.append({
-                'reminder_id': row[0],
-                'appointment_id': row[1],
-                'reminder_date': row[2],
-                'sent_flag': row[3]
-            })
-        return reminders
+        with self._pool.transaction() as conn:
+            conn.execute(_REMINDER_INSERT, _reminder_row(reminder_data))
+
+    def add_reminder_bulk(self, reminders: Iterable[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """
+        Inserts many reminders with executemany, one transaction per chunk.
+        Returns the number of rows written.
+        """
+        return self._insert_many(_REMINDER_INSERT, map(_reminder_row, reminders), chunk_size)
+
+    def get_pending_reminders(self) -> List[Reminder]:
+        """
+        Lists unsent reminders that are due now. Workers should use
+        claim_due_reminders instead, which also reserves them.
+        """
+        cursor = self._get_connection().cursor()
+        cursor.row_factory = _reminder_rows
+        now = to_epoch(datetime.now())
+        cursor.execute(_PENDING_REMINDERS_SELECT, (now,))
+        return cursor.fetchall()
+
+    def claim_due_reminders(self,
+                            worker_id: str,
+                            limit: int = 100,
+                            lease_seconds: int = REMINDER_LEASE_SECONDS) -> List[Reminder]:
+        """
+        Atomically leases up to `limit` due, unsent reminders whose lease is
+        free or expired, and returns them. A single UPDATE ... RETURNING does
+        the select and the reservation, so concurrent workers (threads or
+        processes) never receive the same reminder while its lease is live.
+        """
+        now = to_epoch(datetime.now())
+        with self._pool.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = _reminder_rows
+            cursor.execute(_REMINDER_CLAIM, (worker_id, now + lease_seconds, now, now, limit))
+            return cursor.fetchall()
+
+    def mark_reminders_sent(self, reminder_ids: List[str]):
+        """
+        Marks a batch of reminders as sent in one UPDATE.
+        """
+        if not reminder_ids:
+            return
+        with self._pool.transaction() as conn:
+            conn.execute('''
+                UPDATE reminders SET sent_flag = 1, lease_owner = NULL, lease_until = NULL
+                WHERE reminder_id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(reminder_ids),))
+
+    def release_reminders(self, reminder_ids: List[str]):
+        """
+        Gives up the lease on reminders that could not be sent, so the next
+        cycle can retry them without waiting for the lease to expire.
+        """
+        if not reminder_ids:
+            return
+        with self._pool.transaction() as conn:
+            conn.execute('''
+                UPDATE reminders SET lease_owner = NULL, lease_until = NULL
+                WHERE reminder_id IN (SELECT value FROM json_each(?)) AND sent_flag = 0
+            ''', (json.dumps(reminder_ids),))
 
     def mark_reminder_sent(self, reminder_id: str):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('UPDATE reminders SET sent_flag = 1 WHERE reminder_id = ?', (reminder_id,))
-        conn.commit()
-        conn.close()
+        self.mark_reminders_sent([reminder_id])
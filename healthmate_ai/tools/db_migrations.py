@@ -0,0 +1,283 @@
+import sqlite3
+import threading
+import weakref
+from datetime import datetime
+from typing import Callable, List, Tuple
+from healthmate_ai.core.datetime_utils import to_epoch
+from healthmate_ai.core.db_pool import ConnectionPool
+from healthmate_ai.core.logger import setup_logger
+
+logger = setup_logger("DbMigrations")
+
+
+def _m001_base_schema(cursor: sqlite3.Cursor):
+    # Patients table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS patients (
+            patient_id TEXT PRIMARY KEY,
+            name TEXT,
+            age INTEGER,
+            gender TEXT,
+            phone TEXT,
+            email TEXT
+        )
+    ''')
+
+    # Visits table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS visits (
+            visit_id TEXT PRIMARY KEY,
+            patient_id TEXT,
+            symptoms TEXT,
+            triage_summary TEXT,
+            severity TEXT,
+            department TEXT,
+            timestamp TEXT,
+            FOREIGN KEY(patient_id) REFERENCES patients(patient_id)
+        )
+    ''')
+
+    # Appointments table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS appointments (
+            appointment_id TEXT PRIMARY KEY,
+            patient_id TEXT,
+            doctor_id TEXT,
+            date TEXT,
+            status TEXT,
+            FOREIGN KEY(patient_id) REFERENCES patients(patient_id)
+        )
+    ''')
+
+    # Medical Reports table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS medical_reports (
+            report_id TEXT PRIMARY KEY,
+            patient_id TEXT,
+            extracted_data TEXT,
+            FOREIGN KEY(patient_id) REFERENCES patients(patient_id)
+        )
+    ''')
+
+    # Reminders table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reminders (
+            reminder_id TEXT PRIMARY KEY,
+            appointment_id TEXT,
+            reminder_date TEXT,
+            sent_flag INTEGER DEFAULT 0,
+            FOREIGN KEY(appointment_id) REFERENCES appointments(appointment_id)
+        )
+    ''')
+
+
+def _m002_secondary_indexes(cursor: sqlite3.Cursor):
+    # get_patient_history: visits by patient, newest first
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_visits_patient_timestamp ON visits(patient_id, timestamp)')
+    # get_doctor_appointments: one doctor, one day
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_appointments_doctor_date ON appointments(doctor_id, date)')
+    # get_pending_reminders: only unsent rows are ever queried
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reminders_unsent ON reminders(reminder_date) WHERE sent_flag = 0')
+    # find_patient_by_name
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_patients_name ON patients(name)')
+    # get_patient_details_extended: reports by patient
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_medical_reports_patient ON medical_reports(patient_id)')
+
+
+def _m003_epoch_datetimes(cursor: sqlite3.Cursor):
+    # Integer wall-clock epochs alongside the original text columns, so
+    # schedule and history queries become index range scans
+    cursor.execute('ALTER TABLE appointments ADD COLUMN starts_at INTEGER')
+    cursor.execute('ALTER TABLE visits ADD COLUMN visited_at INTEGER')
+    cursor.execute('ALTER TABLE reminders ADD COLUMN remind_at INTEGER')
+
+    cursor.connection.create_function("hm_to_epoch", 1, to_epoch, deterministic=True)
+    cursor.execute('UPDATE appointments SET starts_at = hm_to_epoch(date)')
+    cursor.execute('UPDATE visits SET visited_at = hm_to_epoch(timestamp)')
+    cursor.execute('UPDATE reminders SET remind_at = hm_to_epoch(reminder_date)')
+
+    for table, text_column, epoch_column in [("appointments", "date", "starts_at"),
+                                             ("visits", "timestamp", "visited_at"),
+                                             ("reminders", "reminder_date", "remind_at")]:
+        unparsed = cursor.execute(
+            f'SELECT COUNT(*) FROM {table} WHERE {epoch_column} IS NULL AND {text_column} IS NOT NULL'
+        ).fetchone()[0]
+        if unparsed:
+            logger.warning(f"{unparsed} {table} rows have an unparseable {text_column}; {epoch_column} left NULL")
+
+    # Replace the text-column indexes from migration 2
+    cursor.execute('DROP INDEX IF EXISTS idx_appointments_doctor_date')
+    cursor.execute('DROP INDEX IF EXISTS idx_visits_patient_timestamp')
+    cursor.execute('DROP INDEX IF EXISTS idx_reminders_unsent')
+    cursor.execute('CREATE INDEX idx_appointments_doctor_start ON appointments(doctor_id, starts_at)')
+    cursor.execute('CREATE INDEX idx_visits_patient_visited ON visits(patient_id, visited_at)')
+    cursor.execute('CREATE INDEX idx_reminders_unsent_due ON reminders(remind_at) WHERE sent_flag = 0')
+
+
+def _m004_reminder_leases(cursor: sqlite3.Cursor):
+    # Workers lease due reminders before sending; an expired lease makes the
+    # reminder claimable again if its worker died mid-send
+    cursor.execute('ALTER TABLE reminders ADD COLUMN lease_owner TEXT')
+    cursor.execute('ALTER TABLE reminders ADD COLUMN lease_until INTEGER')
+
+
+def _m005_lab_results(cursor: sqlite3.Cursor):
+    # One row per numeric value in a report, so doctors can filter patients
+    # by lab value without decoding every extracted_data blob
+    cursor.execute('''
+        CREATE TABLE lab_results (
+            result_id INTEGER PRIMARY KEY,
+            patient_id TEXT NOT NULL,
+            report_id TEXT NOT NULL,
+            analyte TEXT NOT NULL,
+            value_num REAL NOT NULL,
+            unit TEXT,
+            taken_at INTEGER,
+            FOREIGN KEY(patient_id) REFERENCES patients(patient_id),
+            FOREIGN KEY(report_id) REFERENCES medical_reports(report_id)
+        )
+    ''')
+    # find_patients_by_lab: threshold filters and recent-results filters
+    cursor.execute('CREATE INDEX idx_lab_results_analyte_value ON lab_results(analyte, value_num)')
+    cursor.execute('CREATE INDEX idx_lab_results_analyte_taken ON lab_results(analyte, taken_at)')
+    cursor.execute('CREATE INDEX idx_lab_results_patient ON lab_results(patient_id)')
+    cursor.execute('CREATE INDEX idx_lab_results_report ON lab_results(report_id)')
+    # Existing reports start at 0 and are filled by DatabaseTool.backfill_lab_results,
+    # which runs in small chunks instead of holding the migration lock
+    cursor.execute('ALTER TABLE medical_reports ADD COLUMN labs_indexed INTEGER NOT NULL DEFAULT 0')
+    cursor.execute('CREATE INDEX idx_medical_reports_unindexed ON medical_reports(labs_indexed) WHERE labs_indexed = 0')
+
+
+def _m006_triage_cache(cursor: sqlite3.Cursor):
+    # Second tier of the triage response cache, shared by every process
+    cursor.execute('''
+        CREATE TABLE triage_cache (
+            cache_key TEXT PRIMARY KEY,
+            result TEXT NOT NULL,
+            latency_ms REAL,
+            created_at INTEGER NOT NULL,
+            expires_at INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX idx_triage_cache_expires ON triage_cache(expires_at)')
+
+
+def _m007_report_cache(cursor: sqlite3.Cursor):
+    # Parsed reports by content hash and parser version, shared by every process
+    cursor.execute('''
+        CREATE TABLE report_cache (
+            digest TEXT NOT NULL,
+            parser_version TEXT NOT NULL,
+            result TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            parse_ms REAL,
+            created_at INTEGER NOT NULL,
+            last_used_at INTEGER NOT NULL,
+            PRIMARY KEY (digest, parser_version)
+        )
+    ''')
+    cursor.execute('CREATE INDEX idx_report_cache_last_used ON report_cache(last_used_at)')
+
+
+def _m008_report_ingest(cursor: sqlite3.Cursor):
+    # Checkpoint of bulk report ingestion: one row per file seen, written in
+    # the same transaction as the report itself
+    cursor.execute('''
+        CREATE TABLE report_ingest (
+            path TEXT PRIMARY KEY,
+            size_bytes INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            report_id TEXT,
+            patient_id TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 1,
+            updated_at INTEGER NOT NULL
+        )
+    ''')
+
+
+def _m009_reindex_nested_report_dates(cursor: sqlite3.Cursor):
+    # Reports stored as full parser output had their lab_results taken_at
+    # set to the ingest time; --backfill-lab-results indexes them again
+    cursor.execute('''
+        UPDATE medical_reports SET labs_indexed = 0
+        WHERE json_valid(extracted_data) AND json_type(extracted_data, '$.extracted_fields') = 'object'
+    ''')
+
+
+# Ordered list of (version, description, migration). Append only; never renumber.
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "base schema", _m001_base_schema),
+    (2, "secondary indexes for hot queries", _m002_secondary_indexes),
+    (3, "integer epoch columns for appointments, visits and reminders", _m003_epoch_datetimes),
+    (4, "lease columns for reminder claiming", _m004_reminder_leases),
+    (5, "lab_results table for querying report values", _m005_lab_results),
+    (6, "triage_cache table for repeated symptom descriptions", _m006_triage_cache),
+    (7, "report_cache table for re-uploaded reports", _m007_report_cache),
+    (8, "report_ingest checkpoint table for bulk report ingestion", _m008_report_ingest),
+    (9, "re-index lab dates of reports stored as full parser output", _m009_reindex_nested_report_dates),
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()
+    return row[0]
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Brings the database up to the latest schema version.
+    Each pending migration runs in its own write transaction, so concurrent
+    processes starting up at the same time apply every migration exactly once.
+    Returns the resulting schema version.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT
+        )
+    ''')
+    conn.commit()
+
+    version = get_schema_version(conn)
+    for target, description, migrate in MIGRATIONS:
+        if target <= version:
+            continue
+
+        # BEGIN IMMEDIATE takes the write lock before re-checking the version
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if get_schema_version(conn) < target:
+                migrate(conn.cursor())
+                conn.execute(
+                    'INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)',
+                    (target, description, datetime.now().isoformat())
+                )
+                logger.info(f"Applied migration {target}: {description}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = target
+
+    return version
+
+
+# Pools (one per database file, see get_pool) this process has already migrated
+_migrated: "weakref.WeakSet[ConnectionPool]" = weakref.WeakSet()
+_migrated_lock = threading.Lock()
+
+
+def ensure_schema(pool: ConnectionPool):
+    """
+    Runs apply_migrations once per database file per process. Every tool
+    calls this from its constructor; after the first, it costs a set lookup
+    instead of a CREATE TABLE, a version query and a commit.
+    """
+    with _migrated_lock:
+        if pool in _migrated:
+            return
+        apply_migrations(pool.get_connection())
+        _migrated.add(pool)
@@ -1,104 +1,129 @@
 import sqlite3
 from typing import List, Dict, Any, Optional
+from healthmate_ai.core.datetime_utils import day_range, to_epoch
+from healthmate_ai.core.db_pool import get_pool
 from healthmate_ai.core.logger import setup_logger
+from healthmate_ai.tools.db_migrations import ensure_schema
+from healthmate_ai.tools.patient_context_query import (
+    DEFAULT_REPORT_LIMIT, DEFAULT_VISIT_LIMIT, fetch_patient_context
+)
+from healthmate_ai.tools.lab_values import canonical_analyte
+from healthmate_ai.tools.records import DoctorAppointment, LabMatch, row_factory
 
 logger = setup_logger("DoctorDatabaseTool")
 
+_doctor_appointment_rows = row_factory(DoctorAppointment)
+_lab_match_rows = row_factory(LabMatch)
+
+# Comparison operators accepted by find_patients_by_lab. Only these literal
+# SQL operators are ever spliced into the query.
+LAB_COMPARISONS = {
+    ">": ">", "gt": ">", "above": ">",
+    ">=": ">=", "gte": ">=",
+    "<": "<", "lt": "<", "below": "<",
+    "<=": "<=", "lte": "<=",
+    "=": "=", "==": "=", "eq": "=",
+}
+
+_APPOINTMENTS_RANGE_QUERY = '''
+    SELECT a.appointment_id,
+           date(a.starts_at, 'unixepoch'),
+           strftime('%H:%M', a.starts_at, 'unixepoch'),
+           a.status, p.patient_id, p.name, p.age, p.gender
+    FROM appointments a
+    JOIN patients p ON a.patient_id = p.patient_id
+    WHERE a.doctor_id = ? AND a.starts_at >= ? AND a.starts_at < ?
+    ORDER BY a.starts_at ASC
+'''
+
+# With a single max() aggregate SQLite takes the bare columns from the row
+# holding the maximum, i.e. each patient's latest matching result. {op} is
+# one of LAB_COMPARISONS' values; {since} is empty or _LAB_SINCE.
+_LAB_MATCH_QUERY = '''
+    SELECT l.patient_id, p.name, l.analyte, l.value_num, l.unit,
+           datetime(MAX(l.taken_at), 'unixepoch'), l.report_id
+    FROM lab_results l
+    JOIN patients p ON l.patient_id = p.patient_id
+    WHERE l.analyte = ? AND l.value_num {op} ? {since}
+    GROUP BY l.patient_id
+    ORDER BY MAX(l.taken_at) DESC
+    LIMIT ?
+'''
+_LAB_SINCE = 'AND l.taken_at >= ?'
+
 class DoctorDatabaseTool:
     """
     A specialized database tool for Doctor Agents to avoid modifying the core DatabaseTool.
     """
     def __init__(self, db_path: str = "healthmate.db"):
         self.db_path = db_path
+        self._pool = get_pool(db_path)
+        # Queries rely on columns added by later migrations
+        ensure_schema(self._pool)
 
-    def _get_connection(self):
-        return sqlite3.connect(self.db_path)
+    def _get_connection(self) -> sqlite3.Connection:
+        return self._pool.get_connection()
 
-    def get_doctor_appointments(self, doctor_id: str, date: str) -> List[Dict[str, Any]]:
+    def get_doctor_appointments(self, doctor_id: str, date: str) -> List[DoctorAppointment]:
         """
         Fetches appointments for a specific doctor on a specific date.
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Note: The date in appointments table is a full datetime string (e.g., "2023-10-27 09:00")
-        # We need to match the date part.
-        query = '''
-            SELECT a.appointment_id, a.date, a.status, p.patient_id, p.name, p.age, p.gender
-            FROM appointments a
-            JOIN patients p ON a.patient_id = p.patient_id
-            WHERE a.doctor_id = ? AND a.date LIKE ?
-            ORDER BY a.date ASC
-        '''
-        cursor.execute(query, (doctor_id, f"{date}%"))
-        rows = cursor.fetchall()
-        conn.close()
-        
-        appointments = []
-        for row in rows:
-            appointments.append({
-                "appointment_id": row[0],
-                "time": row[1].split(" ")[1] if " " in row[1] else row[1], # Extract time
-                "status": row[2],
-                "patient_id": row[3],
-                "patient_name": row[4],
-                "patient_age": row[5],
-                "patient_gender": row[6]
-            })
-        return appointments
+        return self.get_doctor_appointments_range(doctor_id, date, date)
 
-    def get_patient_details_extended(self, patient_id: str) -> Dict[str, Any]:
+    def get_doctor_appointments_range(self, doctor_id: str, start: str, end: str) -> List[DoctorAppointment]:
         """
-        Fetches comprehensive patient details including history and reports.
+        Fetches a doctor's appointments between two dates (both days included)
+        in a single index range scan, ordered chronologically.
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # 1. Basic Info
-        cursor.execute('SELECT * FROM patients WHERE patient_id = ?', (patient_id,))
-        patient_row = cursor.fetchone()
-        
-        if not patient_row:
-            conn.close()
-            return {}
+        start_epoch, end_epoch = day_range(start, end)
+        cursor = self._get_connection().cursor()
+        cursor.row_factory = _doctor_appointment_rows
+        cursor.execute(_APPOINTMENTS_RANGE_QUERY, (doctor_id, start_epoch, end_epoch))
+        return cursor.fetchall()
 
-        patient_info = {
-            'patient_id': patient_row[0],
-            'name': patient_row[1],
-            'age': patient_row[2],
-            'gender': patient_row[3],
-            'phone': patient_row[4],
-            'email': patient_row[5]
-        }
+    def get_patient_details_extended(self,
+                                     patient_id: str,
+                                     visit_limit: int = DEFAULT_VISIT_LIMIT,
+                                     report_limit: int = DEFAULT_REPORT_LIMIT,
+                                     visits_cursor: Optional[str] = None,
+                                     reports_cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fetches patient details with the most recent visits and reports in a
+        single query, plus cursors for paging through older ones.
+        """
+        return fetch_patient_context(self._get_connection(), patient_id, visit_limit, report_limit,
+                                     visits_cursor, reports_cursor)
 
-        # 2. Visit History
-        cursor.execute('SELECT * FROM visits WHERE patient_id = ? ORDER BY timestamp DESC', (patient_id,))
-        visit_rows = cursor.fetchall()
-        visits = []
-        for row in visit_rows:
-            visits.append({
-                'visit_id': row[0],
-                'symptoms': row[2],
-                'triage_summary': row[3],
-                'severity': row[4],
-                'department': row[5],
-                'timestamp': row[6]
-            })
+    def find_patients_by_lab(self,
+                             analyte: str,
+                             op: str,
+                             threshold: float,
+                             since: Optional[str] = None,
+                             limit: int = 100) -> List[LabMatch]:
+        """
+        Finds patients with a lab result for `analyte` that compares `op` to
+        `threshold`, optionally only results taken on or after `since`.
+        Returns each patient's most recent matching result, newest first.
+        Raises ValueError for an unknown analyte or operator.
+        """
+        canonical = canonical_analyte(analyte)
+        if canonical is None:
+            raise ValueError(f"Unknown analyte: {analyte}")
+        sql_op = LAB_COMPARISONS.get(op.strip().lower())
+        if sql_op is None:
+            raise ValueError(f"Unsupported comparison: {op}")
 
-        # 3. Medical Reports
-        cursor.execute('SELECT * FROM medical_reports WHERE patient_id = ?', (patient_id,))
-        report_rows = cursor.fetchall()
-        reports = []
-        for row in report_rows:
-            reports.append({
-                'report_id': row[0],
-                'extracted_data': row[2] # This is a JSON string
-            })
+        params: List[Any] = [canonical, float(threshold)]
+        since_condition = ''
+        if since:
+            since_epoch = to_epoch(since)
+            if since_epoch is None:
+                raise ValueError(f"Invalid date: {since}")
+            since_condition = _LAB_SINCE
+            params.append(since_epoch)
+        params.append(limit)
 
-        conn.close()
-        
-        return {
-            "info": patient_info,
-            "visits": visits,
-            "reports": reports
-        }
+        cursor = self._get_connection().cursor()
+        cursor.row_factory = _lab_match_rows
+        cursor.execute(_LAB_MATCH_QUERY.format(op=sql_op, since=since_condition), params)
+        return cursor.fetchall()
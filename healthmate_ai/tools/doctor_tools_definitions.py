@@ -1,8 +1,20 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union
 from healthmate_ai.tools.doctor_database_tool import DoctorDatabaseTool
 
-# Initialize the database tool globally for these functions to use
-_db_tool = DoctorDatabaseTool()
+# The database tool these functions use. The app context installs its own
+# with use_db_tool(); otherwise one for healthmate.db is created on first call.
+# It draws per-thread connections from the shared pool.
+_db_tool: Optional[DoctorDatabaseTool] = None
+
+def use_db_tool(db_tool: DoctorDatabaseTool):
+    global _db_tool
+    _db_tool = db_tool
+
+def _tool() -> DoctorDatabaseTool:
+    global _db_tool
+    if _db_tool is None:
+        _db_tool = DoctorDatabaseTool()
+    return _db_tool
 
 def get_doctor_schedule(doctor_id: str, date: str) -> Dict[str, Any]:
     """
@@ -15,30 +27,97 @@ def get_doctor_schedule(doctor_id: str, date: str) -> Dict[str, Any]:
     Returns:
         A dictionary containing the list of appointments.
     """
-    appointments = _db_tool.get_doctor_appointments(doctor_id, date)
+    try:
+        appointments = _tool().get_doctor_appointments(doctor_id, date)
+    except ValueError as e:
+        return {"error": f"{e}. Use YYYY-MM-DD dates."}
     return {
         "doctor_id": doctor_id,
         "date": date,
-        "appointments": appointments,
+        "appointments": [a.to_dict() for a in appointments],
         "count": len(appointments)
     }
 
-def get_patient_insight(patient_id: str) -> Dict[str, Any]:
+def get_doctor_calendar(doctor_id: str, start_date: str, end_date: str) -> Dict[str, Any]:
+    """
+    Retrieves a doctor's appointments across several days (e.g. a whole week).
+
+    Args:
+        doctor_id: The ID of the doctor (e.g., "Dr. Smith").
+        start_date: First day in YYYY-MM-DD format.
+        end_date: Last day (inclusive) in YYYY-MM-DD format.
+
+    Returns:
+        A dictionary containing the appointments, each with its date and time.
+    """
+    try:
+        appointments = _tool().get_doctor_appointments_range(doctor_id, start_date, end_date)
+    except ValueError as e:
+        return {"error": f"{e}. Use YYYY-MM-DD dates."}
+    return {
+        "doctor_id": doctor_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "appointments": [a.to_dict() for a in appointments],
+        "count": len(appointments)
+    }
+
+def get_patient_insight(patient_id: str, visits_cursor: str = "", reports_cursor: str = "") -> Dict[str, Any]:
     """
     Retrieves detailed medical insights for a specific patient.
+    Returns the most recent visits and reports; older entries are paged.
 
     Args:
         patient_id: The ID of the patient.
+        visits_cursor: Leave empty for the latest visits. To see older visits,
+            pass the 'next_visits_cursor' value from a previous call.
+        reports_cursor: Leave empty for the latest reports. To see older reports,
+            pass the 'next_reports_cursor' value from a previous call.
 
     Returns:
-        A dictionary with patient info, visit history, and medical reports.
+        A dictionary with patient info, recent visit history, recent medical reports,
+        and cursors for older pages (null when there is nothing older).
     """
-    data = _db_tool.get_patient_details_extended(patient_id)
+    try:
+        data = _tool().get_patient_details_extended(
+            patient_id,
+            visits_cursor=visits_cursor or None,
+            reports_cursor=reports_cursor or None
+        )
+    except ValueError as e:
+        return {"error": f"{e}. Pass a cursor from a previous call, or leave it empty."}
     if not data:
         return {"error": "Patient not found"}
     return data
 
-def get_patient_list_for_date(doctor_id: str, date: str) -> List[Dict[str, str]]:
+def find_patients_by_lab_result(analyte: str, comparison: str, threshold: float, since_date: str = "") -> Dict[str, Any]:
+    """
+    Finds patients whose lab results cross a threshold, e.g. glucose above 180
+    or blood pressure (systolic) above 140 since the start of the month.
+
+    Args:
+        analyte: The lab value, e.g. "glucose", "bp" (systolic), "bp_diastolic",
+            "cholesterol", "ldl", "hdl", "hba1c", "heart_rate", "temperature".
+        comparison: One of ">", ">=", "<", "<=", "=".
+        threshold: The number to compare against, in the analyte's usual unit.
+        since_date: Optional YYYY-MM-DD; only results taken on or after it count.
+
+    Returns:
+        A dictionary with each matching patient's latest matching result.
+    """
+    try:
+        matches = _tool().find_patients_by_lab(analyte, comparison, threshold, since_date or None)
+    except ValueError as e:
+        return {"error": str(e)}
+    return {
+        "analyte": analyte,
+        "comparison": comparison,
+        "threshold": threshold,
+        "patients": [m.to_dict() for m in matches],
+        "count": len(matches)
+    }
+
+def get_patient_list_for_date(doctor_id: str, date: str) -> Union[List[Dict[str, str]], Dict[str, str]]:
     """
     Returns a simple list of patients (ID and Name) that the doctor is seeing on a specific date.
     Useful for quick lookups.
@@ -48,7 +127,10 @@ def get_patient_list_for_date(doctor_id: str, date: str) -> List[Dict[str, str]]
         date: The date in YYYY-MM-DD format.
 
     Returns:
-        List of dicts with 'patient_id' and 'name'.
+        List of dicts with 'patient_id' and 'name', or a dict with 'error'.
     """
-    appointments = _db_tool.get_doctor_appointments(doctor_id, date)
-    return [{"patient_id": a["patient_id"], "name": a["patient_name"]} for a in appointments]
+    try:
+        appointments = _tool().get_doctor_appointments(doctor_id, date)
+    except ValueError as e:
+        return {"error": f"{e}. Use YYYY-MM-DD dates."}
+    return [{"patient_id": a.patient_id, "name": a.patient_name} for a in appointments]
@@ -0,0 +1,136 @@
+"""
+Normalizes the values stored in medical_reports.extracted_data into
+(analyte, value_num, unit) rows for the lab_results table.
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from healthmate_ai.core.datetime_utils import to_epoch
+
+# Canonical analyte name for each key spelling we accept
+ANALYTE_ALIASES: Dict[str, str] = {
+    "heart_rate": "heart_rate", "hr": "heart_rate", "pulse": "heart_rate",
+    "cholesterol": "cholesterol_total", "total_cholesterol": "cholesterol_total",
+    "cholesterol_total": "cholesterol_total",
+    "ldl": "ldl", "ldl_cholesterol": "ldl",
+    "hdl": "hdl", "hdl_cholesterol": "hdl",
+    "triglycerides": "triglycerides",
+    "glucose": "glucose", "blood_glucose": "glucose", "blood_sugar": "glucose",
+    "fasting_glucose": "glucose",
+    "hba1c": "hba1c", "a1c": "hba1c",
+    "temperature": "temperature", "temp": "temperature",
+    "spo2": "spo2", "oxygen_saturation": "spo2",
+    "weight": "weight", "bmi": "bmi",
+    "bp_systolic": "bp_systolic", "systolic": "bp_systolic",
+    "bp_diastolic": "bp_diastolic", "diastolic": "bp_diastolic",
+    "hemoglobin": "hemoglobin", "haemoglobin": "hemoglobin", "hgb": "hemoglobin", "hb": "hemoglobin",
+    "creatinine": "creatinine",
+}
+
+# Keys whose "120/80" value splits into systolic and diastolic rows.
+# Querying by one of these names means the systolic reading.
+BLOOD_PRESSURE_KEYS = {"bp", "blood_pressure"}
+
+DEFAULT_UNITS = {
+    "bp_systolic": "mmHg", "bp_diastolic": "mmHg", "heart_rate": "bpm",
+    "hba1c": "%", "spo2": "%",
+}
+
+# Keys in extracted_data that carry the sample date rather than a value
+DATE_KEYS = ("taken_at", "date", "report_date", "collected_at")
+
+_NUMBER_WITH_UNIT = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*([^\d\s].*)?$")
+_BLOOD_PRESSURE = re.compile(r"^\s*(\d{2,3})\s*/\s*(\d{2,3})\s*(mm\s*hg)?\s*$", re.IGNORECASE)
+
+LabRow = Tuple[str, float, Optional[str]]
+
+
+def _key(name: str) -> str:
+    return re.sub(r"[\s\-]+", "_", name.strip().lower())
+
+
+def canonical_analyte(name: str) -> Optional[str]:
+    """
+    Maps a user- or report-supplied analyte name to its lab_results name.
+    """
+    key = _key(name)
+    if key in BLOOD_PRESSURE_KEYS:
+        return "bp_systolic"
+    return ANALYTE_ALIASES.get(key)
+
+
+def _parse_number(value: Any) -> Tuple[Optional[float], Optional[str]]:
+    if isinstance(value, bool):
+        return None, None
+    if isinstance(value, (int, float)):
+        return float(value), None
+    if isinstance(value, dict):
+        number, unit = _parse_number(value.get("value"))
+        return number, value.get("unit") or unit
+    if isinstance(value, str):
+        match = _NUMBER_WITH_UNIT.match(value)
+        if match:
+            unit = match.group(2).strip() if match.group(2) else None
+            return float(match.group(1)), unit
+    return None, None
+
+
+def _blood_pressure_rows(value: Any) -> List[LabRow]:
+    if isinstance(value, dict) and "systolic" in value:
+        systolic, _ = _parse_number(value.get("systolic"))
+        diastolic, _ = _parse_number(value.get("diastolic"))
+    elif isinstance(value, str) and _BLOOD_PRESSURE.match(value):
+        match = _BLOOD_PRESSURE.match(value)
+        systolic, diastolic = float(match.group(1)), float(match.group(2))
+    else:
+        return []
+    unit = value.get("unit", "mmHg") if isinstance(value, dict) else "mmHg"
+    rows = []
+    if systolic is not None:
+        rows.append(("bp_systolic", systolic, unit))
+    if diastolic is not None:
+        rows.append(("bp_diastolic", diastolic, unit))
+    return rows
+
+
+def _report_fields(extracted_data: Any) -> Dict[str, Any]:
+    # Full parser output nests the values under extracted_fields
+    if not isinstance(extracted_data, dict):
+        return {}
+    if isinstance(extracted_data.get("extracted_fields"), dict):
+        return extracted_data["extracted_fields"]
+    return extracted_data
+
+
+def normalize_lab_values(extracted_data: Any) -> List[LabRow]:
+    """
+    Returns (analyte, value_num, unit) rows for every recognised numeric
+    value in a report's extracted data. Qualitative values ("high") and
+    unknown keys are skipped.
+    """
+    rows: List[LabRow] = []
+    for name, value in _report_fields(extracted_data).items():
+        key = _key(str(name))
+        if key in BLOOD_PRESSURE_KEYS:
+            rows.extend(_blood_pressure_rows(value))
+            continue
+        analyte = ANALYTE_ALIASES.get(key)
+        if not analyte:
+            continue
+        number, unit = _parse_number(value)
+        if number is not None:
+            rows.append((analyte, number, unit or DEFAULT_UNITS.get(analyte)))
+    return rows
+
+
+def report_taken_at(extracted_data: Any) -> int:
+    """
+    Epoch of the sample date recorded in the report, or now if it has none.
+    """
+    fields = _report_fields(extracted_data)
+    for key in DATE_KEYS:
+        epoch = to_epoch(fields.get(key)) if fields.get(key) else None
+        if epoch is not None:
+            return epoch
+    return to_epoch(datetime.now())
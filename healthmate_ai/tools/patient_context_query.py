@@ -0,0 +1,134 @@
+import json
+import sqlite3
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_VISIT_LIMIT = 10
+DEFAULT_REPORT_LIMIT = 5
+
+# One statement assembles the patient row plus one page of visits and reports
+# as a JSON document. Each page fetches limit + 1 rows to detect whether an
+# older page exists. Keyset conditions are spliced in only when a cursor is
+# given, so the first page stays a plain index range scan. Visits whose
+# visited_at is NULL (a timestamp to_epoch could not read) sort after all
+# dated ones, as SQLite orders NULL lowest.
+_CONTEXT_QUERY = '''
+    SELECT json_object(
+        'info', json_object(
+            'patient_id', p.patient_id, 'name', p.name, 'age', p.age,
+            'gender', p.gender, 'phone', p.phone, 'email', p.email
+        ),
+        'visits', (
+            SELECT json_group_array(json_object(
+                'visit_id', v.visit_id, 'symptoms', v.symptoms,
+                'triage_summary', v.triage_summary, 'severity', v.severity,
+                'department', v.department, 'timestamp', v.timestamp,
+                'visited_at', v.visited_at
+            ))
+            FROM (
+                SELECT * FROM visits
+                WHERE patient_id = p.patient_id {visit_cursor}
+                ORDER BY visited_at DESC, visit_id DESC
+                LIMIT :visit_limit
+            ) v
+        ),
+        'reports', (
+            SELECT json_group_array(json_object(
+                'report_id', r.report_id,
+                'extracted_data', CASE WHEN json_valid(r.extracted_data)
+                                       THEN json(r.extracted_data) ELSE r.extracted_data END,
+                'seq', r.seq
+            ))
+            FROM (
+                SELECT rowid AS seq, report_id, extracted_data FROM medical_reports
+                WHERE patient_id = p.patient_id {report_cursor}
+                ORDER BY rowid DESC
+                LIMIT :report_limit
+            ) r
+        )
+    )
+    FROM patients p
+    WHERE p.patient_id = :patient_id
+'''
+
+# The row-value comparison is NULL for undated visits, so they are added back
+_VISIT_CURSOR = 'AND ((visited_at, visit_id) < (:visited_at, :visit_id) OR visited_at IS NULL)'
+# A cursor within the undated visits at the end
+_UNDATED_VISIT_CURSOR = 'AND visited_at IS NULL AND visit_id < :visit_id'
+_REPORT_CURSOR = 'AND rowid < :report_seq'
+
+
+def _parse_visit_cursor(cursor: str) -> Tuple[Optional[int], str]:
+    # "<visited_at>:<visit_id>", with visited_at empty for an undated visit
+    visited_at, separator, visit_id = cursor.partition(":")
+    try:
+        if not separator or not visit_id:
+            raise ValueError
+        return (int(visited_at) if visited_at else None), visit_id
+    except ValueError:
+        raise ValueError(f"Invalid visits cursor: {cursor!r}") from None
+
+
+def _parse_report_cursor(cursor: str) -> int:
+    try:
+        return int(cursor)
+    except ValueError:
+        raise ValueError(f"Invalid reports cursor: {cursor!r}") from None
+
+
+def fetch_patient_context(conn: sqlite3.Connection,
+                          patient_id: str,
+                          visit_limit: int = DEFAULT_VISIT_LIMIT,
+                          report_limit: int = DEFAULT_REPORT_LIMIT,
+                          visits_cursor: Optional[str] = None,
+                          reports_cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Returns a patient's info with the most recent visits and reports in one round trip.
+
+    The result has "info", "visits" (newest first), "reports" (newest first),
+    and "next_visits_cursor" / "next_reports_cursor". Pass a cursor back in
+    to get the next older page; a cursor is None when there are no older rows.
+    Returns {} if the patient does not exist, and raises ValueError for a
+    cursor it did not hand out.
+    """
+    params: Dict[str, Any] = {
+        "patient_id": patient_id,
+        "visit_limit": visit_limit + 1,
+        "report_limit": report_limit + 1
+    }
+    visit_condition = report_condition = ''
+    if visits_cursor:
+        params["visited_at"], params["visit_id"] = _parse_visit_cursor(visits_cursor)
+        visit_condition = _VISIT_CURSOR if params["visited_at"] is not None else _UNDATED_VISIT_CURSOR
+    if reports_cursor:
+        params["report_seq"] = _parse_report_cursor(reports_cursor)
+        report_condition = _REPORT_CURSOR
+
+    sql = _CONTEXT_QUERY.format(visit_cursor=visit_condition, report_cursor=report_condition)
+    row = conn.execute(sql, params).fetchone()
+    if not row:
+        return {}
+
+    context = json.loads(row[0])
+    # json_group_array does not promise to keep the subquery's order
+    visits = sorted(context["visits"], reverse=True,
+                    key=lambda v: (v["visited_at"] is not None, v["visited_at"] or 0, v["visit_id"]))
+    reports = sorted(context["reports"], key=lambda r: r["seq"], reverse=True)
+
+    next_visits_cursor = None
+    if len(visits) > visit_limit:
+        visits = visits[:visit_limit]
+        last = visits[-1]
+        next_visits_cursor = f"{'' if last['visited_at'] is None else last['visited_at']}:{last['visit_id']}"
+
+    next_reports_cursor = None
+    if len(reports) > report_limit:
+        reports = reports[:report_limit]
+        next_reports_cursor = str(reports[-1]["seq"])
+
+    return {
+        "info": context["info"],
+        "visits": visits,
+        "reports": reports,
+        "next_visits_cursor": next_visits_cursor,
+        "next_reports_cursor": next_reports_cursor
+    }
@@ -1,40 +1,319 @@
 import os
-from typing import Dict, Any
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager, nullcontext
+from typing import BinaryIO, Dict, Any, Iterator, List, Optional, Tuple
+from healthmate_ai.core.logger import setup_logger
+from healthmate_ai.core.tracing import measure_peak_memory
+from healthmate_ai.tools.report_fields import ReportFieldExtractor
+
 try:
-    from pypdf import PdfReader
+    import resource
 except ImportError:
+    # Not on Windows; max_rss_kb is then None
+    resource = None
+
+logger = setup_logger("PDFParserTool")
+
+# Part of the report cache key; bump whenever parse results change, so that
+# reports cached by an older parser are parsed again
+PARSER_VERSION = "2"
+
+# Pages after this many are not extracted; the report is marked truncated
+PDF_MAX_PAGES = int(os.getenv("HEALTHMATE_PDF_MAX_PAGES", "500"))
+# Seconds a single page may take before it is skipped
+PDF_PAGE_TIMEOUT = float(os.getenv("HEALTHMATE_PDF_PAGE_TIMEOUT", "5"))
+# Pages per task when a report is split across worker processes
+PDF_PAGES_PER_TASK = int(os.getenv("HEALTHMATE_PDF_PAGES_PER_TASK", "20"))
+# Page ranges submitted ahead of the one being read; bounds the text held
+# in memory while a report is streamed
+PDF_RANGES_IN_FLIGHT = int(os.getenv("HEALTHMATE_PDF_RANGES_IN_FLIGHT", "8"))
+# Characters of report text kept by the streaming parse
+REPORT_PREVIEW_CHARS = int(os.getenv("HEALTHMATE_REPORT_PREVIEW_CHARS", "2000"))
+# Measure peak memory per streamed report with tracemalloc; off by default
+# because tracing makes pypdf several times slower
+REPORT_MEMORY_STATS = os.getenv("HEALTHMATE_REPORT_MEMORY_STATS", "").lower() in ("1", "true", "yes")
+
+def _max_rss_kb() -> Optional[float]:
+    # High-water mark of this process's resident set since it started; one
+    # system call, so cheap enough to take on every report
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 if sys.platform == "darwin" else float(rss)
+
+def _load_pdf_reader():
+    # Imported on first use rather than at startup; pypdf alone takes ~0.1 s
     try:
-        from PyPDF2 import PdfReader
+        from pypdf import PdfReader
     except ImportError:
-        PdfReader = None
+        try:
+            from PyPDF2 import PdfReader
+        except ImportError:
+            return None
+    return PdfReader
+
+class PageTimeoutError(BaseException):
+    # Not an Exception: pypdf catches and carries on after those in many
+    # places, which would swallow the timeout
+    pass
+
+@contextmanager
+def _page_deadline(seconds: float):
+    # SIGALRM interrupts pure-Python extraction, but can only be used from a
+    # process's main thread (as in the CPU worker processes). Elsewhere the
+    # caller's wait on the page range is the only limit.
+    if seconds <= 0 or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _expired(signum, frame):
+        raise PageTimeoutError(f"page took longer than {seconds:g} s")
+
+    previous = signal.signal(signal.SIGALRM, _expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def _extract_pages(reader, start: int, stop: int, page_timeout: float) -> Tuple[List[str], List[int]]:
+    """
+    Text of pages [start, stop), one string per page, and the (1-based)
+    numbers of pages that failed or timed out; those contribute an empty page.
+    """
+    texts = []
+    failed = []
+    for number in range(start, stop):
+        try:
+            with _page_deadline(page_timeout):
+                texts.append(reader.pages[number].extract_text() + "\n")
+        except (Exception, PageTimeoutError) as e:
+            logger.warning(f"Skipping page {number + 1}: {e}")
+            failed.append(number + 1)
+            texts.append("\n")
+    return texts, failed
+
+# File and reader of the last report a worker process opened; consecutive
+# page ranges of one report usually land on the same worker
+_open_reader: Optional[Tuple[Tuple[str, float, int], BinaryIO, Any]] = None
+
+def _close_open_reader():
+    global _open_reader
+    if _open_reader is not None:
+        _open_reader[1].close()
+        _open_reader = None
+
+def extract_page_range(file_path: str, start: int, stop: int,
+                       page_timeout: float = PDF_PAGE_TIMEOUT,
+                       measure_memory: bool = False) -> Tuple[List[str], List[int], Dict[str, Optional[float]]]:
+    """
+    _extract_pages for one range of a file, plus the memory the worker used:
+    {"peak_kb": peak allocated for the range (with measure_memory, else
+    None), "max_rss_kb": the worker's resident set high-water mark}.
+    Module-level so it can be sent to a worker process (see core.executors).
+    """
+    global _open_reader
+    with (measure_peak_memory() if measure_memory else nullcontext({})) as memory:
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_mtime, stat.st_size)
+        if _open_reader is None or _open_reader[0] != key:
+            _close_open_reader()
+            stream = open(file_path, "rb")
+            _open_reader = (key, stream, _load_pdf_reader()(stream))
+        texts, failed = _extract_pages(_open_reader[2], start, stop, page_timeout)
+    if failed:
+        # A page interrupted mid-parse may leave the reader's caches half-built
+        _close_open_reader()
+    return texts, failed, {"peak_kb": memory.get("peak_kb"), "max_rss_kb": _max_rss_kb()}
 
 class PDFParserTool:
-    def __init__(self):
-        if PdfReader is None:
+    def __init__(self,
+                 executor: Optional[Executor] = None,
+                 max_pages: int = PDF_MAX_PAGES,
+                 page_timeout: float = PDF_PAGE_TIMEOUT,
+                 pages_per_task: int = PDF_PAGES_PER_TASK):
+        """
+        With an executor (normally the CPU process pool) the pages of a report
+        are extracted in ranges of pages_per_task in parallel; without one
+        they are extracted here, one after another.
+        """
+        self.reader_class = _load_pdf_reader()
+        if self.reader_class is None:
             raise ImportError("pypdf or PyPDF2 is required for PDFParserTool")
+        self.executor = executor
+        self.max_pages = max_pages
+        self.page_timeout = page_timeout
+        self.pages_per_task = max(1, pages_per_task)
 
     def extract_text(self, file_path: str) -> str:
+        return self.extract(file_path)["text"]
+
+    def extract(self, file_path: str) -> Dict[str, Any]:
+        """
+        Extracts the text of up to max_pages pages:
+        {"text", "page_count", "pages_extracted", "truncated", "failed_pages"}.
+        """
+        info: Dict[str, Any] = {}
+        texts: List[str] = []
+        failed: List[int] = []
+        for range_texts, range_failed in self._iter_ranges(file_path, info):
+            texts.extend(range_texts)
+            failed.extend(range_failed)
+        return {"text": "".join(texts), **self._summary(file_path, info, failed)}
+
+    def _summary(self, file_path: str, info: Dict[str, Any], failed: List[int]) -> Dict[str, Any]:
+        pages = info["pages"]
+        if pages and len(failed) == pages:
+            raise Exception(f"Failed to parse PDF: no page of {file_path} could be read")
+        return {
+            "page_count": info["page_count"],
+            "pages_extracted": pages - len(failed),
+            "truncated": pages < info["page_count"],
+            "failed_pages": failed
+        }
+
+    def _iter_ranges(self, file_path: str, info: Dict[str, Any],
+                     measure_memory: bool = False) -> Iterator[Tuple[List[str], List[int]]]:
+        # Yields (texts, failed page numbers) per range of pages_per_task
+        # pages, in order. Sets info["page_count"] and info["pages"]; ranges
+        # extracted by workers also raise info["worker_peak_kb"] (with
+        # measure_memory) and info["worker_max_rss_kb"] to their largest.
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
-        
+
+        # Read from the open file rather than a copy of it in memory
+        with open(file_path, "rb") as stream:
+            try:
+                reader = self.reader_class(stream)
+                page_count = len(reader.pages)
+            except Exception as e:
+                raise Exception(f"Failed to parse PDF: {str(e)}")
+
+            pages = min(page_count, self.max_pages)
+            if pages < page_count:
+                logger.warning(f"{file_path} has {page_count} pages; extracting the first {pages}")
+            info.update(page_count=page_count, pages=pages)
+
+            starts = range(0, pages, self.pages_per_task)
+            if self.executor is None:
+                for start in starts:
+                    yield _extract_pages(reader, start, min(start + self.pages_per_task, pages), self.page_timeout)
+                return
+
+        yield from self._iter_parallel(file_path, starts, pages, info, measure_memory)
+
+    def _iter_parallel(self, file_path: str, starts: range, pages: int, info: Dict[str, Any],
+                       measure_memory: bool) -> Iterator[Tuple[List[str], List[int]]]:
+        starts = iter(starts)
+        in_flight: deque = deque()
+
+        def submit_next():
+            start = next(starts, None)
+            if start is not None:
+                stop = min(start + self.pages_per_task, pages)
+                in_flight.append((start, stop, self.executor.submit(
+                    extract_page_range, file_path, start, stop, self.page_timeout, measure_memory)))
+
+        for _ in range(max(1, PDF_RANGES_IN_FLIGHT)):
+            submit_next()
+        # Backstop for workers where the per-page alarm is unavailable: the
+        # whole report may take as long as its pages would one after another
+        deadline = time.monotonic() + self.page_timeout * pages if self.page_timeout > 0 else None
         try:
-            reader = PdfReader(file_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text
-        except Exception as e:
-            raise Exception(f"Failed to parse PDF: {str(e)}")
+            while in_flight:
+                start, stop, future = in_flight.popleft()
+                try:
+                    timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+                    texts, failed, memory = future.result(timeout=timeout)
+                except FutureTimeoutError:
+                    future.cancel()
+                    logger.warning(f"Pages {start + 1}-{stop} of {file_path} timed out")
+                    texts, failed, memory = ["\n"] * (stop - start), list(range(start + 1, stop + 1)), {}
+                for key, value in (("worker_peak_kb", memory.get("peak_kb")),
+                                   ("worker_max_rss_kb", memory.get("max_rss_kb"))):
+                    if value is not None:
+                        info[key] = max(info.get(key, 0.0), value)
+                submit_next()
+                yield texts, failed
+        finally:
+            # Also reached when the caller stops reading early
+            for _, _, future in in_flight:
+                future.cancel()
 
     def parse_report(self, file_path: str) -> Dict[str, Any]:
         """
-        Extracts text and returns a structured dictionary.
-        In a real scenario, this might use regex or LLM to structure the data.
+        Extracts text and returns a structured dictionary, with the full text
+        under "raw_text". Large reports are better served by parse_report_stream.
+        """
+        extracted = self.extract(file_path)
+        fields = ReportFieldExtractor()
+        fields.feed(extracted["text"])
+        return {
+            "file_path": file_path,
+            "raw_text": extracted["text"],
+            "page_count": extracted["page_count"],
+            "pages_extracted": extracted["pages_extracted"],
+            "truncated": extracted["truncated"],
+            "failed_pages": extracted["failed_pages"],
+            "extracted_fields": fields.result()
+        }
+
+    def parse_report_stream(self, file_path: str,
+                            preview_chars: int = REPORT_PREVIEW_CHARS,
+                            measure_memory: bool = REPORT_MEMORY_STATS) -> Dict[str, Any]:
+        """
+        Like parse_report, but pages are passed to the field extractor as
+        they are extracted and then dropped. Instead of "raw_text" the result
+        has the first preview_chars characters ("preview", with
+        "preview_truncated" and the full "text_chars").
+
+        With measure_memory, "peak_memory_kb" is the peak allocated while
+        parsing in this process and, when pages are extracted by workers,
+        "worker_peak_memory_kb" the largest peak of one page range in a
+        worker (both None otherwise). "max_rss_kb" is always set: the
+        resident set high-water mark of this process and of the workers
+        that extracted pages. Those are lifetime marks of long-lived
+        processes, so an upper bound rather than this report's own use.
         """
-        raw_text = self.extract_text(file_path)
+        info: Dict[str, Any] = {}
+        fields = ReportFieldExtractor()
+        preview: List[str] = []
+        preview_left = preview_chars
+        text_chars = 0
+        failed: List[int] = []
+        with (measure_peak_memory() if measure_memory else nullcontext({})) as memory:
+            for texts, range_failed in self._iter_ranges(file_path, info, measure_memory):
+                failed.extend(range_failed)
+                for text in texts:
+                    fields.feed(text)
+                    text_chars += len(text)
+                    if preview_left > 0:
+                        preview.append(text[:preview_left])
+                        preview_left -= len(preview[-1])
+            summary = self._summary(file_path, info, failed)
+            extracted_fields = fields.result()
+
+        peak_kb = round(memory["peak_kb"], 1) if "peak_kb" in memory else None
+        worker_peak_kb = round(info["worker_peak_kb"], 1) if "worker_peak_kb" in info else None
+        rss = [kb for kb in (_max_rss_kb(), info.get("worker_max_rss_kb")) if kb is not None]
+        max_rss_kb = round(max(rss), 1) if rss else None
+        logger.info(f"Parsed {file_path}: {summary['pages_extracted']}/{summary['page_count']} pages, "
+                    f"{text_chars} chars" + (f", peak memory {peak_kb:.0f} KiB" if peak_kb is not None else "")
+                    + (f" (workers {worker_peak_kb:.0f} KiB)" if worker_peak_kb is not None else ""))
         return {
             "file_path": file_path,
-            "raw_text": raw_text,
-            # Placeholder for structured data extraction
-            "extracted_fields": {} 
+            "preview": "".join(preview),
+            "preview_truncated": text_chars > preview_chars,
+            "text_chars": text_chars,
+            **summary,
+            "extracted_fields": extracted_fields,
+            "peak_memory_kb": peak_kb,
+            "worker_peak_memory_kb": worker_peak_kb,
+            "max_rss_kb": max_rss_kb
         }
@@ -0,0 +1,106 @@
+"""
+Immutable row records returned by the database tools.
+
+NamedTuples carry no per-instance __dict__, so a list of a patient's visits
+costs one tuple per row instead of one dict plus its keys. Call to_dict()
+only where a plain dict is really needed (JSON responses, LLM tool results).
+"""
+
+import json
+from typing import Any, Callable, Dict, NamedTuple, Optional, Type
+
+
+class Patient(NamedTuple):
+    patient_id: str
+    name: Optional[str]
+    age: Optional[int]
+    gender: Optional[str]
+    phone: Optional[str]
+    email: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class Visit(NamedTuple):
+    visit_id: str
+    patient_id: str
+    symptoms: Optional[str]
+    triage_summary: Optional[str]
+    severity: Optional[str]
+    department: Optional[str]
+    timestamp: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class DoctorAppointment(NamedTuple):
+    """
+    An appointment joined with the patient it is for, as shown on a doctor's schedule.
+    """
+    appointment_id: str
+    date: str
+    time: str
+    status: Optional[str]
+    patient_id: str
+    patient_name: Optional[str]
+    patient_age: Optional[int]
+    patient_gender: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class Reminder(NamedTuple):
+    reminder_id: str
+    appointment_id: str
+    reminder_date: Optional[str]
+    sent_flag: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class MedicalReport(NamedTuple):
+    report_id: str
+    patient_id: str
+    extracted_data: Optional[str]  # JSON string as stored
+
+    @property
+    def data(self) -> Any:
+        """
+        The decoded extracted_data.
+        """
+        return json.loads(self.extracted_data) if self.extracted_data else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class LabMatch(NamedTuple):
+    """
+    A patient's latest lab result that matched a find_patients_by_lab filter.
+    """
+    patient_id: str
+    patient_name: Optional[str]
+    analyte: str
+    value: float
+    unit: Optional[str]
+    taken_at: Optional[str]
+    report_id: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+def row_factory(record_cls: Type[tuple]) -> Callable[[Any, tuple], tuple]:
+    """
+    Builds a sqlite3 row_factory that turns each row straight into record_cls.
+    The SELECT must list the record's fields in declaration order.
+    """
+    new = tuple.__new__
+
+    def _factory(_cursor, row):
+        return new(record_cls, row)
+    return _factory
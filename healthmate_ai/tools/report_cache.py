@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from healthmate_ai.core.db_pool import get_pool
+from healthmate_ai.core.logger import setup_logger
+from healthmate_ai.tools.db_migrations import ensure_schema
+
+logger = setup_logger("ReportCache")
+
+# Total size of the cached results, in bytes; least recently used go first
+REPORT_CACHE_MAX_BYTES = int(os.getenv("HEALTHMATE_REPORT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# A hit refreshes an entry's last use at most this often, in seconds, so
+# that lookups rarely need the write lock
+REPORT_CACHE_TOUCH_INTERVAL = int(os.getenv("HEALTHMATE_REPORT_CACHE_TOUCH_INTERVAL", "300"))
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    """
+    Hex SHA-256 of a file's bytes, read in chunks into one reused buffer.
+    """
+    digest = hashlib.sha256()
+    buffer = bytearray(_HASH_CHUNK_BYTES)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                return digest.hexdigest()
+            digest.update(view[:size])
+
+
+class ReportCache:
+    """
+    Parsed reports by the SHA-256 of the file and the parser version, in the
+    report_cache table, which every process shares and which survives
+    restarts. A re-uploaded report is recognised by its content, whatever
+    its path or name.
+
+    The table is kept under max_bytes of results by dropping the least
+    recently used entries when a new one is stored. Each entry keeps how
+    long its parse took, which is counted as saved on every hit.
+    """
+    def __init__(self, db_path: str = "healthmate.db",
+                 max_bytes: int = REPORT_CACHE_MAX_BYTES,
+                 touch_interval: int = REPORT_CACHE_TOUCH_INTERVAL):
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self._pool = get_pool(db_path)
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.parse_ms_saved = 0.0
+        ensure_schema(self._pool)
+
+    def get(self, digest: str, parser_version: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached parse result, or None.
+        """
+        now = int(time.time())
+        try:
+            row = self._pool.get_connection().execute(
+                'SELECT result, parse_ms, last_used_at FROM report_cache WHERE digest = ? AND parser_version = ?',
+                (digest, parser_version)
+            ).fetchone()
+            if row is not None and now - row[2] >= self.touch_interval:
+                with self._pool.transaction() as conn:
+                    conn.execute('UPDATE report_cache SET last_used_at = ? WHERE digest = ? AND parser_version = ?',
+                                 (now, digest, parser_version))
+        except sqlite3.Error as e:
+            # The cache must never fail a report; treat it as a miss
+            logger.warning(f"Report cache lookup failed: {e}")
+            row = None
+
+        with self._stats_lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.parse_ms_saved += row[1] or 0.0
+        return json.loads(row[0])
+
+    def put(self, digest: str, parser_version: str, result: Dict[str, Any], parse_ms: float):
+        payload = json.dumps(result)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = int(time.time())
+        try:
+            with self._pool.transaction() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO report_cache
+                        (digest, parser_version, result, size_bytes, parse_ms, created_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (digest, parser_version, payload, size, parse_ms, now, now))
+                evicted = self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not persist report cache entry: {e}")
+            return
+        if evicted:
+            with self._stats_lock:
+                self.evictions += evicted
+            logger.info(f"Evicted {evicted} report cache entries")
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        # In the caller's transaction, so concurrent writers cannot both
+        # decide to evict the same space
+        excess = conn.execute('SELECT COALESCE(SUM(size_bytes), 0) FROM report_cache').fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return 0
+        doomed = []
+        for rowid, size in conn.execute('SELECT rowid, size_bytes FROM report_cache ORDER BY last_used_at'):
+            doomed.append((rowid,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany('DELETE FROM report_cache WHERE rowid = ?', doomed)
+        return len(doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            entries, size = self._pool.get_connection().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM report_cache').fetchone()
+        except sqlite3.Error:
+            entries, size = None, None
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "parse_ms_saved": round(self.parse_ms_saved, 1),
+                "entries": entries,
+                "size_bytes": size,
+                "max_bytes": self.max_bytes
+            }
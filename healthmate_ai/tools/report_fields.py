@@ -0,0 +1,86 @@
+"""
+Incremental extraction of "Label: value" fields from report text.
+
+ReportFieldExtractor is fed text as it is extracted, page by page or in any
+other pieces, and keeps only the fields it has found, so a long report
+never has to be held in memory to be structured. Field names are
+snake_cased labels ("Patient" -> "patient"). Lab readings are found by the
+AnalyteExtractor and stored typed, under the analyte's name, in the form
+lab_values.normalize_lab_values reads.
+"""
+
+import os
+import re
+from typing import Any, Dict, Optional
+from healthmate_ai.tools.analyte_extractor import AnalyteExtractor, get_analyte_extractor
+from healthmate_ai.tools.lab_values import canonical_analyte
+
+# Distinct fields kept per report, and characters kept per value
+REPORT_MAX_FIELDS = int(os.getenv("HEALTHMATE_REPORT_MAX_FIELDS", "200"))
+REPORT_MAX_VALUE_CHARS = int(os.getenv("HEALTHMATE_REPORT_MAX_VALUE_CHARS", "500"))
+
+_FIELD_LINE = re.compile(r"^\s*([A-Za-z][A-Za-z0-9 ()/%\-]{0,40}?)\s*:\s*(\S.*?)\s*$")
+
+
+def field_key(label: str) -> str:
+    return re.sub(r"[^a-z0-9%]+", "_", label.strip().lower()).strip("_")
+
+
+class ReportFieldExtractor:
+    """
+    Collects "Label: value" lines and lab readings from text fed in pieces.
+    A label or analyte seen again (e.g. the vitals on each day of a
+    discharge summary) keeps its latest value; field_counts records how
+    often each was seen. A "Label: value" line for an analyte that was read
+    as a typed value is not kept as text as well.
+    """
+    def __init__(self, max_fields: int = REPORT_MAX_FIELDS, max_value_chars: int = REPORT_MAX_VALUE_CHARS,
+                 analytes: Optional[AnalyteExtractor] = None):
+        self.max_fields = max_fields
+        self.max_value_chars = max_value_chars
+        self.analytes = analytes or get_analyte_extractor()
+        self.fields: Dict[str, str] = {}
+        self.lab_values: Dict[str, Dict[str, Any]] = {}
+        self.field_counts: Dict[str, int] = {}
+        # A line cut between two pieces waits here for its end
+        self._partial = ""
+
+    def feed(self, text: str):
+        text = self._partial + text
+        cut = text.rfind("\n")
+        if cut < 0:
+            self._partial = text
+            return
+        self._partial = text[cut + 1:]
+        self._scan(text[:cut])
+
+    def _scan(self, block: str):
+        for line in block.split("\n"):
+            self._add_line(line)
+        # One pass over the whole block rather than one per line
+        for name, value in self.analytes.scan(block):
+            self.lab_values[name] = value
+            self.field_counts[name] = self.field_counts.get(name, 0) + 1
+
+    def _add_line(self, line: str):
+        match = _FIELD_LINE.match(line)
+        if not match:
+            return
+        key = field_key(match.group(1))
+        if not key or (key not in self.fields and len(self.fields) >= self.max_fields):
+            return
+        self.fields[key] = match.group(2)[:self.max_value_chars]
+        self.field_counts[key] = self.field_counts.get(key, 0) + 1
+
+    def result(self) -> Dict[str, Any]:
+        """
+        The fields and lab values found so far, including any unterminated last line.
+        """
+        if self._partial:
+            self._scan(self._partial)
+            self._partial = ""
+        read = {canonical_analyte(name) for name in self.lab_values}
+        fields: Dict[str, Any] = {key: value for key, value in self.fields.items()
+                                  if key in self.lab_values or canonical_analyte(key) not in read}
+        fields.update(self.lab_values)
+        return fields
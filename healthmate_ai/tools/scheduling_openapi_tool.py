@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import random
+import uuid
 
 class SchedulingOpenAPITool:
     """
@@ -32,7 +33,8 @@ class SchedulingOpenAPITool:
         # Mock booking confirmation
         return {
             "status": "confirmed",
-            "appointment_id": f"apt_{random.randint(1000, 9999)}",
+            # Random 4-digit ids collided once many admissions were booked
+            "appointment_id": f"apt_{uuid.uuid4().hex[:12]}",
             "doctor_id": doctor_id,
             "date": f"{date} {time}",
             "patient_id": patient_id
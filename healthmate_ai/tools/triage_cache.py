@@ -0,0 +1,136 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from healthmate_ai.core.cache import MISSING, get_cache
+from healthmate_ai.core.db_pool import get_pool
+from healthmate_ai.core.logger import setup_logger
+from healthmate_ai.tools.db_migrations import ensure_schema
+
+logger = setup_logger("TriageCache")
+
+TRIAGE_CACHE_SIZE = int(os.getenv("HEALTHMATE_TRIAGE_CACHE_SIZE", "5000"))
+# How long a triage answer is reused, in seconds
+TRIAGE_CACHE_TTL = int(os.getenv("HEALTHMATE_TRIAGE_CACHE_TTL", "86400"))
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Reordering tokens around a negation could swap what is being negated
+# ("fever, no cough" vs "cough, no fever"), so such texts keep their order
+_NEGATIONS = {"no", "not", "without", "denies", "never", "none", "nor"}
+
+
+def normalize_symptoms(symptoms: str) -> str:
+    """
+    Canonical form of a symptom description: lower case, punctuation and
+    extra whitespace removed, and tokens sorted unless the text has a negation.
+    "Chest pain, headache" and "headache  chest-pain" normalize the same.
+    """
+    tokens = _TOKEN.findall(symptoms.lower())
+    if not _NEGATIONS.intersection(tokens):
+        tokens.sort()
+    return " ".join(tokens)
+
+
+class TriageCache:
+    """
+    Two-tier cache of triage answers: a process-local LRU in front of the
+    triage_cache table, which every process shares and which survives restarts.
+
+    Keys combine the normalized symptoms with the prompt and model version,
+    so changing either stops old answers from being served. Each entry keeps
+    the latency of the model call that produced it, which is counted as
+    saved on every hit.
+    """
+    def __init__(self, db_path: str = "healthmate.db",
+                 maxsize: int = TRIAGE_CACHE_SIZE,
+                 ttl: int = TRIAGE_CACHE_TTL):
+        self.ttl = ttl
+        self._pool = get_pool(db_path)
+        self._memory = get_cache(f"{os.path.abspath(db_path)}:triage", maxsize)
+        self._stats_lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.latency_saved_ms = 0.0
+        ensure_schema(self._pool)
+        self.purge_expired()
+
+    @staticmethod
+    def make_key(symptoms: str, prompt_version: str, model_name: str) -> str:
+        return f"{model_name}|{prompt_version}|{normalize_symptoms(symptoms)}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a copy of the cached triage result, or None.
+        """
+        now = time.time()
+        entry = self._memory.get(key)
+        tier = "memory"
+        if entry is not MISSING and entry[1] <= now:
+            self._memory.invalidate(key)
+            entry = MISSING
+        if entry is MISSING:
+            try:
+                row = self._pool.get_connection().execute(
+                    'SELECT result, expires_at, latency_ms FROM triage_cache WHERE cache_key = ? AND expires_at > ?',
+                    (key, int(now))
+                ).fetchone()
+            except sqlite3.Error as e:
+                # The cache must never fail a triage; treat it as a miss
+                logger.warning(f"Triage cache lookup failed: {e}")
+                row = None
+            if row is None:
+                with self._stats_lock:
+                    self.misses += 1
+                return None
+            entry = (json.loads(row[0]), row[1], row[2] or 0.0)
+            self._memory.put(key, entry)
+            tier = "db"
+
+        result, _, latency_ms = entry
+        with self._stats_lock:
+            if tier == "memory":
+                self.memory_hits += 1
+            else:
+                self.db_hits += 1
+            self.latency_saved_ms += latency_ms
+        return dict(result)
+
+    def put(self, key: str, result: Dict[str, Any], latency_ms: float):
+        now = int(time.time())
+        expires_at = now + self.ttl
+        self._memory.put(key, (dict(result), expires_at, latency_ms))
+        try:
+            with self._pool.transaction() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO triage_cache (cache_key, result, latency_ms, created_at, expires_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (key, json.dumps(result), latency_ms, now, expires_at))
+        except sqlite3.Error as e:
+            logger.warning(f"Could not persist triage cache entry: {e}")
+
+    def purge_expired(self) -> int:
+        """
+        Deletes expired rows from the table. Returns how many were removed.
+        """
+        with self._pool.transaction() as conn:
+            cursor = conn.execute('DELETE FROM triage_cache WHERE expires_at <= ?', (int(time.time()),))
+        if cursor.rowcount:
+            logger.info(f"Purged {cursor.rowcount} expired triage cache entries")
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            hits = self.memory_hits + self.db_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "latency_saved_ms": round(self.latency_saved_ms, 1),
+                "memory": self._memory.stats()
+            }
@@ -0,0 +1,85 @@
+import functools
+import os
+import threading
+from typing import Any, Dict, Optional
+from healthmate_ai.core.rule_engine import RuleEngine, load_rules
+
+RULES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rules")
+TRIAGE_RULES_PATH = os.getenv("HEALTHMATE_TRIAGE_RULES", os.path.join(RULES_DIR, "triage_rules.json"))
+# Distinct symptom strings whose classification is memoized; arrivals repeat a lot
+TRIAGE_RULES_MEMO_SIZE = int(os.getenv("HEALTHMATE_TRIAGE_RULES_MEMO_SIZE", "4096"))
+
+
+class TriageRules:
+    """
+    Rule-based triage used when the model is unavailable.
+
+    The department comes from the highest-priority condition mentioned (and
+    not negated) in the symptoms. The severity comes from the highest
+    condition score plus any intensity modifiers ("severe", "mild"), mapped
+    through the file's severity_levels. With no condition found the
+    file's default applies.
+    """
+    def __init__(self, path: str = TRIAGE_RULES_PATH, memo_size: int = TRIAGE_RULES_MEMO_SIZE):
+        config = load_rules(path)
+        self.version = config.get("version")
+        self.default = config["default"]
+        self.summaries = config["summaries"]
+        # Highest threshold first
+        self.severity_levels = sorted(config["severity_levels"], key=lambda level: level["min_score"], reverse=True)
+        self._engine = RuleEngine(config["rules"] + config.get("modifiers", []))
+        self._classify_memo = functools.lru_cache(maxsize=memo_size)(self._classify)
+
+    def _severity(self, score: int) -> str:
+        for level in self.severity_levels:
+            if score >= level["min_score"]:
+                return level["severity"]
+        return self.severity_levels[-1]["severity"]
+
+    def classify(self, symptoms: str) -> Dict[str, Any]:
+        """
+        Returns {"severity", "department", "summary"} for a symptom description.
+        """
+        # Copy, so callers cannot change the memoized result
+        return dict(self._classify_memo(symptoms))
+
+    def _classify(self, symptoms: str) -> Dict[str, Any]:
+        condition: Optional[Dict[str, Any]] = None
+        score = None
+        adjustments: Dict[str, int] = {}
+        for rule in self._engine.matches(symptoms):
+            if "adjust" in rule:
+                # Each modifier counts once however often it is repeated
+                adjustments[rule["name"]] = rule["adjust"]
+                continue
+            if condition is None or rule["priority"] > condition["priority"]:
+                condition = rule
+            if score is None or rule["score"] > score:
+                score = rule["score"]
+
+        if condition is None:
+            department = self.default["department"]
+            severity = self.default["severity"]
+        else:
+            department = condition["department"]
+            severity = self._severity(max(0, score + sum(adjustments.values())))
+        return {
+            "severity": severity,
+            "department": department,
+            "summary": self.summaries[department].format(symptoms=symptoms)
+        }
+
+
+_rules: Optional[TriageRules] = None
+_rules_lock = threading.Lock()
+
+
+def get_triage_rules() -> TriageRules:
+    """
+    The process-wide TriageRules, compiled on first use.
+    """
+    global _rules
+    with _rules_lock:
+        if _rules is None:
+            _rules = TriageRules()
+        return _rules
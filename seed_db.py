@@ -6,11 +6,11 @@ from datetime import datetime
 # Add current directory to path
 sys.path.append(os.getcwd())
 
-from healthmate_ai.tools.database_tool import DatabaseTool
+from healthmate_ai.core.app_context import AppContext
 
 def seed():
     print("Seeding database...")
-    db = DatabaseTool()
+    db = AppContext().get("db_tool")
     
     # 1. Add Patient
     patient_id = "p_001"
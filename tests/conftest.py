@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Run from anywhere, the way the scripts add the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,58 @@
+"""
+DatabaseTool's patient caches: copies handed out, and reads inside transactions.
+Also the lab_results backfill of reports re-marked by migrations.
+"""
+import pytest
+
+from healthmate_ai.core.datetime_utils import to_epoch
+from healthmate_ai.tools.database_tool import DatabaseTool
+from healthmate_ai.tools.db_migrations import _m009_reindex_nested_report_dates
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseTool(str(tmp_path / "cache.db"))
+    db.add_patient({"patient_id": "p_1", "name": "Jane Doe", "age": 40, "gender": "Female",
+                    "phone": "555-0000", "email": "n/a"})
+    return db
+
+
+def _visit(visit_id: str) -> dict:
+    return {"visit_id": visit_id, "patient_id": "p_1", "symptoms": "cough", "triage_summary": "",
+            "severity": "Low", "department": "General", "timestamp": "2023-10-01T09:00:00"}
+
+
+def test_context_callers_get_their_own_copy(db):
+    context = db.get_patient_context("p_1")
+    context["info"]["name"] = "Changed"
+    context["visits"].append({"visit_id": "v_x"})
+    again = db.get_patient_context("p_1")
+    assert again["info"]["name"] == "Jane Doe" and again["visits"] == []
+    assert db._contexts.stats()["hits"] == 1
+
+
+def test_reads_in_a_rolled_back_transaction_are_not_cached(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.add_visit(_visit("v_1"))
+            db.add_patient({"patient_id": "p_1", "name": "Renamed", "age": 41, "gender": "Female",
+                            "phone": "555-0000", "email": "n/a"})
+            assert [v["visit_id"] for v in db.get_patient_context("p_1")["visits"]] == ["v_1"]
+            assert [v.visit_id for v in db.get_patient_history("p_1")] == ["v_1"]
+            assert db.get_patient("p_1").name == "Renamed"
+            raise RuntimeError("roll back")
+    assert db.get_patient_context("p_1")["visits"] == []
+    assert db.get_patient_history("p_1") == []
+    assert db.get_patient("p_1").name == "Jane Doe"
+
+
+def test_backfill_repairs_dates_of_nested_reports(db):
+    db.add_medical_report({"report_id": "rep_1", "patient_id": "p_1", "extracted_data": {
+        "extracted_fields": {"date": "2023-10-27", "heart_rate": {"value": 72.0, "unit": "bpm"}}}})
+    conn = db._get_connection()
+    with conn:
+        # As stored before report_taken_at read nested dates
+        conn.execute("UPDATE lab_results SET taken_at = 0")
+        _m009_reindex_nested_report_dates(conn.cursor())
+    assert db.backfill_lab_results() == 1
+    assert conn.execute("SELECT taken_at FROM lab_results").fetchall() == [(to_epoch("2023-10-27"),)]
@@ -0,0 +1,33 @@
+"""
+Doctor-agent tool functions given the kinds of arguments a model sends.
+"""
+import pytest
+
+from healthmate_ai.tools import doctor_tools_definitions
+from healthmate_ai.tools.doctor_database_tool import DoctorDatabaseTool
+
+
+@pytest.fixture(autouse=True)
+def db(tmp_path):
+    doctor_tools_definitions.use_db_tool(DoctorDatabaseTool(str(tmp_path / "doctor.db")))
+    yield
+    doctor_tools_definitions.use_db_tool(None)
+
+
+@pytest.mark.parametrize("call", [
+    lambda: doctor_tools_definitions.get_doctor_schedule("Dr. Smith", "today"),
+    lambda: doctor_tools_definitions.get_patient_list_for_date("Dr. Smith", "10/18/2026"),
+    lambda: doctor_tools_definitions.get_doctor_calendar("Dr. Smith", "2026-10-12", "next friday"),
+])
+def test_non_iso_dates_return_an_error(call):
+    assert "error" in call()
+
+
+def test_iso_date_returns_the_schedule():
+    result = doctor_tools_definitions.get_doctor_schedule("Dr. Smith", "2026-10-18")
+    assert result["count"] == 0 and result["appointments"] == []
+
+
+def test_made_up_cursor_returns_an_error():
+    result = doctor_tools_definitions.get_patient_insight("p_1", visits_cursor="page 2")
+    assert "Invalid visits cursor" in result["error"]
@@ -0,0 +1,25 @@
+"""
+Sample dates and lab rows from flat and nested (full parser output) report data.
+"""
+from healthmate_ai.core.datetime_utils import to_epoch
+from healthmate_ai.tools.lab_values import normalize_lab_values, report_taken_at
+
+NESTED = {
+    "file_path": "/drop/p_1__labs.pdf",
+    "page_count": 1,
+    "extracted_fields": {"patient": "John Doe", "date": "2023-10-27",
+                         "heart_rate": {"value": 72.0, "unit": "bpm"}},
+}
+
+
+def test_nested_parse_result_uses_its_date():
+    assert report_taken_at(NESTED) == to_epoch("2023-10-27")
+    assert normalize_lab_values(NESTED) == [("heart_rate", 72.0, "bpm")]
+
+
+def test_flat_data_uses_its_date():
+    assert report_taken_at({"taken_at": "2023-01-05 08:30", "glucose": "95 mg/dL"}) == to_epoch("2023-01-05 08:30")
+
+
+def test_no_date_falls_back_to_now():
+    assert abs(report_taken_at({"extracted_fields": {"glucose": "95"}}) - report_taken_at({})) <= 1
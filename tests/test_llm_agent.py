@@ -0,0 +1,75 @@
+"""
+LlmAgent.send_message_stream and its tool loop, against a scripted FakeChat
+from an injected model_factory.
+"""
+import pytest
+
+from benchmarks.fake_llm import FakeChat, FakeGenerativeModel, fake_function_response, fake_model_factory
+from healthmate_ai.core.llm_infrastructure import CircuitBreaker, FunctionTool, LlmAgent, LlmClient
+
+
+@pytest.fixture(autouse=True)
+def no_chunk_delay(monkeypatch):
+    monkeypatch.delenv("HEALTHMATE_FAKE_LLM_CHUNK_MS", raising=False)
+
+
+def _agent(script, tools=(), client=None):
+    model = FakeGenerativeModel(latency_ms=0)
+    chat = FakeChat(model, script, chunk_words=2, chunk_ms=0)
+    model.start_chat = lambda **kwargs: chat
+    return LlmAgent("test", tools=[FunctionTool(func) for func in tools], llm_client=client or LlmClient(),
+                    model_factory=lambda model_name, **kwargs: model)
+
+
+def test_model_factory_replaces_gemini():
+    agent = LlmAgent("test", llm_client=LlmClient(), model_factory=fake_model_factory)
+    assert agent.send_message("hi") == "(fake model) Received: hi"
+    assert isinstance(agent.chat, FakeChat)
+
+
+def test_chunks_arrive_in_order():
+    agent = _agent([{"text": "one two three four five"}])
+    assert list(agent.send_message_stream("hi")) == ["one two", " three four", " five"]
+
+
+def test_tool_turn_then_streamed_text():
+    seen = []
+
+    def lookup_patient(patient_id: str):
+        seen.append(patient_id)
+        return {"name": "Jane Doe"}
+
+    agent = _agent([{"calls": [{"name": "lookup_patient", "args": {"patient_id": "p_1"}}]},
+                    {"text": "Jane Doe is booked."}], tools=[lookup_patient])
+    assert list(agent.send_message_stream("Who is p_1?")) == ["Jane Doe", " is booked."]
+    assert seen == ["p_1"]
+    # The tool result went back to the model as the second turn's message
+    assert agent.chat.history[2] == [fake_function_response("lookup_patient", {"name": "Jane Doe"})]
+
+
+def test_failing_and_unknown_tools_answer_with_errors():
+    def broken():
+        raise RuntimeError("database is down")
+
+    agent = _agent([{"calls": [{"name": "broken", "args": {}}, {"name": "missing", "args": {}}]},
+                    {"text": "Sorry."}], tools=[broken])
+    assert agent.send_message("hi") == "Sorry."
+    assert agent.chat.history[2] == [fake_function_response("broken", {"error": "database is down"}),
+                                     fake_function_response("missing", {"error": "Unknown tool: missing"})]
+
+
+def test_timing_is_recorded():
+    agent = _agent([{"text": "hello there"}])
+    agent.send_message("hi")
+    assert agent.last_timing["ttft_ms"] is not None
+    assert 0 <= agent.last_timing["ttft_ms"] <= agent.last_timing["total_ms"]
+
+
+def test_open_breaker_answers_without_calling_the_model():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+    breaker.record_failure()
+    agent = _agent([{"text": "never sent"}], client=LlmClient(breaker=breaker))
+    assert list(agent.send_message_stream("hi")) == [
+        "The assistant is temporarily unavailable. Please try again shortly."]
+    assert agent.chat.model.calls == 0
+    assert agent.last_timing["ttft_ms"] is None
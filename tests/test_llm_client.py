@@ -0,0 +1,181 @@
+"""
+LlmClient deadlines, retries, circuit breaker and fallback, against FakeGenerativeModel.
+"""
+import asyncio
+import time
+
+import pytest
+
+from healthmate_ai.agents.triage_agent import TriageAgent
+from benchmarks.fake_llm import FakeGenerativeModel
+from healthmate_ai.core.llm_infrastructure import (
+    CircuitBreaker, CircuitOpenError, LlmClient, LlmTimeoutError, LlmUnavailableError, RetryBudget
+)
+from healthmate_ai.tools.triage_cache import TriageCache
+
+
+def _client(**kwargs) -> LlmClient:
+    kwargs.setdefault("base_backoff", 0.001)
+    kwargs.setdefault("max_backoff", 0.001)
+    return LlmClient(**kwargs)
+
+
+def _failing_first(model: FakeGenerativeModel, failures: int):
+    # The model's first `failures` calls raise ServiceUnavailable, later ones answer
+    def generate(prompt):
+        model.error_rate = 1.0 if model.calls < failures else 0.0
+        return model.generate_content(prompt)
+    return generate
+
+
+def _open(client: LlmClient, model: FakeGenerativeModel):
+    model.error_rate = 1.0
+    for _ in range(client.breaker.failure_threshold):
+        with pytest.raises(LlmUnavailableError):
+            client.call_sync(model.generate_content, "Symptoms: headache", retry=False)
+    assert client.breaker.state == CircuitBreaker.OPEN
+    model.error_rate = 0.0
+
+
+def test_retries_transient_errors_within_budget():
+    model = FakeGenerativeModel(latency_ms=0)
+    client = _client(max_attempts=3)
+    response = client.call_sync(_failing_first(model, 2), "Symptoms: headache")
+    assert "Neurology" in response.text
+    assert model.calls == 3
+    assert client.stats()["retries"] == 2
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retries_stop_when_budget_is_spent():
+    model = FakeGenerativeModel(latency_ms=0)
+    client = _client(max_attempts=5, retry_budget=RetryBudget(ratio=0.0, max_tokens=1.0))
+    with pytest.raises(LlmUnavailableError):
+        client.call_sync(_failing_first(model, 3), "Symptoms: headache")
+    assert model.calls == 2
+    assert client.stats()["retries"] == 1
+
+
+def test_non_retryable_error_is_not_retried():
+    client = _client(max_attempts=3)
+    calls = []
+
+    def bad_request(prompt):
+        calls.append(prompt)
+        raise ValueError("400 invalid argument")
+
+    with pytest.raises(LlmUnavailableError):
+        client.call_sync(bad_request, "x")
+    assert len(calls) == 1
+    assert client.breaker.failures == 0
+
+
+def test_deadline_covers_a_hung_call():
+    model = FakeGenerativeModel(latency_ms=0, hang_rate=1.0, hang_s=1.0)
+    client = _client(timeout=0.1, max_attempts=3)
+    start = time.monotonic()
+    with pytest.raises(LlmTimeoutError):
+        client.call_sync(model.generate_content, "Symptoms: headache")
+    assert time.monotonic() - start < 0.5
+    assert client.stats()["timeouts"] >= 1
+
+
+def test_breaker_opens_and_short_circuits():
+    model = FakeGenerativeModel(latency_ms=0)
+    client = _client(breaker=CircuitBreaker(failure_threshold=2, cooldown=60))
+    _open(client, model)
+    calls = model.calls
+    with pytest.raises(CircuitOpenError):
+        client.call_sync(model.generate_content, "Symptoms: headache")
+    assert model.calls == calls
+    assert client.stats()["short_circuits"] == 1
+
+
+def test_half_open_probe_success_closes_the_breaker():
+    model = FakeGenerativeModel(latency_ms=0)
+    client = _client(breaker=CircuitBreaker(failure_threshold=2, cooldown=0.05))
+    _open(client, model)
+    time.sleep(0.06)
+    client.call_sync(model.generate_content, "Symptoms: headache")
+    assert client.breaker.state == CircuitBreaker.CLOSED
+    client.call_sync(model.generate_content, "Symptoms: headache")
+
+
+def test_half_open_probe_failure_reopens_the_breaker():
+    model = FakeGenerativeModel(latency_ms=0)
+    client = _client(breaker=CircuitBreaker(failure_threshold=2, cooldown=0.05))
+    _open(client, model)
+    time.sleep(0.06)
+    model.error_rate = 1.0
+    with pytest.raises(LlmUnavailableError):
+        client.call_sync(model.generate_content, "Symptoms: headache")
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_probe_with_request_error_closes_the_breaker():
+    # Regression: a non-retryable probe error used to leave the breaker half-open for good
+    model = FakeGenerativeModel(latency_ms=0)
+    client = _client(breaker=CircuitBreaker(failure_threshold=2, cooldown=0.05))
+    _open(client, model)
+    time.sleep(0.06)
+
+    def bad_request(prompt):
+        raise ValueError("400 invalid argument")
+
+    with pytest.raises(LlmUnavailableError):
+        client.call_sync(bad_request, "x")
+    assert client.breaker.state == CircuitBreaker.CLOSED
+    client.call_sync(model.generate_content, "Symptoms: headache")
+
+
+def test_cancelled_probe_reopens_the_breaker():
+    model = FakeGenerativeModel(latency_ms=0, hang_s=1.0)
+    client = _client(breaker=CircuitBreaker(failure_threshold=2, cooldown=0.05))
+    _open(client, model)
+    time.sleep(0.06)
+    model.hang_rate = 1.0
+
+    async def cancel_probe():
+        probe = asyncio.ensure_future(client.call(model.generate_content, "Symptoms: headache"))
+        await asyncio.sleep(0.05)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+    asyncio.run(cancel_probe())
+    assert client.breaker.state == CircuitBreaker.OPEN
+    model.hang_rate = 0.0
+    time.sleep(0.06)
+    client.call_sync(model.generate_content, "Symptoms: headache")
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_async_call_retries_and_succeeds():
+    model = FakeGenerativeModel(latency_ms=0)
+    client = _client(max_attempts=3)
+    response = asyncio.run(client.call(_failing_first(model, 1), "Symptoms: chest pain"))
+    assert "Cardiology" in response.text
+    assert client.stats()["retries"] == 1
+
+
+def test_async_call_times_out():
+    model = FakeGenerativeModel(latency_ms=0, hang_rate=1.0, hang_s=1.0)
+    client = _client(timeout=0.1)
+    with pytest.raises(LlmTimeoutError):
+        asyncio.run(client.call(model.generate_content, "Symptoms: headache"))
+
+
+def test_triage_falls_back_when_the_model_is_down(tmp_path):
+    model = FakeGenerativeModel(latency_ms=0, error_rate=1.0)
+    client = _client(max_attempts=2, breaker=CircuitBreaker(failure_threshold=1, cooldown=60))
+    agent = TriageAgent(cache=TriageCache(str(tmp_path / "triage.db")), llm_client=client)
+    agent.model = model
+
+    first = agent.analyze_symptoms("Severe chest pain")
+    assert first["department"] == "Cardiology"
+    # The breaker is open now; the fallback answers without calling the model
+    calls = model.calls
+    assert agent.analyze_symptoms("Knee swollen after a fall")["department"] == "Orthopedics"
+    assert model.calls == calls
+    # Fallback answers are never cached
+    assert agent.cache_stats()["memory"]["size"] == 0
@@ -0,0 +1,45 @@
+"""
+Paging through a patient's visits with fetch_patient_context cursors.
+"""
+import pytest
+
+from healthmate_ai.tools.database_tool import DatabaseTool
+from healthmate_ai.tools.patient_context_query import fetch_patient_context
+
+# Timestamps to_epoch cannot read leave visited_at NULL
+TIMESTAMPS = {"v_1": "2023-10-01T09:00:00", "v_2": "2023-10-02T09:00:00", "v_3": "2023-10-02T09:00:00",
+              "v_4": "last tuesday", "v_5": "2023-10-05T09:00:00", "v_6": "", "v_7": "unknown"}
+
+
+@pytest.fixture
+def conn(tmp_path):
+    db = DatabaseTool(str(tmp_path / "context.db"))
+    db.add_patient({"patient_id": "p_1", "name": "Jane Doe", "age": 40, "gender": "Female",
+                    "phone": "555-0000", "email": "n/a"})
+    db.add_visit_bulk({"visit_id": visit_id, "patient_id": "p_1", "symptoms": "cough", "triage_summary": "",
+                       "severity": "Low", "department": "General", "timestamp": timestamp}
+                      for visit_id, timestamp in TIMESTAMPS.items())
+    return db._get_connection()
+
+
+def test_pages_cover_undated_visits(conn):
+    seen, cursor = [], None
+    while True:
+        page = fetch_patient_context(conn, "p_1", visit_limit=2, visits_cursor=cursor)
+        seen.extend(visit["visit_id"] for visit in page["visits"])
+        cursor = page["next_visits_cursor"]
+        if cursor is None:
+            break
+    # Newest first, then the undated visits
+    assert seen == ["v_5", "v_3", "v_2", "v_1", "v_7", "v_6", "v_4"]
+
+
+@pytest.mark.parametrize("cursor", ["v_5", "abc:v_5", "1696496400:", ":"])
+def test_malformed_visits_cursor(conn, cursor):
+    with pytest.raises(ValueError, match="Invalid visits cursor"):
+        fetch_patient_context(conn, "p_1", visits_cursor=cursor)
+
+
+def test_malformed_reports_cursor(conn):
+    with pytest.raises(ValueError, match="Invalid reports cursor"):
+        fetch_patient_context(conn, "p_1", reports_cursor="rep_1")
@@ -0,0 +1,47 @@
+"""
+Memory figures of PDFParserTool.parse_report_stream, serially and with
+page ranges extracted through an executor.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from create_sample_pdf import create_large_pdf
+from healthmate_ai.tools.pdf_parser_tool import PDFParserTool, extract_page_range
+
+
+@pytest.fixture
+def report(tmp_path):
+    path = str(tmp_path / "report.pdf")
+    create_large_pdf(path, 6)
+    return path
+
+
+def test_max_rss_is_always_reported(report):
+    result = PDFParserTool().parse_report_stream(report)
+    assert result["peak_memory_kb"] is None
+    assert result["worker_peak_memory_kb"] is None
+    assert result["max_rss_kb"] > 0
+
+
+def test_serial_parse_measures_this_process(report):
+    result = PDFParserTool().parse_report_stream(report, measure_memory=True)
+    assert result["peak_memory_kb"] > 0
+    assert result["worker_peak_memory_kb"] is None
+
+
+def test_page_range_reports_its_own_memory(report):
+    texts, failed, memory = extract_page_range(report, 0, 2, measure_memory=True)
+    assert len(texts) == 2 and failed == []
+    assert memory["peak_kb"] > 0 and memory["max_rss_kb"] > 0
+    assert extract_page_range(report, 0, 2)[2]["peak_kb"] is None
+
+
+def test_worker_peaks_are_aggregated(report):
+    # One thread: extract_page_range keeps one open reader per process, as
+    # meant for the worker processes
+    with ThreadPoolExecutor(1) as executor:
+        result = PDFParserTool(executor=executor, pages_per_task=2).parse_report_stream(report, measure_memory=True)
+    assert result["pages_extracted"] == 6
+    assert result["worker_peak_memory_kb"] > 0
+    assert result["max_rss_kb"] > 0
@@ -0,0 +1,70 @@
+"""
+ReminderAgent.run_cycle_async: sending must not hold the database writer thread.
+run_cycle drives the same cycle without an event loop.
+"""
+import asyncio
+import threading
+
+from healthmate_ai.agents.reminder_agent import ReminderAgent
+from healthmate_ai.core.executors import Executors
+from healthmate_ai.tools.async_database_tool import AsyncDatabaseTool
+from healthmate_ai.tools.database_tool import DatabaseTool
+
+
+class BlockingNotifier:
+    def __init__(self):
+        self.sending = threading.Event()
+        self.release = threading.Event()
+        self.sent = []
+
+    def send_sms(self, phone: str, message: str) -> bool:
+        self.sending.set()
+        self.release.wait(5)
+        self.sent.append(message)
+        return "a_2" not in message
+
+
+def _db(tmp_path) -> DatabaseTool:
+    db = DatabaseTool(str(tmp_path / "reminders.db"))
+    db.add_patient({"patient_id": "p_1", "name": "Jane Doe", "age": 40, "gender": "Female",
+                    "phone": "555-0000", "email": "n/a"})
+    for n in (1, 2):
+        db.add_appointment({"appointment_id": f"a_{n}", "patient_id": "p_1", "doctor_id": "Dr. Smith",
+                            "date": "2023-10-27 09:00", "status": "Scheduled"})
+        db.add_reminder({"reminder_id": f"r_{n}", "appointment_id": f"a_{n}", "reminder_date": "2023-10-26"})
+    return db
+
+
+def test_writer_is_free_while_reminders_are_sent(tmp_path):
+    db = _db(tmp_path)
+    agent = ReminderAgent(db)
+    agent.notifier = BlockingNotifier()
+    async_db = AsyncDatabaseTool(db)
+    executors = Executors(io_workers=2, cpu_workers=0)
+
+    async def scenario():
+        cycle = asyncio.create_task(agent.run_cycle_async(async_db, executors))
+        await asyncio.get_running_loop().run_in_executor(None, agent.notifier.sending.wait, 5)
+        # Another write gets through while the first reminder is still sending
+        assert await asyncio.wait_for(async_db.run_write(lambda: "written"), 2) == "written"
+        agent.notifier.release.set()
+        await cycle
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        async_db.close()
+        executors.shutdown()
+    assert len(agent.notifier.sent) == 2
+    # r_1 was sent; r_2 failed and was released for the next cycle
+    assert [r.reminder_id for r in db.get_pending_reminders()] == ["r_2"]
+
+
+def test_run_cycle_without_a_loop(tmp_path):
+    db = _db(tmp_path)
+    agent = ReminderAgent(db)
+    agent.notifier = BlockingNotifier()
+    agent.notifier.release.set()
+    agent.run_cycle()
+    assert len(agent.notifier.sent) == 2
+    assert [r.reminder_id for r in db.get_pending_reminders()] == ["r_2"]
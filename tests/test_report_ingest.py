@@ -0,0 +1,101 @@
+"""
+ReportIngestAgent: lab dates, re-ingesting changed files, and worker processes that die.
+"""
+import os
+
+import pytest
+
+from create_sample_pdf import create_large_pdf
+from healthmate_ai.agents import report_ingest_agent
+from healthmate_ai.agents.report_ingest_agent import ReportIngestAgent
+from healthmate_ai.agents.report_parser_agent import ReportParserAgent
+from healthmate_ai.core.datetime_utils import to_epoch
+from healthmate_ai.core.executors import Executors
+from healthmate_ai.tools.database_tool import DatabaseTool
+from healthmate_ai.tools.report_cache import ReportCache
+
+
+def _crash_on(path: str):
+    # Kills the worker process, as a segfault or the OOM killer would
+    if "crash" in os.path.basename(path):
+        os._exit(1)
+    return _parse_report_file(path)
+
+
+_parse_report_file = report_ingest_agent.parse_report_file
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseTool(str(tmp_path / "ingest.db"))
+    db.add_patient({"patient_id": "p_1", "name": "Jane Doe", "age": 40, "gender": "Female",
+                    "phone": "555-0000", "email": "n/a"})
+    return db
+
+
+def _agent(db, executors) -> ReportIngestAgent:
+    return ReportIngestAgent(db_tool=db, executors=executors, in_flight=4,
+                             report_agent=ReportParserAgent(executors, cache=ReportCache(db.db_path, max_bytes=0)))
+
+
+def _reports(db):
+    conn = db._get_connection()
+    reports = conn.execute("SELECT report_id FROM medical_reports").fetchall()
+    labs = conn.execute("SELECT report_id, COUNT(*) FROM lab_results GROUP BY report_id").fetchall()
+    return [row[0] for row in reports], dict(labs)
+
+
+def test_lab_values_are_dated_by_the_report(tmp_path, db):
+    root = tmp_path / "drop"
+    root.mkdir()
+    create_large_pdf(str(root / "p_1__labs.pdf"), 2)
+    executors = Executors(io_workers=2, cpu_workers=0)
+    try:
+        assert _agent(db, executors).ingest(str(root))["ingested"] == 1
+    finally:
+        executors.shutdown()
+    taken_at = db._get_connection().execute("SELECT DISTINCT taken_at FROM lab_results").fetchall()
+    # The report's "Date: 2023-10-27", not the time it was ingested
+    assert taken_at == [(to_epoch("2023-10-27"),)]
+
+
+def test_changed_file_replaces_its_report(tmp_path, db):
+    root = tmp_path / "drop"
+    root.mkdir()
+    path = str(root / "p_1__labs.pdf")
+    create_large_pdf(path, 2, seed=1)
+    executors = Executors(io_workers=2, cpu_workers=0)
+    try:
+        agent = _agent(db, executors)
+        assert agent.ingest(str(root))["ingested"] == 1
+        (report_id,), labs = _reports(db)
+
+        create_large_pdf(path, 2, seed=2)
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000_000))
+        stats = agent.ingest(str(root))
+    finally:
+        executors.shutdown()
+    assert stats["ingested"] == 1 and stats["skipped"] == 0
+    reports, new_labs = _reports(db)
+    assert reports == [report_id]
+    # Replaced, not added to the old report's rows
+    assert new_labs == labs and labs[report_id] > 0
+    assert db.get_patient_context("p_1")["reports"][0]["report_id"] == report_id
+
+
+def test_dead_worker_fails_only_its_report(tmp_path, db, monkeypatch):
+    root = tmp_path / "drop"
+    root.mkdir()
+    for name in ("a", "b", "crash", "c", "d", "e"):
+        create_large_pdf(str(root / f"p_1__{name}.pdf"), 1)
+    # Forked workers inherit the patched parser
+    monkeypatch.setattr(report_ingest_agent, "parse_report_file", _crash_on)
+    executors = Executors(io_workers=2, cpu_workers=2, start_method="fork")
+    try:
+        stats = _agent(db, executors).ingest(str(root))
+    finally:
+        executors.shutdown()
+    assert stats["ingested"] == 5
+    assert stats["failed"] == 1
+    assert stats["failures"] == [(str(root / "p_1__crash.pdf"), "worker process died parsing this report")]
+    assert len(_reports(db)[0]) == 5
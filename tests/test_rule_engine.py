@@ -0,0 +1,50 @@
+"""
+RuleEngine scanning and the doctor-portal routing rules.
+"""
+import os
+
+import pytest
+
+from healthmate_ai.core.rule_engine import RuleEngine
+from healthmate_ai.tools.triage_rules import RULES_DIR
+
+
+@pytest.fixture(scope="module")
+def router() -> RuleEngine:
+    return RuleEngine.from_file(os.path.join(RULES_DIR, "doctor_routing.json"))
+
+
+@pytest.mark.parametrize("query, route", [
+    ("Show me the reports for p_001", "insight"),
+    ("What is scheduled for me?", "schedule"),
+    ("My schedules this week", "schedule"),
+    ("Any appointment left this afternoon?", "schedule"),
+    ("Latest lab results for p_003", "insight"),
+    ("Good morning", None),
+])
+def test_routes_inflected_queries(router, query, route):
+    best = router.best(query)
+    assert (best["agent"] if best else None) == route
+
+
+@pytest.mark.parametrize("query, route", [
+    ("Which patients are not on my schedule?", "schedule"),
+    ("Patients with no lab results this month", "insight"),
+    ("Am I free, no appointments today?", "schedule"),
+])
+def test_routing_ignores_negation(router, query, route):
+    # A doctor asking about what is missing still wants that agent
+    assert router.best(query)["agent"] == route
+
+
+def test_routing_rule_names_are_unique(router):
+    names = [rule["name"] for rule in router.rules]
+    assert len(names) == len(set(names))
+
+
+def test_negated_terms_do_not_match():
+    engine = RuleEngine([{"name": "cardiac", "terms": ["chest pain"]}, {"name": "fever", "terms": ["fever"]}])
+    assert [rule["name"] for rule in engine.matches("Chest  pain and fever")] == ["cardiac", "fever"]
+    assert [rule["name"] for rule in engine.matches("No chest pain, but fever")] == ["fever"]
+    hits = engine.scan("denies fever")
+    assert [(hit.term, hit.negated) for hit in hits] == [("fever", True)]
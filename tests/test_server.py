@@ -0,0 +1,197 @@
+"""
+The HTTP service: admission outcomes, doctor reads and questions, report paths and /healthz.
+"""
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from benchmarks.fake_llm import fake_model_factory
+from healthmate_ai import server
+from healthmate_ai.core.app_context import AppContext
+from healthmate_ai.core.executors import Executors
+
+
+class StubOrchestrator:
+    """
+    Admits instantly, or holds every admission until `release` is set.
+    """
+    def __init__(self, hold: bool = False):
+        self.release = asyncio.Event()
+        if not hold:
+            self.release.set()
+        self.requests = []
+
+    async def process_patient_request(self, patient_id, symptoms, report_path=None, run_reminders=True):
+        self.requests.append((patient_id, symptoms, report_path))
+        await self.release.wait()
+        return {"status": "success", "patient_id": patient_id}
+
+
+@pytest.fixture
+def context(tmp_path):
+    context = AppContext(str(tmp_path / "server.db"))
+    executors = Executors(io_workers=2, cpu_workers=0)
+    context.register("executors", lambda app: executors)
+    db = context.get("db_tool")
+    db.add_patient({"patient_id": "p_1", "name": "Jane Doe", "age": 40, "gender": "Female",
+                    "phone": "555-0000", "email": "n/a"})
+    db.add_appointment({"appointment_id": "a_1", "patient_id": "p_1", "doctor_id": "Dr. Smith",
+                        "date": "2023-10-27 09:00", "status": "Scheduled"})
+    yield context
+    executors.shutdown()
+
+
+def _serve(context, scenario, orchestrator=None):
+    context.register("orchestrator", lambda app: orchestrator or StubOrchestrator())
+
+    async def run():
+        async with TestClient(TestServer(server.create_app(context))) as client:
+            await scenario(client)
+
+    asyncio.run(run())
+
+
+def _admission(**overrides):
+    return {"patient_id": "p_1", "symptoms": "cough", **overrides}
+
+
+def test_admission_ok(context):
+    async def scenario(client):
+        response = await client.post("/admissions", json=_admission())
+        assert response.status == 200
+        assert (await response.json())["status"] == "success"
+
+    _serve(context, scenario)
+
+
+def test_admission_of_unknown_patient(context):
+    orchestrator = StubOrchestrator()
+
+    async def scenario(client):
+        response = await client.post("/admissions", json=_admission(patient_id="p_404"))
+        assert response.status == 404
+
+    _serve(context, scenario, orchestrator)
+    assert orchestrator.requests == []
+
+
+def test_admission_rejected_when_queue_is_full(context, monkeypatch):
+    monkeypatch.setattr(server, "ADMISSION_WORKERS", 1)
+    monkeypatch.setattr(server, "ADMISSION_QUEUE_SIZE", 1)
+    orchestrator = StubOrchestrator(hold=True)
+
+    async def scenario(client):
+        # One admission with the worker, one waiting in the queue
+        held = [asyncio.create_task(client.post("/admissions", json=_admission())) for _ in range(2)]
+        while client.app[server.ADMISSIONS].stats()["queued"] < 1:
+            await asyncio.sleep(0.01)
+        response = await client.post("/admissions", json=_admission())
+        assert response.status == 503
+        assert response.headers["Retry-After"] == "1"
+        orchestrator.release.set()
+        assert [r.status for r in await asyncio.gather(*held)] == [200, 200]
+
+    _serve(context, scenario, orchestrator)
+
+
+def test_admission_timeout(context, monkeypatch):
+    monkeypatch.setattr(server, "ADMISSION_TIMEOUT", 0.1)
+    orchestrator = StubOrchestrator(hold=True)
+
+    async def scenario(client):
+        response = await client.post("/admissions", json=_admission())
+        assert response.status == 504
+        orchestrator.release.set()
+
+    _serve(context, scenario, orchestrator)
+
+
+@pytest.mark.parametrize("report_path", ["../escape.pdf", "/etc/passwd", "sub/../../escape.pdf"])
+def test_report_path_outside_reports_dir(context, tmp_path, monkeypatch, report_path):
+    monkeypatch.setattr(server, "REPORTS_DIR", str(tmp_path / "reports"))
+    orchestrator = StubOrchestrator()
+
+    async def scenario(client):
+        response = await client.post("/admissions", json=_admission(report_path=report_path))
+        assert response.status == 400
+        assert "inside the reports directory" in (await response.json())["error"]
+
+    _serve(context, scenario, orchestrator)
+    assert orchestrator.requests == []
+
+
+def test_report_path_inside_reports_dir(context, tmp_path, monkeypatch):
+    reports = tmp_path / "reports"
+    monkeypatch.setattr(server, "REPORTS_DIR", str(reports))
+    orchestrator = StubOrchestrator()
+
+    async def scenario(client):
+        response = await client.post("/admissions", json=_admission(report_path="p_1__labs.pdf"))
+        assert response.status == 200
+
+    _serve(context, scenario, orchestrator)
+    assert orchestrator.requests == [("p_1", "cough", str(reports / "p_1__labs.pdf"))]
+
+
+def test_report_path_without_reports_dir(context, monkeypatch):
+    monkeypatch.setattr(server, "REPORTS_DIR", "")
+
+    async def scenario(client):
+        response = await client.post("/admissions", json=_admission(report_path="p_1__labs.pdf"))
+        assert response.status == 400
+
+    _serve(context, scenario)
+
+
+def test_doctor_schedule(context):
+    async def scenario(client):
+        response = await client.get("/doctors/Dr. Smith/schedule", params={"date": "2023-10-27"})
+        assert response.status == 200
+        assert [a["appointment_id"] for a in (await response.json())["appointments"]] == ["a_1"]
+        response = await client.get("/doctors/Dr. Smith/schedule", params={"date": "tomorrow"})
+        assert response.status == 400
+
+    _serve(context, scenario)
+
+
+def test_patient_insight(context):
+    async def scenario(client):
+        response = await client.get("/patients/p_1/insight")
+        assert response.status == 200
+        assert (await response.json())["info"]["name"] == "Jane Doe"
+        response = await client.get("/patients/p_1/insight", params={"visits_cursor": "page 2"})
+        assert response.status == 400
+        assert "Invalid visits cursor" in (await response.json())["error"]
+        response = await client.get("/patients/p_404/insight")
+        assert response.status == 404
+
+    _serve(context, scenario)
+
+
+@pytest.mark.parametrize("question, agent", [
+    ("Patients with no lab results this month", "PatientInsightAgent"),
+    ("Which patients are not on my schedule?", "DoctorScheduleAgent"),
+])
+def test_doctor_query_routes_to_an_agent(context, question, agent):
+    context.register("model_factory", lambda app: fake_model_factory)
+
+    async def scenario(client):
+        response = await client.post("/doctor/query", json={"question": question})
+        assert response.status == 200
+        assert (await response.json())["agent"] == agent
+
+    _serve(context, scenario)
+
+
+def test_healthz_reports_draining(context):
+    async def scenario(client):
+        response = await client.get("/healthz")
+        assert response.status == 200 and (await response.json())["status"] == "ok"
+        client.app[server.STATE]["draining"] = True
+        response = await client.get("/healthz")
+        assert response.status == 503 and (await response.json())["status"] == "draining"
+        response = await client.post("/admissions", json=_admission())
+        assert response.status == 503
+
+    _serve(context, scenario)
@@ -0,0 +1,52 @@
+"""
+TriageAgent's handling of model answers, against FakeGenerativeModel.
+"""
+import json
+
+import pytest
+
+from healthmate_ai.agents.triage_agent import TriageAgent
+from benchmarks.fake_llm import FakeGenerativeModel
+from healthmate_ai.core.llm_infrastructure import LlmClient
+from healthmate_ai.tools.triage_cache import TriageCache
+
+
+def _agent(tmp_path, answer: str) -> TriageAgent:
+    agent = TriageAgent(cache=TriageCache(str(tmp_path / "triage.db")), llm_client=LlmClient())
+    agent.model = FakeGenerativeModel(latency_ms=0, responder=lambda prompt: answer)
+    return agent
+
+
+def test_valid_answer_is_cached(tmp_path):
+    answer = {"severity": "high", "department": "neurology", "summary": "Sudden severe headache."}
+    agent = _agent(tmp_path, "```json\n" + json.dumps(answer) + "\n```")
+    result = agent.analyze_symptoms("Worst headache of my life")
+    assert result == {"severity": "High", "department": "Neurology", "summary": "Sudden severe headache."}
+    assert agent.analyze_symptoms("Worst headache of my life") == result
+    assert agent.model.calls == 1
+
+
+@pytest.mark.parametrize("answer", [
+    json.dumps([{"severity": "Low", "department": "General", "summary": "x"}]),
+    json.dumps({"severity": "Low", "summary": "No department"}),
+    json.dumps({"severity": "Urgent-ish", "department": "General", "summary": "x"}),
+    '{"severity": "Low", "department": "Gen',
+])
+def test_unusable_answer_falls_back_and_is_not_cached(tmp_path, answer):
+    agent = _agent(tmp_path, answer)
+    result = agent.analyze_symptoms("Severe chest pain")
+    assert result == agent._mock_analysis("Severe chest pain")
+    agent.analyze_symptoms("Severe chest pain")
+    assert agent.model.calls == 2
+    assert agent.cache_stats()["memory"]["size"] == 0
+
+
+def test_model_factory_replaces_gemini(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    answer = {"severity": "Low", "department": "General", "summary": "Mild cough."}
+    agent = TriageAgent(cache=TriageCache(str(tmp_path / "triage.db")), llm_client=LlmClient(),
+                        model_factory=lambda model_name: FakeGenerativeModel(latency_ms=0,
+                                                                             responder=lambda prompt: json.dumps(answer)))
+    assert agent.analyze_symptoms("Cough") == answer
+    # Its answers are cached apart from Gemini's
+    assert agent.model_name == FakeGenerativeModel.model_name